@@ -9,6 +9,44 @@ BASE_DIR = Path(__file__).resolve().parents[2]
 # -----------------------------
 PROB_MODEL_PATH = BASE_DIR / "models" / "probability" / "rf_calibrated.pkl"
 
+# Precomputed (weather × hour × cell) lookup, built by
+# src/models/probability/build_risk_cube.py
+RISK_CUBE_PATH = BASE_DIR / "models" / "probability" / "risk_cube.npy"
+RISK_CUBE_META_PATH = BASE_DIR / "models" / "probability" / "risk_cube.json"
+
+# Array-compiled copy of the calibrated model, exported by
+# src/models/probability/export_compiled_forest.py
+PROB_COMPILED_DIR = BASE_DIR / "models" / "probability" / "rf_calibrated_compiled"
+
+# Above this many rows sklearn's C traversal wins over NumPy gathers
+COMPILED_MAX_ROWS = int(os.getenv("COMPILED_MAX_ROWS", "2048"))
+
+# Severity serving spec + compact serious/slight forest, exported by
+# src/models/severity/export_severity_serving.py (absent: global prior)
+SEVERITY_MODEL_DIR = BASE_DIR / "models" / "severity"
+SEVERITY_SERVING_PATH = SEVERITY_MODEL_DIR / "severity_serving.json"
+
+# Where compiled-model scoring runs: "thread" (in the API process)
+# or "process" (worker pool sharing memory-mapped arrays)
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")
+INFERENCE_POOL_SIZE = int(os.getenv("INFERENCE_POOL_SIZE", str(os.cpu_count() or 1)))
+# Inputs are split across workers in chunks of at least this many rows
+INFERENCE_POOL_MIN_CHUNK = int(os.getenv("INFERENCE_POOL_MIN_CHUNK", "256"))
+
+# Rendered heatmap tiles (per model version)
+TILE_CACHE_DIR = Path(os.getenv("TILE_CACHE_DIR", BASE_DIR / "data" / "cache" / "tiles"))
+# Without a risk cube, tiles are scored live; below this zoom a tile
+# covers tens of thousands of cells, so those tiles are not served
+TILE_LIVE_MIN_ZOOM = int(os.getenv("TILE_LIVE_MIN_ZOOM", "6"))
+
+# -----------------------------
+# Hot reload
+# -----------------------------
+# Seconds between artifact change checks (0 disables the watcher)
+MODEL_WATCH_INTERVAL_S = float(os.getenv("MODEL_WATCH_INTERVAL_S", "10"))
+# Required in X-Admin-Token for /admin/*; unset disables those endpoints
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
 # -----------------------------
 # Thresholds
 # -----------------------------
@@ -21,6 +59,55 @@ MODERATE_T = RISK_THRESHOLDS["moderate"]
 HIGH_T = RISK_THRESHOLDS["high"]
 SEVERE_T = RISK_THRESHOLDS["severe"]
 
+# -----------------------------
+# Batch scoring
+# -----------------------------
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "10000"))
+
+# Route scoring: polyline length limit and sampling step along segments
+MAX_ROUTE_POINTS = int(os.getenv("MAX_ROUTE_POINTS", "10000"))
+ROUTE_SAMPLE_DEG = float(os.getenv("ROUTE_SAMPLE_DEG", "0.01"))
+
+# Micro-batching of concurrent /predict-risk calls:
+# wait up to WINDOW_MS after the first queued request, or until MAX_SIZE are queued
+MICROBATCH_WINDOW_MS = float(os.getenv("MICROBATCH_WINDOW_MS", "2"))
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "64"))
+
+# -----------------------------
+# Prediction cache (0 entries disables it)
+# -----------------------------
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "100000"))
+PREDICTION_CACHE_TTL_S = float(os.getenv("PREDICTION_CACHE_TTL_S", "3600"))
+
+# -----------------------------
+# Weather client (services/weather.py)
+# -----------------------------
+# Point at benchmarks/openweather_stub.py for load tests
+OPENWEATHER_BASE_URL = os.getenv(
+    "OPENWEATHER_BASE_URL", "https://api.openweathermap.org"
+).rstrip("/")
+# Per-caller budget; slower lookups get the last known value
+WEATHER_TIMEOUT_S = float(os.getenv("WEATHER_TIMEOUT_S", "2"))
+# Fresh for TTL, then served stale for up to STALE more while refreshing
+WEATHER_TTL_S = float(os.getenv("WEATHER_TTL_S", "600"))
+WEATHER_STALE_S = float(os.getenv("WEATHER_STALE_S", "3600"))
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "50000"))
+WEATHER_POOL_SIZE = int(os.getenv("WEATHER_POOL_SIZE", "20"))
+# Consecutive failures that open the circuit, and seconds before a retry
+WEATHER_BREAKER_FAILURES = int(os.getenv("WEATHER_BREAKER_FAILURES", "5"))
+WEATHER_BREAKER_RESET_S = float(os.getenv("WEATHER_BREAKER_RESET_S", "30"))
+
+# Background refresh of weather for cells whose requests read live weather
+# (no weather_condition sent); off by default, every refresh is a paid call
+WEATHER_PREFETCH_ENABLED = os.getenv("WEATHER_PREFETCH_ENABLED", "0") == "1"
+# Refresh just before the TTL; OpenWeather updates roughly every 10 minutes
+WEATHER_PREFETCH_REFRESH_S = float(os.getenv("WEATHER_PREFETCH_REFRESH_S", "540"))
+# Cells without traffic for this long stop being refreshed
+WEATHER_PREFETCH_ACTIVE_S = float(os.getenv("WEATHER_PREFETCH_ACTIVE_S", "1800"))
+# Global upstream budget for prefetching (calls per second)
+WEATHER_PREFETCH_RATE = float(os.getenv("WEATHER_PREFETCH_RATE", "1"))
+WEATHER_PREFETCH_TICK_S = float(os.getenv("WEATHER_PREFETCH_TICK_S", "1"))
+
 # Weather API Key (used in Phase 13.5)
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
 
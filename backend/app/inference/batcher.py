@@ -0,0 +1,154 @@
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Callable, List
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row requests into one vectorized call.
+
+    Requests arriving within `window_ms` of the first queued request
+    (or until `max_batch` items are waiting) are scored together by
+    `score_fn(items) -> sequence of results`, run on the default
+    executor so the event loop stays free. Each caller awaits its own
+    future. Up to `concurrency` batches are scored at a time (1 unless
+    scoring runs outside the GIL); arrivals meanwhile form the next batch.
+    `score_timer` (anything with observe(seconds)) times each score_fn
+    call alone, without the queueing around it.
+    """
+
+    def __init__(self, score_fn: Callable[[List], object], window_ms: float, max_batch: int,
+                 concurrency: int = 1, score_timer=None):
+        self.score_fn = score_fn
+        self.score_timer = score_timer
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.concurrency = concurrency
+
+        self._pending = []
+        self._loop = None
+        self._wakeup = None
+        self._full = None
+        self._slots = None
+        self._scoring = set()  # strong refs to running batch tasks
+        self._worker = None
+
+        # Stats
+        self.max_queue_depth = 0
+        self.batches = 0
+        self.items = 0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        depth = len(self._pending)
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        if depth == 1:
+            self._wakeup.set()
+        if depth >= self.max_batch:
+            self._full.set()
+
+        return await future
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        labels = [str(b) for b in BATCH_SIZE_BUCKETS] + ["+Inf"]
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch": self.max_batch,
+            "concurrency": self.concurrency,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "batch_size_histogram": dict(zip(labels, self.batch_size_counts)),
+        }
+
+    # -----------------------------
+    # Worker
+    # -----------------------------
+    def _ensure_worker(self, loop):
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        self._loop = loop
+        self._pending = []
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._pending:
+                await self._slots.acquire()
+                await self._wait_for_window()
+
+                batch = self._pending[: self.max_batch]
+                del self._pending[: self.max_batch]
+                self._full.clear()
+                if len(self._pending) >= self.max_batch:
+                    self._full.set()
+
+                task = self._loop.create_task(self._score(batch))
+                self._scoring.add(task)
+                task.add_done_callback(self._scoring.discard)
+
+    async def _wait_for_window(self):
+        deadline = time.monotonic() + self.window
+        while len(self._pending) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._full.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+    def _timed_score(self, items):
+        if self.score_timer is None:
+            return self.score_fn(items)
+        start = time.perf_counter()
+        try:
+            return self.score_fn(items)
+        finally:
+            self.score_timer.observe(time.perf_counter() - start)
+
+    async def _score(self, batch):
+        items = [item for item, _ in batch]
+
+        self.batches += 1
+        self.items += len(items)
+        self.batch_size_counts[bisect_left(BATCH_SIZE_BUCKETS, len(items))] += 1
+
+        try:
+            results = await self._loop.run_in_executor(None, self._timed_score, items)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            self._slots.release()
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
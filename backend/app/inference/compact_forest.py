@@ -0,0 +1,246 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from backend.app.inference.compiled_forest import _float32_floor
+
+# -----------------------------
+# File layout
+# -----------------------------
+# MAGIC | uint32 header length | JSON header | padding | buffer
+#
+# The buffer holds every section back to back, each aligned to
+# ALIGN bytes; the header records (offset, count) per section.
+MAGIC = b"RFCOMPCT"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+SECTION_NAMES = ["nodes", "roots", "leaf_values"]
+
+
+def node_dtype(n_features: int) -> np.dtype:
+    """
+    Packed node record: 13 bytes (<= 256 features) or 14.
+    Leaves have left == -1 and keep their leaf_values row in right.
+    """
+    feature = np.uint8 if n_features <= 256 else np.uint16
+    return np.dtype([
+        ("feature", feature),
+        ("threshold", np.float32),
+        ("left", np.int32),
+        ("right", np.int32),
+    ])
+
+
+class CompactForest:
+    """
+    RandomForestClassifier in one contiguous buffer.
+
+    Nodes of all trees share a packed table (float32 thresholds,
+    uint8/uint16 feature indices, int32 child pointers); only leaves
+    carry class probabilities, as float32. Evaluation walks every
+    (row, tree) pair level by level and drops pairs that reached a
+    leaf, so deep unpruned trees cost their actual path length.
+    """
+
+    # Rows per traversal chunk; bounds the (rows × trees) working set
+    CHUNK_ROWS = 512
+
+    def __init__(self, buffer: np.ndarray, meta: dict):
+        self.buffer = buffer
+        self.meta = meta
+
+        self.feature_names = meta["feature_names"]
+        self.n_features = len(self.feature_names)
+        self.classes_ = np.asarray(meta["classes"])
+        self.n_classes = len(self.classes_)
+        self.max_depth = int(meta["max_depth"])
+
+        sections = meta["sections"]
+        self.nodes = self._section(sections["nodes"], node_dtype(self.n_features))
+        self.roots = self._section(sections["roots"], np.int32)
+        self.leaf_values = self._section(sections["leaf_values"], np.float32).reshape(
+            -1, self.n_classes
+        )
+        self.n_trees = len(self.roots)
+
+    def _section(self, spec: list, dtype) -> np.ndarray:
+        offset, count = spec
+        return np.frombuffer(self.buffer, dtype=dtype, count=count, offset=offset)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.buffer.nbytes)
+
+    # -----------------------------
+    # Evaluation
+    # -----------------------------
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        n = X.shape[0]
+        X_flat = X.ravel()
+        node = np.tile(self.roots, n)
+        row_offset = np.repeat(np.arange(n, dtype=np.int64) * self.n_features, self.n_trees)
+
+        # Gather whole records: take() on a strided field view copies the field first
+        active = np.arange(len(node))
+        while active.size:
+            rec = self.nodes.take(node[active])
+            internal = rec["left"] >= 0
+            active, rec = active[internal], rec[internal]
+
+            x = X_flat.take(row_offset[active] + rec["feature"])
+            go_left = x <= rec["threshold"]
+            node[active] = np.where(go_left, rec["left"], rec["right"])
+
+        return self.nodes.take(node)["right"]
+
+    def _proba(self, X: np.ndarray) -> np.ndarray:
+        leaf_rows = self._leaves(X)
+        values = self.leaf_values.take(leaf_rows, axis=0).reshape(len(X), self.n_trees, -1)
+        return values.sum(axis=1, dtype=np.float64) / self.n_trees
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Drop-in for RandomForestClassifier.predict_proba (DataFrame or array).
+        Inputs are compared in float32, as sklearn trees do.
+        """
+        if hasattr(X, "columns"):
+            X = X[self.feature_names].to_numpy()
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.shape[0] <= self.CHUNK_ROWS:
+            return self._proba(X)
+        return np.concatenate([
+            self._proba(X[start:start + self.CHUNK_ROWS])
+            for start in range(0, X.shape[0], self.CHUNK_ROWS)
+        ])
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, path: Path):
+        header = json.dumps(self.meta).encode()
+        prefix = len(MAGIC) + 4 + len(header)
+        padding = (-prefix) % ALIGN
+
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(np.uint32(len(header)).tobytes())
+            f.write(header)
+            f.write(b"\0" * padding)
+            f.write(self.buffer.tobytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = False) -> "CompactForest":
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a compact forest file")
+            header_len = int(np.frombuffer(f.read(4), dtype=np.uint32)[0])
+            meta = json.loads(f.read(header_len))
+            start = len(MAGIC) + 4 + header_len
+            start += (-start) % ALIGN
+
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact forest version: {meta.get('format_version')}")
+
+        if mmap:
+            buffer = np.memmap(path, dtype=np.uint8, mode="r", offset=start)
+        else:
+            buffer = np.fromfile(path, dtype=np.uint8, offset=start)
+        return cls(buffer, meta)
+
+
+# -----------------------------
+# Conversion from sklearn
+# -----------------------------
+def _pack_sections(sections: dict) -> tuple:
+    specs, offset, parts = {}, 0, []
+    for name in SECTION_NAMES:
+        data = np.ascontiguousarray(sections[name])
+        raw = data.view(np.uint8).ravel()
+        specs[name] = [offset, int(data.size)]
+        parts.append(raw)
+        pad = (-raw.size) % ALIGN
+        if pad:
+            parts.append(np.zeros(pad, dtype=np.uint8))
+        offset += raw.size + pad
+    return np.concatenate(parts), specs
+
+
+def compact_random_forest(forest, feature_names: Optional[list] = None) -> CompactForest:
+    """
+    Converts a fitted single-output RandomForestClassifier.
+    """
+    if forest.n_outputs_ != 1:
+        raise ValueError("Only single-output forests are supported")
+
+    if feature_names is None:
+        feature_names = list(getattr(forest, "feature_names_in_", range(forest.n_features_in_)))
+    feature_names = [str(name) for name in feature_names]
+
+    dtype = node_dtype(len(feature_names))
+    nodes, roots, leaf_values = [], [], []
+    node_offset, leaf_offset, max_depth = 0, 0, 0
+
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        n_nodes = tree.node_count
+
+        # Leaf probabilities, normalised as DecisionTreeClassifier.predict_proba does
+        v = tree.value[is_leaf, 0, :]
+        v = v / v.sum(axis=1, keepdims=True)
+        leaf_rows = np.cumsum(is_leaf) - 1 + leaf_offset
+
+        table = np.zeros(n_nodes, dtype=dtype)
+        table["feature"] = np.where(is_leaf, 0, tree.feature)
+        table["threshold"] = _float32_floor(np.where(is_leaf, 0.0, tree.threshold))
+        table["left"] = np.where(is_leaf, -1, tree.children_left + node_offset)
+        table["right"] = np.where(is_leaf, leaf_rows, tree.children_right + node_offset)
+
+        nodes.append(table)
+        roots.append(node_offset)
+        leaf_values.append(v.astype(np.float32))
+
+        node_offset += n_nodes
+        leaf_offset += len(v)
+        max_depth = max(max_depth, tree.max_depth)
+
+    if node_offset >= 2 ** 31:
+        raise ValueError("Forest too large for int32 node pointers")
+
+    buffer, specs = _pack_sections({
+        "nodes": np.concatenate(nodes),
+        "roots": np.array(roots, dtype=np.int32),
+        "leaf_values": np.concatenate(leaf_values).ravel(),
+    })
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "feature_names": feature_names,
+        "classes": [c.item() if hasattr(c, "item") else c for c in forest.classes_],
+        "n_trees": len(roots),
+        "n_nodes": node_offset,
+        "n_leaves": leaf_offset,
+        "max_depth": max_depth,
+        "sections": specs,
+    }
+    return CompactForest(buffer, meta)
+
+
+def sklearn_forest_nbytes(forest) -> int:
+    """
+    Bytes held by the fitted trees' node and value arrays.
+    """
+    total = 0
+    for estimator in forest.estimators_:
+        state = estimator.tree_.__getstate__()
+        total += state["nodes"].nbytes + state["values"].nbytes
+    return total
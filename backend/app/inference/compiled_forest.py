@@ -0,0 +1,331 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from scipy import interpolate
+from scipy.special import expit
+
+
+# -----------------------------
+# Artifact layout
+# -----------------------------
+ARRAY_NAMES = ["feature", "threshold", "children", "value", "roots"]
+ISOTONIC_ARRAY_NAMES = ["iso_x", "iso_y"]
+META_FILE = "meta.json"
+
+
+def base_pipeline(calibrated_classifier):
+    base = calibrated_classifier.estimator
+    return getattr(base, "estimator", base)  # unwrap FrozenEstimator
+
+
+class CompiledForest:
+    """
+    CalibratedClassifierCV(Pipeline(ColumnTransformer, RandomForest))
+    flattened into contiguous NumPy arrays.
+
+    All trees share one node table; leaves point to themselves so
+    every row can be walked for exactly max_depth steps without
+    branching on leaf status.
+    """
+
+    # Rows per traversal chunk; keeps the (rows × trees) node table in cache
+    CHUNK_ROWS = 256
+
+    def __init__(self, arrays: dict, meta: dict):
+        self.arrays = arrays
+        self.meta = meta
+
+        # Encoder
+        self.numeric_columns = meta["numeric_columns"]
+        self.categorical = meta["categorical"]
+        self.n_encoded = int(meta["n_encoded"])
+        self.category_index = {
+            spec["column"]: dict(zip(spec["categories"], spec["columns"]))
+            for spec in self.categorical
+        }
+
+        # Forest
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.children = arrays["children"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.n_trees = len(self.roots)
+        self.max_depth = int(meta["max_depth"])
+
+        # Calibrator
+        calibration = meta["calibration"]
+        self.method = calibration["method"]
+        if self.method == "sigmoid":
+            self.a = calibration["a"]
+            self.b = calibration["b"]
+        else:
+            iso_x, iso_y = arrays["iso_x"], arrays["iso_y"]
+            self.iso_bounds = (iso_x[0], iso_x[-1])
+            if len(iso_y) == 1:
+                self.iso_f = lambda T: np.full_like(T, iso_y[0])
+            else:
+                self.iso_f = interpolate.interp1d(iso_x, iso_y, kind="linear")
+
+    # -----------------------------
+    # Encoding
+    # -----------------------------
+    def encode(self, X) -> np.ndarray:
+        """
+        ColumnTransformer equivalent for a feature DataFrame.
+        Output is float32, the dtype sklearn trees compare in.
+        """
+        n = len(X)
+        out = np.zeros((n, self.n_encoded), dtype=np.float32)
+
+        for j, column in enumerate(self.numeric_columns):
+            out[:, j] = X[column].to_numpy(dtype=np.float64)
+
+        rows = np.arange(n)
+        for column, index in self.category_index.items():
+            cols = X[column].map(index).to_numpy(dtype=np.float64)
+            hit = cols >= 0  # NaN (unknown) and dropped (-1) stay zero
+            out[rows[hit], cols[hit].astype(np.intp)] = 1.0
+
+        return out
+
+    # -----------------------------
+    # Evaluation
+    # -----------------------------
+    def _walk(self, X_encoded: np.ndarray) -> np.ndarray:
+        n, n_cols = X_encoded.shape
+        X_flat = X_encoded.ravel()
+        node = np.tile(self.roots, n)
+        if n > 1:
+            row_offset = np.repeat(np.arange(n, dtype=np.int32) * n_cols, self.n_trees)
+
+        for _ in range(self.max_depth):
+            f = self.feature.take(node)
+            if n > 1:
+                f += row_offset
+            go_left = X_flat.take(f) <= self.threshold.take(node)
+            node *= 2
+            node += go_left
+            node = self.children.take(node)
+
+        # Sequential sum in tree order, as RandomForest accumulates
+        leaf_values = self.value.take(node).reshape(n, self.n_trees)
+        return np.cumsum(leaf_values, axis=1)[:, -1] / self.n_trees
+
+    def forest_proba(self, X_encoded: np.ndarray) -> np.ndarray:
+        """
+        Uncalibrated positive-class probability (RandomForest average).
+        """
+        X_encoded = np.ascontiguousarray(X_encoded, dtype=np.float32)
+        n = X_encoded.shape[0]
+        if n <= self.CHUNK_ROWS:
+            return self._walk(X_encoded)
+        return np.concatenate([
+            self._walk(X_encoded[start:start + self.CHUNK_ROWS])
+            for start in range(0, n, self.CHUNK_ROWS)
+        ])
+
+    def calibrate(self, T: np.ndarray) -> np.ndarray:
+        if self.method == "sigmoid":
+            return expit(-(self.a * T + self.b))
+        return self.iso_f(np.clip(T, *self.iso_bounds))
+
+    def predict_proba_encoded(self, X_encoded: np.ndarray) -> np.ndarray:
+        """
+        Calibrated positive-class probability for pre-encoded rows.
+        """
+        return self.calibrate(self.forest_proba(X_encoded))
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Drop-in for CalibratedClassifierCV.predict_proba on a feature DataFrame.
+        """
+        pos = self.predict_proba_encoded(self.encode(X))
+        return np.column_stack([1.0 - pos, pos])
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, out_dir: Path):
+        out_dir.mkdir(parents=True, exist_ok=True)
+        names = ARRAY_NAMES + (ISOTONIC_ARRAY_NAMES if self.method == "isotonic" else [])
+        # Replace files atomically: serving processes may have the old ones mapped
+        for name in names:
+            tmp = out_dir / f"{name}.npy.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, self.arrays[name])
+            os.replace(tmp, out_dir / f"{name}.npy")
+        tmp = out_dir / f"{META_FILE}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f, indent=4)
+        os.replace(tmp, out_dir / META_FILE)
+
+    @classmethod
+    def load(cls, in_dir: Path, mmap_mode: Optional[str] = None) -> "CompiledForest":
+        with open(in_dir / META_FILE) as f:
+            meta = json.load(f)
+        names = ARRAY_NAMES
+        if meta["calibration"]["method"] == "isotonic":
+            names = names + ISOTONIC_ARRAY_NAMES
+        arrays = {
+            name: np.load(in_dir / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in names
+        }
+        return cls(arrays, meta)
+
+
+# -----------------------------
+# Export from sklearn
+# -----------------------------
+def _is_passthrough(transformer) -> bool:
+    # Fitted ColumnTransformers may store "passthrough" as an identity FunctionTransformer
+    if isinstance(transformer, str):
+        return transformer == "passthrough"
+    return type(transformer).__name__ == "FunctionTransformer" and transformer.func is None
+
+
+def compile_encoder(column_transformer) -> dict:
+    numeric_columns, categorical = [], []
+    offset = 0
+
+    for name, transformer, columns in column_transformer.transformers_:
+        if (isinstance(transformer, str) and transformer == "drop") or len(columns) == 0:
+            continue
+        if _is_passthrough(transformer):
+            numeric_columns.extend(columns)
+            offset += len(columns)
+            continue
+        if type(transformer).__name__ != "OneHotEncoder":
+            raise ValueError(f"Unsupported transformer in '{name}': {transformer!r}")
+
+        for k, (column, cats) in enumerate(zip(columns, transformer.categories_)):
+            drop = None
+            if transformer.drop_idx_ is not None and transformer.drop_idx_[k] is not None:
+                drop = int(transformer.drop_idx_[k])
+
+            out_cols = []
+            for c in range(len(cats)):
+                if c == drop:
+                    out_cols.append(-1)
+                else:
+                    out_cols.append(offset)
+                    offset += 1
+
+            categorical.append({
+                "column": column,
+                "categories": [c.item() if hasattr(c, "item") else c for c in cats],
+                "columns": out_cols,
+            })
+
+    # Numeric passthrough columns come first in training layout
+    if numeric_columns and not _is_passthrough(column_transformer.transformers_[0][1]):
+        raise ValueError("Expected numeric passthrough as the first transformer")
+
+    return {
+        "numeric_columns": list(numeric_columns),
+        "categorical": categorical,
+        "n_encoded": offset,
+    }
+
+
+def _float32_floor(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 <= each float64 threshold.
+
+    Trees compare float32 inputs, so x <= t and x <= floor32(t)
+    agree for every float32 x; decisions stay bit-identical.
+    """
+    t32 = threshold.astype(np.float32)
+    over = t32.astype(np.float64) > threshold
+    t32[over] = np.nextafter(t32[over], np.float32(-np.inf))
+    return t32
+
+
+def _compile_trees(forest) -> tuple:
+    features, thresholds, children, values, roots = [], [], [], [], []
+    offset, max_depth = 0, 0
+
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        ids = np.arange(n_nodes)
+        is_leaf = tree.children_left == -1
+
+        left = np.where(is_leaf, ids, tree.children_left) + offset
+        right = np.where(is_leaf, ids, tree.children_right) + offset
+
+        v = tree.value[:, 0, :]
+        sums = v.sum(axis=1)
+        pos = v[:, 1] if np.allclose(sums, 1.0) else v[:, 1] / sums
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+        # children[2 * node + go_left] -> next node
+        children.append(np.column_stack([right, left]).ravel())
+        values.append(pos)
+        roots.append(offset)
+
+        offset += n_nodes
+        max_depth = max(max_depth, tree.max_depth)
+
+    return {
+        "feature": np.concatenate(features).astype(np.int32),
+        "threshold": _float32_floor(np.concatenate(thresholds)),
+        "children": np.concatenate(children).astype(np.int32),
+        "value": np.concatenate(values).astype(np.float64),
+        "roots": np.array(roots, dtype=np.int32),
+    }, max_depth
+
+
+def model_categories(model) -> dict:
+    """
+    {column: trained categories} of the saved rf_calibrated.pkl stack.
+    """
+    pipeline = base_pipeline(model.calibrated_classifiers_[0])
+    categorical = compile_encoder(pipeline.named_steps["preprocess"])["categorical"]
+    return {spec["column"]: spec["categories"] for spec in categorical}
+
+
+def compile_calibrated_forest(model) -> CompiledForest:
+    """
+    Flattens the saved rf_calibrated.pkl stack into a CompiledForest.
+    """
+    if len(model.calibrated_classifiers_) != 1:
+        raise ValueError("Only single (prefit) calibrated classifiers are supported")
+
+    calibrated = model.calibrated_classifiers_[0]
+    pipeline = base_pipeline(calibrated)
+    forest = pipeline.named_steps["model"]
+
+    if len(forest.classes_) != 2 or forest.n_outputs_ != 1:
+        raise ValueError("Only binary single-output forests are supported")
+
+    encoder_meta = compile_encoder(pipeline.named_steps["preprocess"])
+    arrays, max_depth = _compile_trees(forest)
+
+    calibrator = calibrated.calibrators[0]
+    if type(calibrator).__name__ == "_SigmoidCalibration":
+        calibration = {
+            "method": "sigmoid",
+            "a": float(calibrator.a_),
+            "b": float(calibrator.b_),
+        }
+    elif type(calibrator).__name__ == "IsotonicRegression":
+        calibration = {"method": "isotonic"}
+        arrays["iso_x"] = np.asarray(calibrator.X_thresholds_, dtype=np.float64)
+        arrays["iso_y"] = np.asarray(calibrator.y_thresholds_, dtype=np.float64)
+    else:
+        raise ValueError(f"Unsupported calibrator: {calibrator!r}")
+
+    meta = {
+        **encoder_meta,
+        "n_trees": len(arrays["roots"]),
+        "n_nodes": len(arrays["feature"]),
+        "max_depth": max_depth,
+        "calibration": calibration,
+    }
+
+    return CompiledForest(arrays, meta)
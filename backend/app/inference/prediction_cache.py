@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from backend.app.config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S
+from backend.app.utils.feature_builder import FEATURE_COLUMNS
+
+
+class PredictionCache:
+    """
+    LRU + TTL cache of probabilities keyed by the built feature row.
+
+    Keys carry the model version; main.py clears the cache when the
+    model registry swaps bundles, so stale versions do not linger.
+    """
+
+    def __init__(self, max_size: int, ttl_s: float):
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+
+        self._entries = OrderedDict()  # key -> (expires_at, probability)
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(features: dict, model_version: str = "") -> tuple:
+        """
+        probability_feature_values() dict -> hashable key in training column order,
+        prefixed with the model version that scores it.
+        """
+        return (model_version,) + tuple(features[column] for column in FEATURE_COLUMNS)
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def get(self, key: tuple) -> Optional[float]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, prob = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return prob
+
+    def put(self, key: tuple, prob: float):
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + self.ttl_s, prob)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+PREDICTION_CACHE = (
+    PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S)
+    if PREDICTION_CACHE_SIZE > 0
+    else None
+)
@@ -1,14 +1,92 @@
-import joblib
 import numpy as np
-from backend.app.config import PROB_MODEL_PATH
+import pandas as pd
+from backend.app.config import COMPILED_MAX_ROWS
+from backend.app.inference.process_pool import INFERENCE_POOL
+from backend.app.inference.registry import REGISTRY, ModelBundle
+from backend.app.utils.feature_builder import FEATURE_COLUMNS, stack_feature_values
+from backend.app.utils.metrics import NAN_FEATURES_TOTAL
 
-print("Loading calibrated probability model...")
-MODEL = joblib.load(PROB_MODEL_PATH)
-print("Probability model loaded.")
+# Every function scores with `bundle` if given, else the active one.
+# Callers serving a request pass the bundle they started with.
 
-def predict_probability(X):
+
+def _scorer(bundle: ModelBundle, n_rows: int):
+    """
+    Compiled arrays for small inputs, sklearn for very large batches.
+    Both expose the same predict_proba contract.
+    """
+    if bundle.compiled is not None and n_rows <= COMPILED_MAX_ROWS:
+        return bundle.compiled
+    return bundle.model
+
+
+def _predict_encoded(bundle: ModelBundle, X_encoded: np.ndarray) -> np.ndarray:
+    if INFERENCE_POOL is not None:
+        return INFERENCE_POOL.predict_proba_encoded(bundle.compiled, X_encoded)
+    return bundle.compiled.predict_proba_encoded(X_encoded)
+
+
+def _assert_no_nan(has_nan: bool):
+    if has_nan:
+        NAN_FEATURES_TOTAL.inc()
+    assert not has_nan, "NaN detected in feature vector"
+
+
+def predict_probability(X, bundle: ModelBundle = None):
     """
     Returns probability of accident
     """
-    assert not X.isna().any().any(), "NaN detected in feature vector"
-    return float(MODEL.predict_proba(X)[0, 1])
+    bundle = bundle or REGISTRY.bundle
+    _assert_no_nan(X.isna().any().any())
+    return float(_scorer(bundle, 1).predict_proba(X)[0, 1])
+
+
+def predict_probability_batch(X, bundle: ModelBundle = None):
+    """
+    Returns probability of accident for every row of X
+    """
+    bundle = bundle or REGISTRY.bundle
+    _assert_no_nan(X.isna().any().any())
+    return _scorer(bundle, len(X)).predict_proba(X)[:, 1]
+
+
+# -----------------------------
+# Serving paths (no DataFrame when compiled)
+# -----------------------------
+def predict_probability_features(features: dict, bundle: ModelBundle = None) -> float:
+    """
+    Probability for one probability_feature_values() dict
+    """
+    bundle = bundle or REGISTRY.bundle
+    if bundle.encoder is None:
+        return predict_probability(pd.DataFrame([features], columns=FEATURE_COLUMNS), bundle)
+
+    row = bundle.encoder.encode_features(features)
+    _assert_no_nan(np.isnan(row).any())
+    return float(_predict_encoded(bundle, row)[0])
+
+
+def predict_probability_columns(columns: dict, bundle: ModelBundle = None) -> np.ndarray:
+    """
+    Probabilities for probability_feature_columns() arrays
+    """
+    bundle = bundle or REGISTRY.bundle
+    n_rows = len(columns["Hour"])
+    # The pool splits big inputs across workers, so no sklearn cut-over there
+    max_rows = COMPILED_MAX_ROWS if INFERENCE_POOL is None else float("inf")
+    if bundle.encoder is None or n_rows > max_rows:
+        return predict_probability_batch(
+            pd.DataFrame(columns, columns=FEATURE_COLUMNS), bundle
+        )
+
+    X_encoded = bundle.encoder.encode_columns(columns)
+    _assert_no_nan(np.isnan(X_encoded).any())
+    return _predict_encoded(bundle, X_encoded)
+
+
+def predict_probability_feature_rows(rows: list, bundle: ModelBundle = None) -> np.ndarray:
+    """
+    Probabilities for a list of probability_feature_values() dicts
+    (coalesced single-row requests)
+    """
+    return predict_probability_columns(stack_feature_values(rows), bundle)
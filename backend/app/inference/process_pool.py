@@ -0,0 +1,195 @@
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import numpy as np
+
+from backend.app.config import (
+    PROB_COMPILED_DIR,
+    INFERENCE_EXECUTOR,
+    INFERENCE_POOL_SIZE,
+    INFERENCE_POOL_MIN_CHUNK,
+)
+from backend.app.inference.compiled_forest import CompiledForest, META_FILE
+from backend.app.utils.metrics import Counter
+
+# Imported by every worker process: keep it free of model loading
+# (registry, probability), the parent owns those.
+
+POOL_RESTARTS = Counter(
+    "risk_inference_pool_restarts_total",
+    "Inference process pools recreated after a worker crashed.",
+)
+POOL_FALLBACKS = Counter(
+    "risk_inference_pool_fallbacks_total",
+    "Batches scored in-process because the pool could not serve them.",
+)
+
+
+class StaleModelError(RuntimeError):
+    """
+    The compiled arrays on disk are not the model the caller scores with.
+    """
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+# model sha256 -> CompiledForest, at most the active and the previous model
+_WORKER_MODELS = {}
+
+
+def _worker_forest(compiled_dir: str, model_sha256: str) -> CompiledForest:
+    forest = _WORKER_MODELS.get(model_sha256)
+    if forest is not None:
+        return forest
+
+    # Memory-mapped read-only: every worker shares the page cache copy
+    forest = CompiledForest.load(Path(compiled_dir), mmap_mode="r")
+    if forest.meta.get("model_sha256") != model_sha256:
+        raise StaleModelError(f"compiled arrays on disk are not model {model_sha256[:12]}")
+
+    while len(_WORKER_MODELS) >= 2:
+        _WORKER_MODELS.pop(next(iter(_WORKER_MODELS)))
+    _WORKER_MODELS[model_sha256] = forest
+    return forest
+
+
+def _worker_init(compiled_dir: str):
+    # Load whatever is on disk now so the first batch skips it. Missing,
+    # mid-export or stale arrays are retried per batch; anything else
+    # fails the initializer and surfaces as a broken pool.
+    try:
+        with open(Path(compiled_dir) / META_FILE) as f:
+            _worker_forest(compiled_dir, json.load(f)["model_sha256"])
+    except (OSError, ValueError, KeyError, StaleModelError) as exc:
+        print(
+            f"Inference worker {os.getpid()}: compiled model not preloaded "
+            f"({type(exc).__name__}: {exc})",
+            flush=True,
+        )
+
+
+def _worker_predict(compiled_dir: str, model_sha256: str, X_encoded: np.ndarray) -> np.ndarray:
+    return _worker_forest(compiled_dir, model_sha256).predict_proba_encoded(X_encoded)
+
+
+def _worker_ping(model_sha256: str) -> int:
+    return os.getpid() if model_sha256 in _WORKER_MODELS else -os.getpid()
+
+
+# -----------------------------
+# Parent side
+# -----------------------------
+class InferencePool:
+    """
+    Scores encoded rows of the compiled model in worker processes,
+    so one backend instance uses every core despite the GIL.
+
+    Workers memory-map the exported arrays (models/probability/
+    rf_calibrated_compiled) instead of unpickling the forest, so N
+    workers share one copy through the page cache. Large inputs are
+    split across workers. A crashed worker breaks the executor; it is
+    recreated and the batch retried once, then scored in-process.
+    """
+
+    def __init__(self, size: int, compiled_dir: Path, min_chunk: int = 256):
+        self.size = size
+        self.compiled_dir = str(compiled_dir)
+        self.min_chunk = min_chunk
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn: the parent runs threads (event loop, watcher) that fork would copy mid-state
+        return ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(self.compiled_dir,),
+        )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor()
+            return self._executor
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            # Several callers may see the same crash; restart once
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+                self.restarts += 1
+                POOL_RESTARTS.inc()
+
+    def _chunks(self, n_rows: int) -> list:
+        n_chunks = max(1, min(self.size, n_rows // self.min_chunk))
+        bounds = np.linspace(0, n_rows, n_chunks + 1).astype(int)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _submit_all(self, model_sha256: str, X_encoded: np.ndarray) -> np.ndarray:
+        executor = self._get_executor()
+        try:
+            futures = [
+                executor.submit(_worker_predict, self.compiled_dir, model_sha256, X_encoded[lo:hi])
+                for lo, hi in self._chunks(len(X_encoded))
+            ]
+            return np.concatenate([future.result() for future in futures])
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+
+    def predict_proba_encoded(self, compiled: CompiledForest, X_encoded: np.ndarray) -> np.ndarray:
+        """
+        Same result as compiled.predict_proba_encoded(X_encoded).
+        """
+        model_sha256 = compiled.meta["model_sha256"]
+        for _ in range(2):
+            try:
+                return self._submit_all(model_sha256, X_encoded)
+            except BrokenProcessPool:
+                continue
+            except StaleModelError:
+                # Mid-swap: disk already holds the next model
+                break
+        POOL_FALLBACKS.inc()
+        return compiled.predict_proba_encoded(X_encoded)
+
+    def warm_up(self, model_sha256: str) -> list:
+        """
+        Starts every worker; returns their pids (negative: model not loaded).
+        """
+        executor = self._get_executor()
+        futures = [executor.submit(_worker_ping, model_sha256) for _ in range(self.size)]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        executor = self._executor
+        processes = getattr(executor, "_processes", None) or {}
+        return {
+            "size": self.size,
+            "live_workers": sum(p.is_alive() for p in processes.values()),
+            "restarts": self.restarts,
+            "min_chunk": self.min_chunk,
+        }
+
+
+INFERENCE_POOL = (
+    InferencePool(INFERENCE_POOL_SIZE, PROB_COMPILED_DIR, INFERENCE_POOL_MIN_CHUNK)
+    if INFERENCE_EXECUTOR == "process"
+    else None
+)
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import joblib
+import pandas as pd
+
+from backend.app.config import (
+    PROB_MODEL_PATH,
+    PROB_COMPILED_DIR,
+    INFERENCE_EXECUTOR,
+    RISK_CUBE_PATH,
+    RISK_CUBE_META_PATH,
+    THRESHOLD_PATH,
+    SEVERITY_MODEL_DIR,
+    SEVERITY_SERVING_PATH,
+    MODEL_WATCH_INTERVAL_S,
+)
+from backend.app.inference.compiled_forest import CompiledForest, model_categories
+from backend.app.inference.risk_cube import load_risk_cube
+from backend.app.inference.severity import SeverityModel, load_severity_model
+from backend.app.utils.artifacts import file_sha256
+from backend.app.utils.feature_builder import (
+    FEATURE_COLUMNS,
+    probability_feature_values,
+    probability_feature_columns,
+)
+from backend.app.utils.feature_encoder import FeatureEncoder
+
+# Files whose change triggers a reload
+WATCH_PATHS = [
+    PROB_MODEL_PATH,
+    THRESHOLD_PATH,
+    PROB_COMPILED_DIR / "meta.json",
+    RISK_CUBE_META_PATH,
+    SEVERITY_SERVING_PATH,
+]
+
+# Used to warm every scoring path of a freshly loaded bundle
+WARMUP_PAYLOAD = {"latitude": 51.5, "longitude": -0.1, "hour": 8}
+
+
+class ModelBundle:
+    """
+    Everything one model version needs to serve a request:
+    sklearn model, optional compiled copy and risk cube, thresholds,
+    optional severity models.
+
+    Bundles are immutable once built; a request holds on to the
+    bundle it started with, so a swap never changes it mid-flight.
+    """
+
+    def __init__(self, model, model_sha256: str, thresholds: dict,
+                 compiled: Optional[CompiledForest] = None, risk_cube=None,
+                 severity: Optional[SeverityModel] = None):
+        self.model = model
+        self.model_sha256 = model_sha256
+        self.thresholds = thresholds
+        self.compiled = compiled
+        self.encoder = FeatureEncoder.from_compiled(compiled) if compiled else None
+        self.risk_cube = risk_cube
+        self.severity = severity
+        # {column: categories the model was trained on}, {} if unreadable
+        self.categories = _trained_categories(model, compiled)
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+
+        thresholds_sha = hashlib.sha256(
+            json.dumps(thresholds, sort_keys=True).encode()
+        ).hexdigest()
+        # <model sha>.<thresholds sha>, short enough for headers and logs
+        self.version = f"{model_sha256[:12]}.{thresholds_sha[:6]}"
+
+    def warm_up(self):
+        """
+        Runs every scoring path once so the first request after a swap
+        does not pay for lazy imports, page faults or allocator growth.
+        """
+        features = probability_feature_values(WARMUP_PAYLOAD)
+        X = pd.DataFrame([features], columns=FEATURE_COLUMNS)
+        self.model.predict_proba(X)
+        if self.compiled is not None:
+            self.compiled.predict_proba_encoded(self.encoder.encode_features(features))
+        if self.risk_cube is not None:
+            self.risk_cube.lookup(features)
+        if self.severity is not None:
+            self.severity.warm_up(probability_feature_columns([WARMUP_PAYLOAD]))
+
+
+def _trained_categories(model, compiled: Optional[CompiledForest]) -> dict:
+    if compiled is not None:
+        return {spec["column"]: spec["categories"] for spec in compiled.categorical}
+    try:
+        return model_categories(model)
+    except (AttributeError, IndexError, KeyError, ValueError):
+        return {}
+
+
+def load_compiled_model(model_sha256: str) -> Optional[CompiledForest]:
+    """
+    Loads the array-compiled model if it was exported from the current pickle.
+    """
+    if not (PROB_COMPILED_DIR / "meta.json").exists():
+        print("Compiled model not found, using sklearn pipeline.")
+        return None
+
+    # The process pool maps the same files; share the pages with it
+    mmap_mode = "r" if INFERENCE_EXECUTOR == "process" else None
+    compiled = CompiledForest.load(PROB_COMPILED_DIR, mmap_mode=mmap_mode)
+
+    if compiled.meta.get("model_sha256") != model_sha256:
+        print("Compiled model is stale (model changed), using sklearn pipeline.")
+        return None
+
+    print("Compiled probability model loaded.")
+    return compiled
+
+
+def load_bundle() -> ModelBundle:
+    print("Loading calibrated probability model...")
+    model_sha256 = file_sha256(PROB_MODEL_PATH)
+    model = joblib.load(PROB_MODEL_PATH)
+    print("Probability model loaded.")
+
+    with open(THRESHOLD_PATH) as f:
+        thresholds = json.load(f)
+
+    bundle = ModelBundle(
+        model,
+        model_sha256,
+        thresholds,
+        compiled=load_compiled_model(model_sha256),
+        risk_cube=load_risk_cube(RISK_CUBE_PATH, RISK_CUBE_META_PATH, model_sha256),
+        severity=load_severity_model(SEVERITY_SERVING_PATH, SEVERITY_MODEL_DIR),
+    )
+    bundle.warm_up()
+    return bundle
+
+
+class ModelRegistry:
+    """
+    Holds the active ModelBundle and replaces it without downtime.
+
+    A reload builds and warms the new bundle off to the side, then
+    swaps a single reference; readers never take a lock. Failed
+    reloads keep serving the previous bundle.
+    """
+
+    def __init__(self, loader: Callable[[], ModelBundle], watch_paths: list):
+        self.loader = loader
+        self.watch_paths = list(watch_paths)
+        self._reload_lock = threading.Lock()
+        self._listeners = []
+        self._watcher = None
+
+        self._signature = self._files_signature()
+        self._bundle = loader()
+
+        self.reloads = 0
+        self.last_error = None
+
+    @property
+    def bundle(self) -> ModelBundle:
+        return self._bundle
+
+    def on_swap(self, callback: Callable[[ModelBundle, ModelBundle], None]):
+        """
+        Registers callback(old, new), called after every successful swap.
+        """
+        self._listeners.append(callback)
+
+    # -----------------------------
+    # Reloading
+    # -----------------------------
+    def _files_signature(self) -> tuple:
+        signature = []
+        for path in self.watch_paths:
+            try:
+                st = path.stat()
+                signature.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def reload(self) -> ModelBundle:
+        """
+        Loads, warms and activates the artifacts currently on disk.
+        Raises if loading fails; the old bundle stays active.
+        """
+        with self._reload_lock:
+            signature = self._files_signature()
+            try:
+                new = self.loader()
+            except Exception as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                raise
+
+            old, self._bundle = self._bundle, new
+            self._signature = signature
+            self.reloads += 1
+            self.last_error = None
+
+        print(f"Model swapped: {old.version} -> {new.version}")
+        for callback in self._listeners:
+            callback(old, new)
+        return new
+
+    def reload_if_changed(self) -> bool:
+        if self._files_signature() == self._signature:
+            return False
+        self.reload()
+        return True
+
+    def start_watcher(self, interval_s: float = MODEL_WATCH_INTERVAL_S):
+        """
+        Polls the artifact files from a daemon thread (interval <= 0 disables).
+        """
+        if interval_s <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval_s)
+                try:
+                    self.reload_if_changed()
+                except Exception:
+                    # Half-written artifacts are retried on the next poll
+                    traceback.print_exc()
+
+        self._watcher = threading.Thread(target=watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def status(self) -> dict:
+        bundle = self._bundle
+        return {
+            "model_version": bundle.version,
+            "model_sha256": bundle.model_sha256,
+            "loaded_at": bundle.loaded_at,
+            "compiled": bundle.compiled is not None,
+            "risk_cube": bundle.risk_cube is not None,
+            "severity": bundle.severity is not None,
+            "thresholds": bundle.thresholds,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
+
+
+REGISTRY = ModelRegistry(load_bundle, WATCH_PATHS)
@@ -0,0 +1,97 @@
+import json
+from typing import Optional
+
+import numpy as np
+
+from backend.app.utils.feature_builder import CONTEXT_DEFAULTS, category_codes
+
+
+class RiskCube:
+    """
+    Precomputed calibrated probabilities for every
+    (weather, hour, lat_bin, lon_bin) at default road context.
+
+    The array is memory-mapped, so all workers share one page-cached file.
+    """
+
+    def __init__(self, cube: np.ndarray, meta: dict):
+        self.cube = cube
+        self.meta = meta
+        self.lat_min = int(meta["lat_bin_min"])
+        self.lon_min = int(meta["lon_bin_min"])
+        self.n_weather, self.n_hours, self.n_lat, self.n_lon = cube.shape
+        self.weather_index = {w: i for i, w in enumerate(meta["weather"])}
+        self.context = {
+            column: default for column, default in CONTEXT_DEFAULTS.values()
+            if column != "Weather_Conditions"
+        }
+
+    @classmethod
+    def load(cls, cube_path, meta_path) -> "RiskCube":
+        with open(meta_path) as f:
+            meta = json.load(f)
+        cube = np.load(cube_path, mmap_mode="r")
+        return cls(cube, meta)
+
+    def lookup(self, features: dict) -> Optional[float]:
+        """
+        O(1) probability for one feature row, or None if the row
+        is outside the cube (unseen cell, weather or road context).
+        """
+        for column, default in self.context.items():
+            if features[column] != default:
+                return None
+
+        w = self.weather_index.get(features["Weather_Conditions"])
+        i = features["lat_bin"] - self.lat_min
+        j = features["lon_bin"] - self.lon_min
+        hour = features["Hour"]
+
+        if w is None or not (0 <= i < self.n_lat and 0 <= j < self.n_lon):
+            return None
+        if not 0 <= hour < self.n_hours:
+            return None
+
+        prob = float(self.cube[w, hour, i, j])
+        return None if np.isnan(prob) else prob
+
+    def lookup_batch(self, columns: dict) -> np.ndarray:
+        """
+        Vectorized lookup over probability_feature_columns() arrays.
+        Rows that miss the cube are returned as NaN.
+        """
+        n = len(columns["Hour"])
+        probs = np.full(n, np.nan)
+
+        w = category_codes(columns["Weather_Conditions"], self.weather_index)
+        i = columns["lat_bin"] - self.lat_min
+        j = columns["lon_bin"] - self.lon_min
+        hour = columns["Hour"]
+
+        hit = w >= 0
+        hit &= (i >= 0) & (i < self.n_lat) & (j >= 0) & (j < self.n_lon)
+        hit &= (hour >= 0) & (hour < self.n_hours)
+        for column, default in self.context.items():
+            hit &= columns[column] == default
+
+        if hit.any():
+            probs[hit] = self.cube[w[hit], hour[hit], i[hit], j[hit]]
+        return probs
+
+
+def load_risk_cube(cube_path, meta_path, model_sha256: str) -> Optional[RiskCube]:
+    """
+    Loads the cube if it exists and was built from the given model.
+    """
+    if not (cube_path.exists() and meta_path.exists()):
+        print("Risk cube not found, using live model only.")
+        return None
+
+    cube = RiskCube.load(cube_path, meta_path)
+
+    if cube.meta.get("model_sha256") != model_sha256:
+        print("Risk cube is stale (model changed), using live model only.")
+        return None
+
+    print(f"Risk cube loaded: {cube.cube.shape} (weather, hour, lat, lon)")
+    return cube
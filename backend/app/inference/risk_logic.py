@@ -1,12 +1,26 @@
+import numpy as np
+
 from backend.app.config import MODERATE_T, HIGH_T, SEVERE_T
 
 
-def probability_to_level(prob: float) -> str:
-    if prob >= SEVERE_T:
+PROBABILITY_LEVELS = np.array(["Low", "Moderate", "High", "Very High"])
+RISK_LEVELS = np.array(["Low", "Moderate", "High", "Severe"])
+
+
+def _cutoffs(thresholds: dict = None) -> tuple:
+    # Per-bundle thresholds when hot reloaded, import-time values otherwise
+    if thresholds is None:
+        return MODERATE_T, HIGH_T, SEVERE_T
+    return thresholds["moderate"], thresholds["high"], thresholds["severe"]
+
+
+def probability_to_level(prob: float, thresholds: dict = None) -> str:
+    moderate_t, high_t, severe_t = _cutoffs(thresholds)
+    if prob >= severe_t:
         return "Very High"
-    elif prob >= HIGH_T:
+    elif prob >= high_t:
         return "High"
-    elif prob >= MODERATE_T:
+    elif prob >= moderate_t:
         return "Moderate"
     else:
         return "Low"
@@ -21,3 +35,71 @@ def fuse_risk(probability_level: str) -> str:
         return "Moderate"
     else:
         return "Low"
+
+
+def probability_to_level_codes(probs: np.ndarray, thresholds: dict = None) -> np.ndarray:
+    """
+    Array version of probability_to_level.
+    Returns indices into PROBABILITY_LEVELS (0=Low ... 3=Very High).
+    """
+    return np.searchsorted(np.array(_cutoffs(thresholds)), probs, side="right")
+
+
+def fuse_risk_batch(level_codes: np.ndarray) -> np.ndarray:
+    """
+    Array version of fuse_risk, indexed by probability level code.
+    """
+    return RISK_LEVELS[level_codes]
+
+
+# -----------------------------
+# Probability × severity fusion
+# -----------------------------
+SEVERITY_LEVELS = np.array(["Low", "Moderate", "High", "Severe"])
+FUSED_RISK_LEVELS = np.array(["Low", "Moderate", "High", "Severe", "Critical"])
+
+# Decision matrix from src/models/risk/risk_fusion.py (PHASE 12.2, locked policy)
+RISK_MATRIX = {
+    ("Low", "Low"): "Low",
+    ("Low", "Moderate"): "Low",
+    ("Low", "High"): "Moderate",
+    ("Low", "Very High"): "Moderate",
+
+    ("Moderate", "Low"): "Low",
+    ("Moderate", "Moderate"): "Moderate",
+    ("Moderate", "High"): "High",
+    ("Moderate", "Very High"): "High",
+
+    ("High", "Low"): "Moderate",
+    ("High", "Moderate"): "High",
+    ("High", "High"): "Severe",
+    ("High", "Very High"): "Severe",
+
+    ("Severe", "Low"): "High",
+    ("Severe", "Moderate"): "Severe",
+    ("Severe", "High"): "Severe",
+    ("Severe", "Very High"): "Critical",
+}
+
+# [severity code, probability code] -> FUSED_RISK_LEVELS code
+RISK_MATRIX_CODES = np.array([
+    [
+        list(FUSED_RISK_LEVELS).index(RISK_MATRIX[(severity, probability)])
+        for probability in PROBABILITY_LEVELS
+    ]
+    for severity in SEVERITY_LEVELS
+])
+
+
+def severity_to_level_codes(scores: np.ndarray, thresholds) -> np.ndarray:
+    """
+    Indices into SEVERITY_LEVELS; thresholds are the PHASE 11.3c cut-offs.
+    """
+    return np.searchsorted(np.asarray(thresholds), scores, side="right")
+
+
+def fuse_risk_matrix_batch(probability_codes: np.ndarray, severity_codes: np.ndarray) -> np.ndarray:
+    """
+    RISK_MATRIX as one array lookup. Returns FUSED_RISK_LEVELS labels.
+    """
+    return FUSED_RISK_LEVELS[RISK_MATRIX_CODES[severity_codes, probability_codes]]
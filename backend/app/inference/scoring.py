@@ -0,0 +1,52 @@
+import numpy as np
+
+from backend.app.inference.probability import predict_probability_columns
+from backend.app.inference.registry import REGISTRY, ModelBundle
+from backend.app.utils.feature_builder import stack_feature_values
+
+
+def score_columns(columns: dict, bundle: ModelBundle = None) -> np.ndarray:
+    """
+    Cube lookup for every row, one model call for the misses.
+    """
+    bundle = bundle or REGISTRY.bundle
+    if bundle.risk_cube is None:
+        return predict_probability_columns(columns, bundle)
+
+    probs = bundle.risk_cube.lookup_batch(columns)
+    miss = np.isnan(probs)
+    if miss.any():
+        probs[miss] = predict_probability_columns(
+            {name: values[miss] for name, values in columns.items()}, bundle
+        )
+    return probs
+
+
+def score_bundled_rows(items: list) -> np.ndarray:
+    """
+    Scores (bundle, probability_feature_values()) pairs from the
+    micro-batcher, one model call per bundle, so a request started
+    before a model swap still finishes on its own version.
+    """
+    probs = np.empty(len(items))
+    groups = {}
+    for i, (bundle, features) in enumerate(items):
+        groups.setdefault(id(bundle), (bundle, [], []))
+        groups[id(bundle)][1].append(i)
+        groups[id(bundle)][2].append(features)
+
+    for bundle, index, rows in groups.values():
+        probs[index] = predict_probability_columns(stack_feature_values(rows), bundle)
+    return probs
+
+
+def score_fused_columns(columns: dict, bundle: ModelBundle = None) -> tuple:
+    """
+    Probability and severity scores for the same rows.
+    Severity is None when the bundle has no severity models.
+    """
+    bundle = bundle or REGISTRY.bundle
+    probs = score_columns(columns, bundle)
+    if bundle.severity is None:
+        return probs, None
+    return probs, bundle.severity.score_columns(columns)
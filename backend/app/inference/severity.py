@@ -0,0 +1,125 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from backend.app.inference.compact_forest import CompactForest
+from backend.app.utils.artifacts import file_sha256
+
+# Distinct severity contexts kept before the memo is reset
+MEMO_SIZE = 65536
+
+
+class SeverityModel:
+    """
+    Severity (serious vs slight Random Forest) scored on serving features.
+
+    The severity models were trained on per-accident features the API
+    never sees (vehicles, casualties, ...). Those are held at their
+    training medians from severity_serving.json; the columns both
+    feature sets share (Speed_limit, Hour, ...) come from the request,
+    scaled as in training. Severity therefore depends only on those
+    context columns, so every distinct context is scored once and
+    memoized.
+
+    severity_score is the serious model's P(serious), the offline score
+    (PHASE 11.3a) the policy thresholds were validated on (PHASE 11.3c).
+    The fatal stage is not served: combining it would raise every score
+    above what those thresholds were set for.
+    """
+
+    def __init__(self, spec: dict, serious: CompactForest):
+        self.spec = spec
+        self.serious = serious
+        self.thresholds = np.array(spec["thresholds"], dtype=np.float64)
+
+        # Context columns: serving feature -> (mean, scale) to reach training units
+        self.context = spec["context"]
+        self.context_columns = sorted({c["source"] for c in self.context.values()})
+
+        self._serious_template, self._serious_slots = self._template(serious.feature_names)
+
+        self._memo = {}
+
+    def _template(self, features: list) -> tuple:
+        defaults = self.spec["defaults"]
+        template = np.array([defaults[name] for name in features], dtype=np.float64)
+        slots = [
+            (j, self.context_columns.index(self.context[name]["source"]), self.context[name])
+            for j, name in enumerate(features)
+            if name in self.context
+        ]
+        return template, slots
+
+    @staticmethod
+    def _fill(template: np.ndarray, slots: list, contexts: np.ndarray) -> np.ndarray:
+        X = np.tile(template, (len(contexts), 1))
+        for j, k, spec in slots:
+            X[:, j] = (contexts[:, k] - spec["mean"]) / spec["scale"]
+        return X
+
+    def _score_contexts(self, contexts: np.ndarray) -> np.ndarray:
+        X_serious = self._fill(self._serious_template, self._serious_slots, contexts)
+        return self.serious.predict_proba(X_serious)[:, 1]
+
+    def score_columns(self, columns: dict) -> np.ndarray:
+        """
+        Severity score per row of probability_feature_columns() arrays.
+        """
+        n_rows = len(columns["Hour"])
+        if not self.context_columns:
+            contexts = np.zeros((n_rows, 0))
+        else:
+            contexts = np.column_stack([
+                np.asarray(columns[c], dtype=np.float64) for c in self.context_columns
+            ])
+
+        # One opaque key per row; cheaper than np.unique(axis=0)
+        rows = np.ascontiguousarray(contexts).view(
+            np.dtype((np.void, contexts.itemsize * contexts.shape[1]))
+        ).ravel()
+        unique_rows, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        unique = contexts[first]
+        keys = [row.tobytes() for row in unique_rows]
+        scores = np.array([self._memo.get(key, np.nan) for key in keys])
+
+        missing = np.isnan(scores)
+        if missing.any():
+            scores[missing] = self._score_contexts(unique[missing])
+            if len(self._memo) + missing.sum() > MEMO_SIZE:
+                self._memo.clear()
+            for i in np.flatnonzero(missing):
+                self._memo[keys[i]] = scores[i]
+
+        return scores[inverse.ravel()]
+
+    def warm_up(self, columns: dict):
+        self.score_columns(columns)
+
+
+def load_severity_model(spec_path: Path, model_dir: Path) -> Optional[SeverityModel]:
+    """
+    Loads the serving spec and compact serious model; None when absent
+    or exported from a different pickle (severity then stays the global prior).
+    """
+    if not spec_path.exists():
+        print("Severity serving spec not found, using global severity prior.")
+        return None
+
+    with open(spec_path) as f:
+        spec = json.load(f)
+
+    serious_path = model_dir / spec["serious_model"]
+    if not serious_path.exists():
+        print("Compact severity model not found, using global severity prior.")
+        return None
+
+    serious = CompactForest.load(serious_path)
+    pickle_path = model_dir / spec["serious_pickle"]
+    if pickle_path.exists() and serious.meta.get("model_sha256") != file_sha256(pickle_path):
+        print("Compact severity model is stale (model changed), using global severity prior.")
+        return None
+
+    print("Severity models loaded.")
+    return SeverityModel(spec, serious)
@@ -1,9 +1,85 @@
-from fastapi import FastAPI
+import asyncio
+import hmac
+import json
+from time import perf_counter
 
-from backend.app.schemas import RiskRequest, RiskResponse, Explanation
-from backend.app.utils.feature_builder import build_probability_features
-from backend.app.inference.probability import predict_probability
-from backend.app.inference.risk_logic import probability_to_level, fuse_risk
+import numpy as np
+from pydantic import ValidationError
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+
+from backend.app.config import (
+    MAX_BATCH_SIZE,
+    MAX_ROUTE_POINTS,
+    ROUTE_SAMPLE_DEG,
+    MICROBATCH_WINDOW_MS,
+    MICROBATCH_MAX_SIZE,
+    ADMIN_TOKEN,
+    TILE_LIVE_MIN_ZOOM,
+)
+from backend.app.schemas import (
+    RiskRequest,
+    RiskResponse,
+    Explanation,
+    BatchRiskRequest,
+    BatchRiskResponse,
+    RouteRiskRequest,
+    FusedRiskResult,
+    FusedRiskResponse,
+)
+from backend.app.utils.feature_builder import (
+    probability_feature_values,
+    probability_feature_columns,
+    cell_feature_columns,
+    array_feature_columns,
+)
+from backend.app.utils.columnar import (
+    NPZ_MEDIA_TYPE,
+    ARROW_MEDIA_TYPE,
+    UnsupportedMediaType,
+    InvalidColumns,
+    request_media_type,
+    response_media_type,
+    decode_columns,
+    encode_columns as encode_result_columns,
+)
+from backend.app.utils.route_raster import rasterize_route, absolute_seconds
+from backend.app.inference.registry import REGISTRY
+from backend.app.inference.scoring import (
+    score_columns,
+    score_bundled_rows,
+    score_fused_columns,
+)
+from backend.app.inference.batcher import MicroBatcher
+from backend.app.inference.prediction_cache import PREDICTION_CACHE
+from backend.app.inference.process_pool import INFERENCE_POOL
+from backend.app.services.tiles import get_tile, servable_zoom, valid_tile
+from backend.app.services.weather import WEATHER_CLIENT, fetch_weather
+from backend.app.services.weather_prefetch import PREFETCHER
+from backend.app.utils.metrics import (
+    CallbackGauge,
+    TimingMiddleware,
+    render_prometheus,
+    PARSE_SECONDS,
+    BUILD_FEATURES_SECONDS,
+    LOOKUP_SECONDS,
+    BATCH_WAIT_SECONDS,
+    PREDICT_SECONDS,
+    RISK_LOGIC_SECONDS,
+)
+from backend.app.inference.risk_logic import (
+    probability_to_level,
+    fuse_risk,
+    probability_to_level_codes,
+    fuse_risk_batch,
+    PROBABILITY_LEVELS,
+    RISK_LEVELS,
+    SEVERITY_LEVELS,
+    severity_to_level_codes,
+    fuse_risk_matrix_batch,
+)
 
 
 
@@ -11,32 +87,187 @@ app = FastAPI(
     title="Road Accident Risk Prediction API",
     version="1.0"
 )
+app.add_middleware(TimingMiddleware)
+
+# Concurrent single-point requests that miss the cube share one model call
+# With the process pool, keep one batch in flight per worker
+BATCHER = MicroBatcher(
+    score_bundled_rows,
+    window_ms=MICROBATCH_WINDOW_MS,
+    max_batch=MICROBATCH_MAX_SIZE,
+    concurrency=INFERENCE_POOL.size if INFERENCE_POOL is not None else 1,
+    score_timer=PREDICT_SECONDS,
+)
+
+CallbackGauge(
+    "risk_batcher_queue_depth",
+    "Requests waiting in the micro-batcher.",
+    lambda: BATCHER.queue_depth,
+)
+CallbackGauge(
+    "risk_batcher_batches_total",
+    "Micro-batches scored.",
+    lambda: BATCHER.batches,
+    kind="counter",
+)
+if PREDICTION_CACHE is not None:
+    CallbackGauge(
+        "risk_cache_hits_total",
+        "Prediction cache hits.",
+        lambda: PREDICTION_CACHE.hits,
+        kind="counter",
+    )
+    CallbackGauge(
+        "risk_cache_misses_total",
+        "Prediction cache misses.",
+        lambda: PREDICTION_CACHE.misses,
+        kind="counter",
+    )
+    REGISTRY.on_swap(lambda old, new: PREDICTION_CACHE.clear())
+if INFERENCE_POOL is not None:
+    CallbackGauge(
+        "risk_inference_pool_live_workers",
+        "Inference worker processes alive.",
+        lambda: INFERENCE_POOL.stats()["live_workers"],
+    )
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    REGISTRY.start_watcher()
+    if INFERENCE_POOL is not None and REGISTRY.bundle.compiled is not None:
+        # Spawn workers and map the arrays before the first request
+        await asyncio.get_running_loop().run_in_executor(
+            None, INFERENCE_POOL.warm_up, REGISTRY.bundle.model_sha256
+        )
+    if PREFETCHER is not None:
+        PREFETCHER.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    if PREFETCHER is not None:
+        await PREFETCHER.stop()
+    await WEATHER_CLIENT.aclose()
+    if INFERENCE_POOL is not None:
+        INFERENCE_POOL.shutdown()
+
 
 # -----------------------------
 # Health check
 # -----------------------------
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    bundle = REGISTRY.bundle
+    return {
+        "status": "ok",
+        "model_version": bundle.version,
+        "model_loaded_at": bundle.loaded_at,
+    }
+
+
+# -----------------------------
+# Model hot reload
+# -----------------------------
+def _require_admin(x_admin_token: str):
+    # No token configured: the admin endpoints do not exist
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(
+        x_admin_token.encode(), ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.post("/admin/reload")
+def admin_reload(x_admin_token: str = Header(None)):
+    _require_admin(x_admin_token)
+
+    try:
+        REGISTRY.reload()
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Reload failed, still serving {REGISTRY.bundle.version}: {exc}",
+        )
+    return REGISTRY.status()
+
+
+@app.get("/admin/model")
+def admin_model(x_admin_token: str = Header(None)):
+    _require_admin(x_admin_token)
+    return REGISTRY.status()
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
 
 
 # -----------------------------
 # Risk prediction
 # -----------------------------
 @app.post("/predict-risk", response_model=RiskResponse)
-def predict_risk(payload: RiskRequest):
+async def predict_risk(payload: RiskRequest, http_request: Request):
+
+    # Body read + validation, stamped by TimingMiddleware
+    t0 = perf_counter()
+    received_at = http_request.scope.get("state", {}).get("received_at")
+    if received_at is not None:
+        PARSE_SECONDS.observe(t0 - received_at)
+
+    # Held for the whole request, so a model swap never changes it mid-flight
+    bundle = REGISTRY.bundle
+
+    request = payload.dict()
+
+    # Live weather only when the client sent none (timed as the weather stage);
+    # only cells read this way are worth keeping warm
+    if not payload.weather_condition:
+        request["weather_condition"] = await fetch_weather(payload.latitude, payload.longitude)
+        if PREFETCHER is not None:
+            PREFETCHER.touch(payload.latitude, payload.longitude)
+        t0 = perf_counter()
+
+    features = probability_feature_values(request)
+    t1 = perf_counter()
+    BUILD_FEATURES_SECONDS.observe(t1 - t0)
+
+    # O(1) cube lookup first, then the cache, live model for the rest
+    prob = None
+    if bundle.risk_cube is not None:
+        prob = bundle.risk_cube.lookup(features)
+
+    cache_key = None
+    if prob is None and PREDICTION_CACHE is not None:
+        cache_key = PREDICTION_CACHE.key(features, bundle.version)
+        prob = PREDICTION_CACHE.get(cache_key)
+    t2 = perf_counter()
+    LOOKUP_SECONDS.observe(t2 - t1)
 
-    X = build_probability_features(payload.dict())
+    # Misses only; the model call itself is timed by the batcher
+    if prob is None:
+        prob = float(await BATCHER.submit((bundle, features)))
+        if cache_key is not None:
+            PREDICTION_CACHE.put(cache_key, prob)
+        t3 = perf_counter()
+        BATCH_WAIT_SECONDS.observe(t3 - t2)
+        t2 = t3
 
-    prob = predict_probability(X)
-    prob_level = probability_to_level(prob)
+    prob_level = probability_to_level(prob, bundle.thresholds)
     risk_level = fuse_risk(prob_level)
+    RISK_LOGIC_SECONDS.observe(perf_counter() - t2)
 
     explanation = Explanation(
         key_factors=[
         f"Hour {payload.hour}",
         f"Weather {payload.weather_condition}"
-        if payload.weather_condition else "Weather unknown",
+        if payload.weather_condition else f"Weather {request['weather_condition']} (live)",
         f"Speed limit {payload.speed_limit}"
         if payload.speed_limit else "Speed limit unknown",
     ],
@@ -49,5 +280,348 @@ def predict_risk(payload: RiskRequest):
         probability_level=prob_level,
         risk_level=risk_level,
         severity_context="Moderate (global prior)",
-        explanation=explanation
+        explanation=explanation,
+        model_version=bundle.version,
+    )
+
+
+# -----------------------------
+# Micro-batcher stats
+# -----------------------------
+@app.get("/predict-risk/queue")
+def predict_risk_queue():
+    stats = BATCHER.stats()
+    if INFERENCE_POOL is not None:
+        stats["inference_pool"] = INFERENCE_POOL.stats()
+    return stats
+
+
+# -----------------------------
+# Prediction cache stats
+# -----------------------------
+@app.get("/predict-risk/cache")
+def predict_risk_cache():
+    if PREDICTION_CACHE is None:
+        return {"enabled": False}
+    return {"enabled": True, **PREDICTION_CACHE.stats()}
+
+
+# -----------------------------
+# Batch risk prediction
+# -----------------------------
+@app.post(
+    "/predict-risk/batch",
+    response_model=BatchRiskResponse,
+    # The body is read by hand for content negotiation; keep the JSON schema documented
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"$ref": "#/components/schemas/BatchRiskRequest"}},
+                NPZ_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+                ARROW_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def predict_risk_batch(http_request: Request):
+    """
+    JSON BatchRiskRequest, or columnar arrays (latitude, longitude,
+    hour, optional context; RiskRequest field names) as NumPy .npz
+    or Arrow IPC stream. Columnar results come back in the request's
+    format, or the columnar type named in Accept.
+    """
+    try:
+        request_type = request_media_type(http_request.headers.get("content-type"))
+        response_type = response_media_type(http_request.headers.get("accept"), request_type)
+    except UnsupportedMediaType as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+
+    body = await http_request.body()
+
+    # Decoding, features and result building of up to MAX_BATCH_SIZE
+    # points would stall the event loop (micro-batcher, weather client)
+    return await run_in_threadpool(_score_batch, body, request_type, response_type)
+
+
+def _score_batch(body: bytes, request_type, response_type) -> Response:
+    try:
+        if request_type is None:
+            try:
+                payload = BatchRiskRequest.parse_raw(body or b"{}")
+            except ValidationError as exc:
+                raise RequestValidationError(exc.errors())
+            n_points = len(payload.points)
+        else:
+            arrays = decode_columns(body, request_type)
+            n_points = len(arrays["latitude"])
+    except InvalidColumns as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    if n_points == 0:
+        raise HTTPException(status_code=422, detail="points must not be empty")
+    if n_points > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {n_points} points exceeds limit of {MAX_BATCH_SIZE}",
+        )
+
+    bundle = REGISTRY.bundle
+
+    # One feature pass, one model call, array level mapping
+    if request_type is None:
+        columns = probability_feature_columns([p.dict() for p in payload.points])
+    else:
+        columns = array_feature_columns(arrays)
+
+    probs = score_columns(columns, bundle)
+
+    level_codes = probability_to_level_codes(probs, bundle.thresholds)
+
+    if response_type is not None:
+        # fuse_risk_batch maps level codes 1:1 onto RISK_LEVELS
+        content = encode_result_columns(
+            {"probability_score": probs},
+            {
+                "probability_level": (level_codes, PROBABILITY_LEVELS),
+                "risk_level": (level_codes, RISK_LEVELS),
+            },
+            {"severity_context": "Moderate (global prior)", "model_version": bundle.version},
+            response_type,
+        )
+        return Response(
+            content=content,
+            media_type=response_type,
+            headers={"X-Model-Version": bundle.version},
+        )
+
+    prob_levels = PROBABILITY_LEVELS[level_codes]
+    risk_levels = fuse_risk_batch(level_codes)
+
+    # BatchRiskResponse layout, serialized here rather than validated per result
+    results = [
+        {
+            "probability_score": score,
+            "probability_level": prob_level,
+            "risk_level": risk_level,
+        }
+        for score, prob_level, risk_level in zip(
+            probs.round(4).tolist(),
+            prob_levels.tolist(),
+            risk_levels.tolist(),
+        )
+    ]
+
+    return JSONResponse({
+        "count": n_points,
+        "results": results,
+        "severity_context": "Moderate (global prior)",
+        "model_version": bundle.version,
+    })
+
+
+# -----------------------------
+# Fused probability × severity risk
+# -----------------------------
+@app.post("/predict-risk/fused", response_model=FusedRiskResponse)
+def predict_risk_fused(payload: BatchRiskRequest):
+
+    n_points = len(payload.points)
+    if n_points == 0:
+        raise HTTPException(status_code=422, detail="points must not be empty")
+    if n_points > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {n_points} points exceeds limit of {MAX_BATCH_SIZE}",
+        )
+
+    bundle = REGISTRY.bundle
+
+    # Both models on the same feature columns, then one matrix lookup
+    columns = probability_feature_columns([p.dict() for p in payload.points])
+    probs, severity = score_fused_columns(columns, bundle)
+
+    prob_codes = probability_to_level_codes(probs, bundle.thresholds)
+    if severity is None:
+        # Global prior (PHASE 12.2a): every point at Moderate severity
+        severity_codes = np.ones(n_points, dtype=np.int64)
+        severity_scores = [None] * n_points
+        severity_context = "Moderate (global prior)"
+    else:
+        severity_codes = severity_to_level_codes(severity, bundle.severity.thresholds)
+        severity_scores = severity.round(4).tolist()
+        severity_context = "Per-point (serious vs slight severity model)"
+
+    risk_levels = fuse_risk_matrix_batch(prob_codes, severity_codes)
+
+    results = [
+        FusedRiskResult(
+            probability_score=score,
+            probability_level=prob_level,
+            severity_score=severity_score,
+            severity_level=severity_level,
+            risk_level=risk_level,
+        )
+        for score, prob_level, severity_score, severity_level, risk_level in zip(
+            probs.round(4).tolist(),
+            PROBABILITY_LEVELS[prob_codes].tolist(),
+            severity_scores,
+            SEVERITY_LEVELS[severity_codes].tolist(),
+            risk_levels.tolist(),
+        )
+    ]
+
+    return FusedRiskResponse(
+        count=n_points,
+        results=results,
+        severity_context=severity_context,
+        model_version=bundle.version,
     )
+
+
+# -----------------------------
+# Route risk (NDJSON stream)
+# -----------------------------
+@app.post("/predict-risk/route")
+def predict_risk_route(payload: RouteRiskRequest):
+
+    n_points = len(payload.points)
+    if n_points < 2:
+        raise HTTPException(status_code=422, detail="route needs at least 2 points")
+    if n_points > MAX_ROUTE_POINTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Route of {n_points} points exceeds limit of {MAX_ROUTE_POINTS}",
+        )
+
+    bundle = REGISTRY.bundle
+
+    seconds, utc_offsets = zip(*(absolute_seconds(p.timestamp) for p in payload.points))
+    raster = rasterize_route(
+        [p.latitude for p in payload.points],
+        [p.longitude for p in payload.points],
+        seconds,
+        utc_offsets,
+        step_deg=ROUTE_SAMPLE_DEG,
+    )
+
+    # Score every unique (cell, hour) on the route once
+    cells = np.column_stack([raster["lat_bin"], raster["lon_bin"], raster["hour"]])
+    unique_cells, cell_index = np.unique(cells, axis=0, return_inverse=True)
+    cell_probs = score_columns(cell_feature_columns(
+        unique_cells[:, 0], unique_cells[:, 1], unique_cells[:, 2], payload.dict()
+    ), bundle)
+
+    return StreamingResponse(
+        _route_ndjson(raster, cell_probs, cell_index.ravel(), bundle),
+        media_type="application/x-ndjson",
+    )
+
+
+def _route_ndjson(raster: dict, cell_probs: np.ndarray, cell_index: np.ndarray, bundle):
+    """
+    One line per segment, then a summary line.
+    Rows of `raster` are sorted by segment, every segment has at least one.
+    """
+    probs = cell_probs[cell_index]
+    exposure_km = raster["exposure_km"]
+    segment_km = raster["segment_km"]
+    n_segments = len(segment_km)
+
+    starts = np.searchsorted(raster["segment"], np.arange(n_segments))
+    n_cells = np.diff(np.append(starts, len(probs)))
+    seg_max = np.maximum.reduceat(probs, starts)
+    seg_mean = np.add.reduceat(probs, starts) / n_cells
+    # Zero-length segments fall back to the plain mean
+    seg_weighted = seg_mean.copy()
+    moving = segment_km > 0
+    seg_weighted[moving] = (
+        np.add.reduceat(probs * exposure_km, starts)[moving] / segment_km[moving]
+    )
+    seg_levels = fuse_risk_batch(probability_to_level_codes(seg_max, bundle.thresholds))
+
+    for k in range(n_segments):
+        yield json.dumps({
+            "type": "segment",
+            "index": k,
+            "distance_km": round(float(segment_km[k]), 3),
+            "cells": int(n_cells[k]),
+            "max_risk": round(float(seg_max[k]), 4),
+            "mean_risk": round(float(seg_mean[k]), 4),
+            "exposure_weighted_risk": round(float(seg_weighted[k]), 4),
+            "risk_level": str(seg_levels[k]),
+        }) + "\n"
+
+    route_max = float(cell_probs.max())
+    route_mean = float(cell_probs.mean())
+    route_km = exposure_km.sum()
+    route_weighted = (
+        float((probs * exposure_km).sum() / route_km) if route_km > 0 else route_mean
+    )
+    yield json.dumps({
+        "type": "summary",
+        "segments": n_segments,
+        "unique_cells": len(cell_probs),
+        "distance_km": round(float(segment_km.sum()), 3),
+        "max_risk": round(route_max, 4),
+        "mean_risk": round(route_mean, 4),
+        "exposure_weighted_risk": round(route_weighted, 4),
+        "risk_level": fuse_risk(probability_to_level(route_max, bundle.thresholds)),
+        "severity_context": "Moderate (global prior)",
+        "model_version": bundle.version,
+    }) + "\n"
+
+
+# -----------------------------
+# Heatmap tiles
+# -----------------------------
+def _tile_response(z, x, y, hour, weather, ext, media_type):
+    if not valid_tile(z, x, y):
+        raise HTTPException(status_code=404, detail=f"No tile {z}/{x}/{y}")
+
+    bundle = REGISTRY.bundle
+    if not servable_zoom(z, bundle):
+        raise HTTPException(
+            status_code=404,
+            detail=f"No risk cube loaded; tiles start at zoom {TILE_LIVE_MIN_ZOOM}",
+        )
+
+    # Unknown values would score as all-zero one-hots and fill the tile cache
+    known = bundle.categories.get("Weather_Conditions")
+    if known is not None and weather not in known:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown weather '{weather}', expected one of {sorted(known)}",
+        )
+
+    return Response(
+        content=get_tile(z, x, y, hour, weather, ext, bundle),
+        media_type=media_type,
+        headers={
+            "Cache-Control": "public, max-age=3600",
+            "ETag": f'"{bundle.version}-{weather}-{hour}-{z}-{x}-{y}-{ext}"',
+            "X-Model-Version": bundle.version,
+        },
+    )
+
+
+@app.get("/tiles/{z}/{x}/{y}.png")
+def risk_tile_png(
+    z: int,
+    x: int,
+    y: int,
+    hour: int = Query(12, ge=0, le=23),
+    weather: str = Query("Fine", max_length=64),
+):
+    return _tile_response(z, x, y, hour, weather, "png", "image/png")
+
+
+@app.get("/tiles/{z}/{x}/{y}.json")
+def risk_tile_json(
+    z: int,
+    x: int,
+    y: int,
+    hour: int = Query(12, ge=0, le=23),
+    weather: str = Query("Fine", max_length=64),
+):
+    return _tile_response(z, x, y, hour, weather, "json", "application/json")
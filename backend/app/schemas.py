@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import List
 from typing import Optional 
@@ -21,4 +22,53 @@ class RiskResponse(BaseModel):
     probability_level: str
     risk_level: str
     severity_context: str
-    explanation: Explanation 
+    explanation: Explanation
+    model_version: str
+
+
+class BatchRiskRequest(BaseModel):
+    points: List[RiskRequest]
+
+
+class BatchRiskResult(BaseModel):
+    probability_score: float
+    probability_level: str
+    risk_level: str
+
+
+class BatchRiskResponse(BaseModel):
+    count: int
+    results: List[BatchRiskResult]
+    severity_context: str
+    model_version: str
+
+
+class FusedRiskResult(BaseModel):
+    probability_score: float
+    probability_level: str
+    # None when severity falls back to the global prior
+    severity_score: Optional[float]
+    severity_level: str
+    risk_level: str
+
+
+class FusedRiskResponse(BaseModel):
+    count: int
+    results: List[FusedRiskResult]
+    severity_context: str
+    model_version: str
+
+
+class RoutePoint(BaseModel):
+    latitude: float
+    longitude: float
+    # ISO 8601 or epoch seconds; hour of day is taken from its own wall clock
+    timestamp: datetime
+
+
+class RouteRiskRequest(BaseModel):
+    points: List[RoutePoint]
+    # Context shared by the whole route
+    speed_limit: Optional[int] = None
+    road_type: Optional[str] = None
+    weather_condition: Optional[str] = None
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from backend.app.config import TILE_CACHE_DIR, TILE_LIVE_MIN_ZOOM
+from backend.app.inference.registry import REGISTRY, ModelBundle
+from backend.app.inference.risk_logic import probability_to_level_codes
+from backend.app.inference.scoring import score_columns
+from backend.app.utils.feature_builder import cell_feature_columns
+from backend.app.utils.png import encode_png_rgba
+
+TILE_SIZE = 256
+MAX_ZOOM = 18
+
+# Probability level colours, as in ui/components/heatmap_legend.py
+TILE_ALPHA = 150
+LEVEL_COLORS = np.array([
+    [16, 185, 129, TILE_ALPHA],   # Low
+    [245, 158, 11, TILE_ALPHA],   # Moderate
+    [249, 115, 22, TILE_ALPHA],   # High
+    [220, 38, 38, TILE_ALPHA],    # Very High
+    [0, 0, 0, 0],                 # Outside the scored grid
+], dtype=np.uint8)
+OUTSIDE = len(LEVEL_COLORS) - 1
+
+
+# -----------------------------
+# Tile geometry (Web Mercator)
+# -----------------------------
+def valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def servable_zoom(z: int, bundle: ModelBundle) -> bool:
+    """
+    Low-zoom tiles are only served from the risk cube, not scored live.
+    """
+    return bundle.risk_cube is not None or z >= TILE_LIVE_MIN_ZOOM
+
+
+def tile_bins(z: int, x: int, y: int) -> tuple:
+    """
+    lat_bin for every pixel row and lon_bin for every pixel column
+    (pixel centres, serving grid int(deg * 10)).
+    """
+    world = TILE_SIZE * 2 ** z
+    pixels = np.arange(TILE_SIZE) + 0.5
+
+    lon = (x * TILE_SIZE + pixels) / world * 360.0 - 180.0
+    merc_y = np.pi * (1.0 - 2.0 * (y * TILE_SIZE + pixels) / world)
+    lat = np.degrees(np.arctan(np.sinh(merc_y)))
+
+    return np.trunc(lat * 10).astype(np.int64), np.trunc(lon * 10).astype(np.int64)
+
+
+def risk_grid(z: int, x: int, y: int, hour: int, weather: str, bundle: ModelBundle) -> dict:
+    """
+    Probabilities for the unique cells a tile covers.
+    Cells outside the risk cube extent are NaN when a cube is loaded.
+    """
+    lat_bins, lon_bins = tile_bins(z, x, y)
+    lat_u, row_index = np.unique(lat_bins, return_inverse=True)
+    lon_u, col_index = np.unique(lon_bins, return_inverse=True)
+
+    lat_grid, lon_grid = np.meshgrid(lat_u, lon_u, indexing="ij")
+    inside = np.ones(lat_grid.shape, dtype=bool)
+    cube = bundle.risk_cube
+    if cube is not None:
+        i = lat_grid - cube.lat_min
+        j = lon_grid - cube.lon_min
+        inside = (i >= 0) & (i < cube.n_lat) & (j >= 0) & (j < cube.n_lon)
+
+    probs = np.full(lat_grid.shape, np.nan)
+    if inside.any():
+        columns = cell_feature_columns(
+            lat_grid[inside],
+            lon_grid[inside],
+            np.full(inside.sum(), hour),
+            {"weather_condition": weather},
+        )
+        probs[inside] = score_columns(columns, bundle)
+
+    return {
+        "lat_bins": lat_u,
+        "lon_bins": lon_u,
+        "probs": probs,
+        "row_index": row_index.ravel(),
+        "col_index": col_index.ravel(),
+    }
+
+
+def render_png(grid: dict, bundle: ModelBundle) -> bytes:
+    probs = grid["probs"]
+    codes = np.full(probs.shape, OUTSIDE, dtype=np.intp)
+    scored = ~np.isnan(probs)
+    codes[scored] = probability_to_level_codes(probs[scored], bundle.thresholds)
+
+    cell_rgba = LEVEL_COLORS[codes]
+    image = cell_rgba[grid["row_index"][:, None], grid["col_index"][None, :]]
+    return encode_png_rgba(np.ascontiguousarray(image))
+
+
+def render_json(grid: dict, z: int, x: int, y: int, hour: int, weather: str,
+                bundle: ModelBundle) -> bytes:
+    probs = np.round(grid["probs"], 4)
+    return json.dumps({
+        "z": z,
+        "x": x,
+        "y": y,
+        "hour": hour,
+        "weather": weather,
+        "model_version": bundle.version,
+        "lat_bins": grid["lat_bins"].tolist(),
+        "lon_bins": grid["lon_bins"].tolist(),
+        # rows follow lat_bins, columns lon_bins; null outside the grid
+        "risk": [[None if np.isnan(p) else p for p in row] for row in probs.tolist()],
+    }).encode()
+
+
+# -----------------------------
+# On-disk cache
+# -----------------------------
+class TileCache:
+    """
+    Rendered tiles under root/<model version>/<weather>/<hour>/<z>/<x>/<y>.<ext>.
+    The model version covers thresholds too, since they set the colours.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def prune(self, keep_version: str):
+        """
+        Removes tiles of every other model version.
+        """
+        for old in self.root.iterdir():
+            if old.is_dir() and old.name != keep_version:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def path(self, version, z, x, y, hour, weather, ext) -> Path:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", weather).strip("_")
+        if slug != weather:
+            # Keep distinct weather strings from sharing a directory
+            slug += "-" + hashlib.sha1(weather.encode()).hexdigest()[:8]
+        return self.root / version / slug / str(hour) / str(z) / str(x) / f"{y}.{ext}"
+
+    def get(self, path: Path) -> Optional[bytes]:
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Atomic publish so concurrent readers never see a partial tile
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+
+TILE_CACHE = TileCache(TILE_CACHE_DIR)
+TILE_CACHE.prune(REGISTRY.bundle.version)
+REGISTRY.on_swap(lambda old, new: TILE_CACHE.prune(new.version))
+
+
+def get_tile(z: int, x: int, y: int, hour: int, weather: str, ext: str,
+             bundle: ModelBundle) -> bytes:
+    """
+    Cached tile bytes, rendering and storing them on a miss.
+    """
+    path = TILE_CACHE.path(bundle.version, z, x, y, hour, weather, ext)
+    data = TILE_CACHE.get(path)
+    if data is not None:
+        return data
+
+    grid = risk_grid(z, x, y, hour, weather, bundle)
+    if ext == "png":
+        data = render_png(grid, bundle)
+    else:
+        data = render_json(grid, z, x, y, hour, weather, bundle)
+
+    TILE_CACHE.put(path, data)
+    return data
@@ -8,47 +8,252 @@
 # --------------------------------------------------
 # 1. backend/app/services/weather.py
 # --------------------------------------------------
-import requests
-from backend.app.config import WEATHER_API_KEY
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from time import perf_counter
+from typing import Optional
+
+import httpx
+from backend.app.config import (
+    OPENWEATHER_BASE_URL,
+    WEATHER_API_KEY,
+    WEATHER_TIMEOUT_S,
+    WEATHER_TTL_S,
+    WEATHER_STALE_S,
+    WEATHER_CACHE_SIZE,
+    WEATHER_POOL_SIZE,
+    WEATHER_BREAKER_FAILURES,
+    WEATHER_BREAKER_RESET_S,
+)
+from backend.app.utils.metrics import Counter, WEATHER_SECONDS, WEATHER_ERRORS
 
 # Example shown for OpenWeatherMap
-BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
+BASE_URL = f"{OPENWEATHER_BASE_URL}/data/2.5/weather"
+
+# Map API response to ML categories
+WEATHER_MAPPING = {
+    "Clear": "Fine no high winds",
+    "Clouds": "Fine no high winds",
+    "Rain": "Raining",
+    "Drizzle": "Raining",
+    "Thunderstorm": "Raining",
+    "Snow": "Snowing",
+    "Fog": "Fog or mist",
+    "Mist": "Fog or mist",
+}
+DEFAULT_WEATHER = "Fine no high winds"
+
+WEATHER_LOOKUPS = Counter(
+    "risk_weather_lookups_total",
+    "Weather lookups by outcome (fresh, stale, fetched, fallback).",
+    labelnames=("outcome",),
+)
+FRESH = WEATHER_LOOKUPS.labels("fresh")
+STALE = WEATHER_LOOKUPS.labels("stale")
+FETCHED = WEATHER_LOOKUPS.labels("fetched")
+FALLBACK = WEATHER_LOOKUPS.labels("fallback")
 
 
-def fetch_weather(lat: float, lon: float) -> str:
+def map_weather(data: dict) -> str:
     """
-    Fetch current weather and map it to ML Weather_Conditions
-    Returns a string compatible with training categories
+    OpenWeather current-weather payload -> training Weather_Conditions
     """
-    try:
-        params = {
-            "lat": lat,
-            "lon": lon,
-            "appid": WEATHER_API_KEY,
-        }
-        r = requests.get(BASE_URL, params=params, timeout=5)
-        r.raise_for_status()
-        data = r.json()
+    main = data.get("weather", [{}])[0].get("main", "Clear")
+    return WEATHER_MAPPING.get(main, DEFAULT_WEATHER)
+
+
+def weather_cell(lat: float, lon: float) -> tuple:
+    # Same grid as the model (feature_builder.py)
+    return int(lat * 10), int(lon * 10)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive errors; after `reset_s`
+    lets one trial call through (half-open) to test recovery.
+    """
+
+    def __init__(self, failures: int, reset_s: float):
+        self.failures = failures
+        self.reset_s = reset_s
+        self.consecutive = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self._trial else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self._trial and time.monotonic() - self.opened_at >= self.reset_s:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive += 1
+            if self._trial or self.consecutive >= self.failures:
+                self.opened_at = time.monotonic()
+                self._trial = False
+
+
+class WeatherClient:
+    """
+    Async OpenWeather client for the request path.
+
+    - one pooled httpx.AsyncClient (keep-alive connections)
+    - per grid cell cache: fresh for `ttl_s`, then served stale for
+      up to `stale_s` more while one background refresh runs
+    - concurrent misses for a cell share a single upstream call
+    - circuit breaker: while the provider is failing or slow, the
+      last known value (or the default) is returned immediately
+    """
+
+    def __init__(self, base_url: str, api_key: str, ttl_s: float, stale_s: float,
+                 timeout_s: float, max_cells: int, pool_size: int, breaker: CircuitBreaker):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.ttl_s = ttl_s
+        self.stale_s = stale_s
+        self.timeout_s = timeout_s
+        self.max_cells = max_cells
+        self.pool_size = pool_size
+        self.breaker = breaker
+
+        self._client = None
+        self._cache = OrderedDict()  # cell -> (condition, fetched_at)
+        self._inflight = {}          # cell -> asyncio.Task
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_s,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                ),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # -----------------------------
+    # Cache
+    # -----------------------------
+    def cached(self, cell: tuple) -> Optional[tuple]:
+        return self._cache.get(cell)
+
+    def refreshing(self, cell: tuple) -> bool:
+        return cell in self._inflight
+
+    def store(self, cell: tuple, condition: str):
+        self._cache[cell] = (condition, time.monotonic())
+        self._cache.move_to_end(cell)
+        while len(self._cache) > self.max_cells:
+            self._cache.popitem(last=False)
 
-        main = data.get("weather", [{}])[0].get("main", "Clear")
+    # -----------------------------
+    # Upstream
+    # -----------------------------
+    async def _fetch(self, cell: tuple, lat: float, lon: float) -> str:
+        try:
+            if not self.breaker.allow():
+                raise RuntimeError("weather circuit open")
 
-        # Map API response to ML categories
-        mapping = {
-            "Clear": "Fine no high winds",
-            "Clouds": "Fine no high winds",
-            "Rain": "Raining",
-            "Drizzle": "Raining",
-            "Thunderstorm": "Raining",
-            "Snow": "Snowing",
-            "Fog": "Fog or mist",
-            "Mist": "Fog or mist",
-        }
+            params = {"lat": lat, "lon": lon, "appid": self.api_key}
+            try:
+                r = await self._http().get(self.base_url, params=params)
+                r.raise_for_status()
+                condition = map_weather(r.json())
+            except Exception:
+                self.breaker.record_failure()
+                WEATHER_ERRORS.inc()
+                raise
 
-        return mapping.get(main, "Fine no high winds")
+            self.breaker.record_success()
+            self.store(cell, condition)
+            return condition
+        finally:
+            self._inflight.pop(cell, None)
 
-    except Exception:
-        # Fallback ensures API never breaks inference
-        return "Fine no high winds"
+    def refresh(self, cell: tuple, lat: float, lon: float) -> asyncio.Task:
+        """
+        Starts (or joins) the single upstream call for this cell.
+        """
+        task = self._inflight.get(cell)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._fetch(cell, lat, lon))
+            # Background refreshes may fail with nobody awaiting them
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[cell] = task
+        return task
 
+    async def get(self, lat: float, lon: float) -> str:
+        cell = weather_cell(lat, lon)
+        entry = self._cache.get(cell)
 
+        if entry is not None:
+            condition, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl_s:
+                FRESH.inc()
+                return condition
+            if age < self.ttl_s + self.stale_s:
+                # Stale-while-revalidate
+                self.refresh(cell, lat, lon)
+                STALE.inc()
+                return condition
 
+        try:
+            # shield: a caller timing out must not cancel the shared call
+            condition = await asyncio.wait_for(
+                asyncio.shield(self.refresh(cell, lat, lon)), self.timeout_s
+            )
+            FETCHED.inc()
+            return condition
+        except Exception:
+            # Fallback ensures API never breaks inference
+            FALLBACK.inc()
+            return entry[0] if entry is not None else DEFAULT_WEATHER
+
+
+WEATHER_CLIENT = WeatherClient(
+    BASE_URL,
+    WEATHER_API_KEY,
+    ttl_s=WEATHER_TTL_S,
+    stale_s=WEATHER_STALE_S,
+    timeout_s=WEATHER_TIMEOUT_S,
+    max_cells=WEATHER_CACHE_SIZE,
+    pool_size=WEATHER_POOL_SIZE,
+    breaker=CircuitBreaker(WEATHER_BREAKER_FAILURES, WEATHER_BREAKER_RESET_S),
+)
+
+
+async def fetch_weather(lat: float, lon: float) -> str:
+    """
+    Fetch current weather and map it to ML Weather_Conditions
+    Returns a string compatible with training categories
+    """
+    start = perf_counter()
+    try:
+        return await WEATHER_CLIENT.get(lat, lon)
+    finally:
+        WEATHER_SECONDS.observe(perf_counter() - start)
@@ -0,0 +1,195 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from backend.app.config import (
+    WEATHER_PREFETCH_ENABLED,
+    WEATHER_PREFETCH_REFRESH_S,
+    WEATHER_PREFETCH_ACTIVE_S,
+    WEATHER_PREFETCH_RATE,
+    WEATHER_PREFETCH_TICK_S,
+)
+from backend.app.services.weather import WEATHER_CLIENT, WeatherClient, weather_cell
+from backend.app.utils.metrics import CallbackGauge, Counter
+
+PREFETCH_REFRESHES = Counter(
+    "risk_weather_prefetch_refreshes_total",
+    "Upstream weather refreshes started by the prefetcher.",
+)
+
+
+class TokenBucket:
+    """
+    Global rate limit: `rate` calls per second, bursts up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class WeatherPrefetcher:
+    """
+    Keeps weather fresh for cells that recently received traffic.
+
+    Cells are touched by requests that read live weather (no
+    weather_condition sent); a background task refreshes every
+    active cell whose cached weather is older than `refresh_s` (set
+    just under the provider's update cadence and the client TTL),
+    oldest first and within the global rate limit.
+    Results land in the WeatherClient cache that fetch_weather reads.
+    """
+
+    def __init__(self, client: WeatherClient, refresh_s: float, active_s: float,
+                 rate: float, tick_s: float = 1.0):
+        self.client = client
+        self.refresh_s = refresh_s
+        self.active_s = active_s
+        self.tick_s = tick_s
+        self.bucket = TokenBucket(rate, burst=max(1.0, rate))
+
+        self._active = OrderedDict()  # cell -> (lat, lon, first_seen, last_seen)
+        self._task = None
+
+    @property
+    def active_cells(self) -> int:
+        return len(self._active)
+
+    def touch(self, lat: float, lon: float):
+        """
+        Marks the cell as active. O(1), safe to call on every request.
+        """
+        cell = weather_cell(lat, lon)
+        now = time.monotonic()
+        previous = self._active.get(cell)
+        first_seen = now if previous is None else previous[2]
+        self._active[cell] = (lat, lon, first_seen, now)
+        self._active.move_to_end(cell)
+        while len(self._active) > self.client.max_cells:
+            self._active.popitem(last=False)
+
+    # -----------------------------
+    # Scheduling
+    # -----------------------------
+    def _age(self, cell: tuple, now: float) -> Optional[float]:
+        entry = self.client.cached(cell)
+        return None if entry is None else now - entry[1]
+
+    def due_cells(self) -> list:
+        """
+        Active cells needing a refresh, never-fetched and oldest first.
+        Expires cells without traffic for `active_s`.
+        """
+        now = time.monotonic()
+        while self._active:
+            cell, (_, _, _, last_seen) = next(iter(self._active.items()))
+            if now - last_seen < self.active_s:
+                break
+            self._active.popitem(last=False)
+
+        due = []
+        for cell, (lat, lon, _, _) in self._active.items():
+            age = self._age(cell, now)
+            if self.client.refreshing(cell):
+                continue
+            if age is None or age >= self.refresh_s:
+                due.append((float("inf") if age is None else age, cell, lat, lon))
+        due.sort(reverse=True)
+        return due
+
+    async def run(self):
+        while True:
+            for _, cell, lat, lon in self.due_cells():
+                await self.bucket.acquire()
+                # Traffic may have refreshed it while we waited for a token
+                age = self._age(cell, time.monotonic())
+                if age is not None and age < self.refresh_s:
+                    continue
+                self.client.refresh(cell, lat, lon)
+                PREFETCH_REFRESHES.inc()
+            await asyncio.sleep(self.tick_s)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def coverage(self) -> float:
+        """
+        Share of active cells whose cached weather is still fresh.
+        """
+        if not self._active:
+            return 1.0
+        now = time.monotonic()
+        fresh = 0
+        for cell in list(self._active):
+            age = self._age(cell, now)
+            fresh += age is not None and age < self.client.ttl_s
+        return fresh / len(self._active)
+
+    def lag(self) -> float:
+        """
+        Seconds the most overdue active cell is past its refresh time.
+        Never-fetched cells count from when they were first seen.
+        """
+        now = time.monotonic()
+        worst = 0.0
+        for cell, (_, _, first_seen, _) in list(self._active.items()):
+            age = self._age(cell, now)
+            overdue = now - first_seen if age is None else age - self.refresh_s
+            worst = max(worst, overdue)
+        return worst
+
+
+PREFETCHER = (
+    WeatherPrefetcher(
+        WEATHER_CLIENT,
+        refresh_s=WEATHER_PREFETCH_REFRESH_S,
+        active_s=WEATHER_PREFETCH_ACTIVE_S,
+        rate=WEATHER_PREFETCH_RATE,
+        tick_s=WEATHER_PREFETCH_TICK_S,
+    )
+    if WEATHER_PREFETCH_ENABLED
+    else None
+)
+
+if PREFETCHER is not None:
+    CallbackGauge(
+        "risk_weather_prefetch_active_cells",
+        "Grid cells with traffic in the active window.",
+        lambda: PREFETCHER.active_cells,
+    )
+    CallbackGauge(
+        "risk_weather_prefetch_coverage_ratio",
+        "Share of active cells with fresh cached weather.",
+        PREFETCHER.coverage,
+    )
+    CallbackGauge(
+        "risk_weather_prefetch_lag_seconds",
+        "How far the most overdue active cell is past its refresh time.",
+        PREFETCHER.lag,
+    )
@@ -0,0 +1,184 @@
+import io
+from typing import Optional
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Arrow IPC is optional, NumPy .npz always works
+    pa = None
+
+# -----------------------------
+# Media types
+# -----------------------------
+NPZ_MEDIA_TYPE = "application/x-npz"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+COLUMNAR_MEDIA_TYPES = (NPZ_MEDIA_TYPE, ARROW_MEDIA_TYPE)
+
+# Request columns: exactly the RiskRequest fields, so a batch scores
+# the same whether it arrives as JSON or columnar
+REQUIRED_COLUMNS = ["latitude", "longitude", "hour"]
+NUMERIC_CONTEXT_COLUMNS = ["speed_limit"]
+STRING_CONTEXT_COLUMNS = ["road_type", "weather_condition"]
+
+
+class UnsupportedMediaType(ValueError):
+    """
+    Body in a format this server cannot decode.
+    """
+
+
+class InvalidColumns(ValueError):
+    """
+    Columnar body that decodes but does not describe a batch.
+    """
+
+
+def _base_type(header: Optional[str]) -> str:
+    return (header or "").split(";")[0].strip().lower()
+
+
+def request_media_type(content_type: Optional[str]) -> Optional[str]:
+    """
+    Columnar media type of a request body, None for JSON.
+    """
+    media_type = _base_type(content_type)
+    if media_type in COLUMNAR_MEDIA_TYPES:
+        return media_type
+    if media_type in ("", "application/json") or media_type.endswith("+json"):
+        return None
+    raise UnsupportedMediaType(f"Unsupported content type: {media_type}")
+
+
+def response_media_type(accept: Optional[str], request_type: Optional[str]) -> Optional[str]:
+    """
+    A columnar type named in Accept wins; otherwise answer in the
+    request's own format (None = JSON).
+    """
+    for part in (accept or "").split(","):
+        if _base_type(part) in COLUMNAR_MEDIA_TYPES:
+            return _base_type(part)
+    return request_type
+
+
+def _require_arrow():
+    if pa is None:
+        raise UnsupportedMediaType("Arrow IPC needs pyarrow installed on the server")
+
+
+# -----------------------------
+# Decoding
+# -----------------------------
+def _decode_npz(body: bytes) -> dict:
+    # allow_pickle=False: object arrays are rejected, strings must be fixed width
+    try:
+        with np.load(io.BytesIO(body), allow_pickle=False) as npz:
+            return {name: npz[name] for name in npz.files}
+    except Exception as exc:
+        raise InvalidColumns(f"Not a readable .npz body: {exc}")
+
+
+def _arrow_strings(column) -> np.ndarray:
+    # Dictionary-encode in Arrow, convert only the distinct labels
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    encoded = pc.dictionary_encode(pc.fill_null(column, ""))
+    labels = np.asarray(encoded.dictionary.to_numpy(zero_copy_only=False), dtype=str)
+    if len(labels) == 0:
+        return np.full(len(column), "")
+    return labels[encoded.indices.to_numpy()]
+
+
+def _decode_arrow(body: bytes) -> dict:
+    _require_arrow()
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except Exception as exc:
+        raise InvalidColumns(f"Not a readable Arrow IPC stream: {exc}")
+
+    arrays = {}
+    for name in table.column_names:
+        column = table.column(name).combine_chunks()
+        if name in STRING_CONTEXT_COLUMNS:
+            arrays[name] = _arrow_strings(column)
+        elif name in NUMERIC_CONTEXT_COLUMNS:
+            # Null -> NaN, which feature_builder treats as missing
+            arrays[name] = pc.fill_null(column.cast(pa.float64()), np.nan).to_numpy()
+        elif name in REQUIRED_COLUMNS:
+            if column.null_count:
+                raise InvalidColumns(f"{name} must not contain nulls")
+            arrays[name] = column.to_numpy()
+    return arrays
+
+
+def decode_columns(body: bytes, media_type: str) -> dict:
+    """
+    Request arrays keyed by RiskRequest field name, all of one length.
+    Unknown columns are ignored.
+    """
+    if media_type == ARROW_MEDIA_TYPE:
+        arrays = _decode_arrow(body)
+    else:
+        arrays = _decode_npz(body)
+
+    missing = [name for name in REQUIRED_COLUMNS if name not in arrays]
+    if missing:
+        raise InvalidColumns(f"Missing columns: {missing}")
+
+    known = REQUIRED_COLUMNS + NUMERIC_CONTEXT_COLUMNS + STRING_CONTEXT_COLUMNS
+    arrays = {name: arrays[name] for name in known if name in arrays}
+
+    n_rows = len(arrays["latitude"])
+    for name, values in arrays.items():
+        if values.ndim != 1 or len(values) != n_rows:
+            raise InvalidColumns(f"{name} must be a 1-D array of {n_rows} values")
+        if name in STRING_CONTEXT_COLUMNS:
+            if values.dtype.kind == "S":
+                arrays[name] = np.char.decode(values, "utf-8")
+            elif values.dtype.kind != "U":
+                raise InvalidColumns(f"{name} must be a string column")
+        elif values.dtype.kind not in "iuf":
+            raise InvalidColumns(f"{name} must be numeric")
+
+    for name in REQUIRED_COLUMNS:
+        if not np.isfinite(arrays[name]).all():
+            raise InvalidColumns(f"{name} must be finite")
+
+    return arrays
+
+
+# -----------------------------
+# Encoding
+# -----------------------------
+def encode_columns(columns: dict, labels: dict, metadata: dict, media_type: str) -> bytes:
+    """
+    Result arrays in the negotiated format. Entries of `labels` are
+    (codes, vocabulary) pairs: Arrow dictionary columns, or the codes
+    plus a `<name>_labels` array in .npz. `metadata` holds strings
+    (Arrow schema metadata, 0-d arrays in .npz).
+    """
+    if media_type == ARROW_MEDIA_TYPE:
+        _require_arrow()
+        fields = {name: pa.array(values) for name, values in columns.items()}
+        for name, (codes, vocabulary) in labels.items():
+            fields[name] = pa.DictionaryArray.from_arrays(
+                pa.array(codes.astype(np.int8)), pa.array(vocabulary.tolist())
+            )
+        table = pa.table(fields).replace_schema_metadata(metadata)
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    arrays = dict(columns)
+    for name, (codes, vocabulary) in labels.items():
+        arrays[name] = codes.astype(np.int8)
+        arrays[f"{name}_labels"] = np.asarray(vocabulary, dtype=str)
+    for name, value in metadata.items():
+        arrays[name] = np.array(value)
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
@@ -1,7 +1,48 @@
+import numpy as np
 import pandas as pd
 
 
-def build_probability_features(payload: dict) -> pd.DataFrame:
+# -----------------------------
+# Feature schema (training order)
+# -----------------------------
+FEATURE_COLUMNS = [
+    "lat_bin",
+    "lon_bin",
+    "Hour",
+    "is_peak_hour",
+    "is_night",
+    "Speed_limit",
+    "Road_Type",
+    "Junction_Detail",
+    "Urban_or_Rural_Area",
+    "Light_Conditions",
+    "Weather_Conditions",
+]
+
+PEAK_HOURS = [8, 9, 18, 19]
+
+# Payload key -> (feature column, default)
+CONTEXT_DEFAULTS = {
+    "speed_limit": ("Speed_limit", 50),
+    "road_type": ("Road_Type", "Single carriageway"),
+    "junction_detail": ("Junction_Detail", "Not at junction"),
+    "urban_or_rural": ("Urban_or_Rural_Area", "Urban"),
+    "light_conditions": ("Light_Conditions", "Daylight"),
+    "weather_condition": ("Weather_Conditions", "Fine"),
+}
+
+
+def _or_default(value, default):
+    # Missing, falsy or NaN -> default (same outcome as `or` + fillna)
+    if not value or value != value:
+        return default
+    return value
+
+
+def probability_feature_values(payload: dict) -> dict:
+    """
+    Single-row feature values, keyed by training column name.
+    """
     lat = float(payload["latitude"])
     lon = float(payload["longitude"])
     hour = int(payload["hour"])
@@ -17,17 +58,21 @@ def build_probability_features(payload: dict) -> pd.DataFrame:
         "is_night": int(hour < 6 or hour > 20),
 
         # Road defaults (NO None allowed)
-        "Speed_limit": payload.get("speed_limit") or 50,
-        "Road_Type": payload.get("road_type") or "Single carriageway",
-        "Junction_Detail": payload.get("junction_detail") or "Not at junction",
-        "Urban_or_Rural_Area": payload.get("urban_or_rural") or "Urban",
-        "Light_Conditions": payload.get("light_conditions") or "Daylight",
+        "Speed_limit": _or_default(payload.get("speed_limit"), 50),
+        "Road_Type": _or_default(payload.get("road_type"), "Single carriageway"),
+        "Junction_Detail": _or_default(payload.get("junction_detail"), "Not at junction"),
+        "Urban_or_Rural_Area": _or_default(payload.get("urban_or_rural"), "Urban"),
+        "Light_Conditions": _or_default(payload.get("light_conditions"), "Daylight"),
 
         # Weather (CRITICAL FIX)
-        "Weather_Conditions": payload.get("weather_condition") or "Fine",
+        "Weather_Conditions": _or_default(payload.get("weather_condition"), "Fine"),
     }
 
-    df = pd.DataFrame([features])
+    return features
+
+
+def build_probability_features(payload: dict) -> pd.DataFrame:
+    df = pd.DataFrame([probability_feature_values(payload)])
 
     # 🔐 HARD SAFETY: eliminate NaN completely
     df = df.fillna({
@@ -40,3 +85,127 @@ def build_probability_features(payload: dict) -> pd.DataFrame:
     })
 
     return df
+
+
+def probability_feature_columns(payloads: list) -> dict:
+    """
+    Vectorized probability_feature_values for many payloads.
+    Returns one NumPy array per training column.
+    """
+    lat = np.array([p["latitude"] for p in payloads], dtype=float)
+    lon = np.array([p["longitude"] for p in payloads], dtype=float)
+    hour = np.array([p["hour"] for p in payloads], dtype=np.int64)
+
+    columns = {
+        # Spatial (int() truncates toward zero)
+        "lat_bin": np.trunc(lat * 10).astype(np.int64),
+        "lon_bin": np.trunc(lon * 10).astype(np.int64),
+
+        # Time
+        "Hour": hour,
+        "is_peak_hour": np.isin(hour, PEAK_HOURS).astype(np.int64),
+        "is_night": ((hour < 6) | (hour > 20)).astype(np.int64),
+    }
+
+    # Context columns: missing values fall back to defaults, as above
+    for key, (column, default) in CONTEXT_DEFAULTS.items():
+        values = [_or_default(p.get(key), default) for p in payloads]
+        dtype = object if isinstance(default, str) else None
+        columns[column] = np.array(values, dtype=dtype)
+
+    return columns
+
+
+def cell_feature_columns(lat_bins, lon_bins, hours, context: dict) -> dict:
+    """
+    probability_feature_columns() layout for already-binned cells,
+    with one shared road/weather context (payload keys, as above).
+    """
+    hour = np.asarray(hours, dtype=np.int64)
+    n = len(hour)
+
+    columns = {
+        "lat_bin": np.asarray(lat_bins, dtype=np.int64),
+        "lon_bin": np.asarray(lon_bins, dtype=np.int64),
+        "Hour": hour,
+        "is_peak_hour": np.isin(hour, PEAK_HOURS).astype(np.int64),
+        "is_night": ((hour < 6) | (hour > 20)).astype(np.int64),
+    }
+
+    for key, (column, default) in CONTEXT_DEFAULTS.items():
+        value = _or_default(context.get(key), default)
+        dtype = object if isinstance(default, str) else None
+        columns[column] = np.full(n, value, dtype=dtype)
+
+    return columns
+
+
+def array_feature_columns(arrays: dict) -> dict:
+    """
+    probability_feature_columns() layout from columnar request arrays
+    (RiskRequest field names, see utils/columnar.py). Missing context
+    is a NaN or 0 number, or an empty string, and takes the default.
+    String columns stay fixed-width (no per-row Python objects).
+    """
+    lat = np.asarray(arrays["latitude"], dtype=float)
+    lon = np.asarray(arrays["longitude"], dtype=float)
+    hour = np.asarray(arrays["hour"]).astype(np.int64)
+    n = len(hour)
+
+    columns = {
+        "lat_bin": np.trunc(lat * 10).astype(np.int64),
+        "lon_bin": np.trunc(lon * 10).astype(np.int64),
+        "Hour": hour,
+        "is_peak_hour": np.isin(hour, PEAK_HOURS).astype(np.int64),
+        "is_night": ((hour < 6) | (hour > 20)).astype(np.int64),
+    }
+
+    for key, (column, default) in CONTEXT_DEFAULTS.items():
+        values = arrays.get(key)
+        if values is None:
+            columns[column] = np.full(n, default)
+        elif isinstance(default, str):
+            values = np.asarray(values, dtype=str)
+            columns[column] = np.where(values == "", default, values)
+        else:
+            values = np.asarray(values, dtype=float)
+            missing = np.isnan(values) | (values == 0)
+            columns[column] = np.where(missing, default, values).astype(np.int64)
+
+    return columns
+
+
+def category_codes(values, index: dict) -> np.ndarray:
+    """
+    index.get(value, -1) for every value. Fixed-width string arrays
+    are looked up once per distinct value.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == "U":
+        distinct, inverse = np.unique(values, return_inverse=True)
+        codes = np.array([index.get(str(v), -1) for v in distinct], dtype=np.intp)
+        return codes[inverse.ravel()]
+    return np.fromiter((index.get(v, -1) for v in values), dtype=np.intp, count=len(values))
+
+
+def stack_feature_values(rows: list) -> dict:
+    """
+    Stacks probability_feature_values() dicts into the
+    probability_feature_columns() layout.
+    """
+    columns = {}
+    for column in FEATURE_COLUMNS:
+        values = [row[column] for row in rows]
+        dtype = object if isinstance(values[0], str) else None
+        columns[column] = np.array(values, dtype=dtype)
+    return columns
+
+
+def build_probability_features_batch(payloads: list) -> pd.DataFrame:
+    """
+    Vectorized build_probability_features for many payloads.
+    Returns one row per payload, same columns, dtypes and defaults.
+    """
+    return pd.DataFrame(
+        probability_feature_columns(payloads), columns=FEATURE_COLUMNS
+    )
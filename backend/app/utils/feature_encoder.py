@@ -0,0 +1,103 @@
+import threading
+
+import numpy as np
+
+from backend.app.utils.feature_builder import (
+    FEATURE_COLUMNS,
+    probability_feature_values,
+    probability_feature_columns,
+    category_codes,
+)
+
+
+class FeatureEncoder:
+    """
+    Serving-time replacement for DataFrame + ColumnTransformer.
+
+    Writes feature values straight into the encoded model layout
+    (numeric passthrough columns, then one-hot blocks) using the
+    category -> column maps of the trained OneHotEncoder. Values are
+    derived by feature_builder, so they match the training schema.
+    """
+
+    def __init__(self, numeric_columns: list, categorical: list, n_encoded: int):
+        unknown = set(numeric_columns) | {spec["column"] for spec in categorical}
+        unknown -= set(FEATURE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Model expects features the builder does not produce: {unknown}")
+
+        self.numeric_columns = list(numeric_columns)
+        self.n_encoded = int(n_encoded)
+        # column -> {category: encoded column, -1 if dropped}
+        self.category_index = {
+            spec["column"]: dict(zip(spec["categories"], spec["columns"]))
+            for spec in categorical
+        }
+        self._local = threading.local()
+
+    @classmethod
+    def from_compiled(cls, compiled) -> "FeatureEncoder":
+        # Maps were taken from the trained encoder by compile_calibrated_forest
+        meta = compiled.meta
+        return cls(meta["numeric_columns"], meta["categorical"], meta["n_encoded"])
+
+    # -----------------------------
+    # Single row
+    # -----------------------------
+    def _row_buffer(self) -> np.ndarray:
+        # One reusable row per serving thread
+        buf = getattr(self._local, "row", None)
+        if buf is None:
+            buf = self._local.row = np.zeros((1, self.n_encoded), dtype=np.float32)
+        return buf
+
+    def encode_features(self, features: dict, out: np.ndarray = None) -> np.ndarray:
+        """
+        Encodes one probability_feature_values() dict into a (1, n_encoded) row.
+        Without `out`, returns this thread's reusable buffer; copy it to keep it.
+        """
+        row = self._row_buffer() if out is None else out
+        row.fill(0.0)
+        values = row[0]
+
+        for j, column in enumerate(self.numeric_columns):
+            values[j] = features[column]
+
+        for column, index in self.category_index.items():
+            j = index.get(features[column], -1)
+            if j >= 0:
+                values[j] = 1.0
+
+        return row
+
+    def encode_one(self, payload: dict, out: np.ndarray = None) -> np.ndarray:
+        return self.encode_features(probability_feature_values(payload), out)
+
+    # -----------------------------
+    # Batches
+    # -----------------------------
+    def encode_columns(self, columns: dict, out: np.ndarray = None) -> np.ndarray:
+        """
+        Encodes probability_feature_columns() arrays into (n, n_encoded).
+        `out` may be a preallocated float32 buffer with at least n rows.
+        """
+        n = len(columns["Hour"])
+        if out is None:
+            out = np.zeros((n, self.n_encoded), dtype=np.float32)
+        else:
+            out = out[:n]
+            out.fill(0.0)
+
+        for j, column in enumerate(self.numeric_columns):
+            out[:, j] = columns[column]
+
+        rows = np.arange(n)
+        for column, index in self.category_index.items():
+            cols = category_codes(columns[column], index)
+            hit = cols >= 0
+            out[rows[hit], cols[hit]] = 1.0
+
+        return out
+
+    def encode_batch(self, payloads: list, out: np.ndarray = None) -> np.ndarray:
+        return self.encode_columns(probability_feature_columns(payloads), out)
@@ -0,0 +1,210 @@
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+# Every metric registers itself here on creation
+REGISTRY = []
+
+# -----------------------------
+# Metric types
+# -----------------------------
+class _Child:
+    """
+    One labelled series.
+
+    observe() is lock-free (a bisect and two in-place adds) so it stays
+    at a few hundred nanoseconds; under heavy thread contention the GIL
+    may very rarely drop an observation, which is fine for monitoring.
+    Counters are rare and keep exact counts under a lock.
+    """
+
+    def __init__(self, upper_bounds=None):
+        self._lock = threading.Lock()
+        self.upper_bounds = upper_bounds
+        self.value = 0.0
+        if upper_bounds is not None:
+            self.counts = [0] * (len(upper_bounds) + 1)
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.value += value
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+        REGISTRY.append(self)
+
+    def _new_child(self) -> _Child:
+        return _Child()
+
+    def labels(self, *values) -> _Child:
+        """
+        Returns the series for these label values; bind it once
+        at import time to keep the hot path to a single call.
+        """
+        values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _label_str(self, values, extra: str = "") -> str:
+        pairs = [f'{k}="{v}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def _render_child(self, values, child) -> list:
+        return [f"{self.name}{self._label_str(values)} {child.value}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: list, labelnames=()):
+        self.upper_bounds = sorted(float(b) for b in buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _Child:
+        return _Child(self.upper_bounds)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def _render_child(self, values, child) -> list:
+        counts = list(child.counts)
+        total = child.value
+
+        lines, cumulative = [], 0
+        for bound, count in zip(self.upper_bounds + [float("inf")], counts):
+            cumulative += count
+            le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+            lines.append(f"{self.name}_bucket{self._label_str(values, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_str(values)} {total}")
+        lines.append(f"{self.name}_count{self._label_str(values)} {cumulative}")
+        return lines
+
+
+class CallbackGauge(_Metric):
+    """
+    Value read from `fn()` at scrape time (queue depth, cache size...).
+    `kind` may be "counter" for monotonically growing sources.
+    """
+
+    def __init__(self, name: str, documentation: str, fn, kind: str = "gauge"):
+        self.fn = fn
+        self.kind = kind
+        super().__init__(name, documentation)
+
+    def render(self) -> list:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            f"{self.name} {float(self.fn())}",
+        ]
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# Backend metrics
+# -----------------------------
+LATENCY_BUCKETS = [
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5,
+    1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+    1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+]
+
+STAGE_SECONDS = Histogram(
+    "risk_stage_seconds",
+    "Time spent in each /predict-risk stage.",
+    LATENCY_BUCKETS,
+    labelnames=("stage",),
+)
+PARSE_SECONDS = STAGE_SECONDS.labels("parse")
+BUILD_FEATURES_SECONDS = STAGE_SECONDS.labels("build_features")
+# Risk cube + prediction cache lookups (every request)
+LOOKUP_SECONDS = STAGE_SECONDS.labels("lookup")
+# Lookup misses only: micro-batcher queueing plus the shared model call
+BATCH_WAIT_SECONDS = STAGE_SECONDS.labels("batch_wait")
+# The model call alone, once per micro-batch
+PREDICT_SECONDS = STAGE_SECONDS.labels("predict_probability")
+RISK_LOGIC_SECONDS = STAGE_SECONDS.labels("risk_logic")
+WEATHER_SECONDS = STAGE_SECONDS.labels("weather")
+
+ERRORS_TOTAL = Counter(
+    "risk_errors_total",
+    "Errors by source (unhandled exceptions, 5xx responses, weather fallbacks).",
+    labelnames=("source",),
+)
+WEATHER_ERRORS = ERRORS_TOTAL.labels("weather")
+for _source in ("http_5xx", "unhandled_exception"):
+    ERRORS_TOTAL.labels(_source)
+
+NAN_FEATURES_TOTAL = Counter(
+    "risk_nan_features_total",
+    "Feature vectors rejected by the NaN assertion in probability.py.",
+)
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware: stamps scope["state"]["received_at"] so
+    handlers can time request parsing, and counts server errors.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["received_at"] = perf_counter()
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start" and message["status"] >= 500:
+                ERRORS_TOTAL.labels("http_5xx").inc()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            ERRORS_TOTAL.labels("unhandled_exception").inc()
+            raise
@@ -0,0 +1,33 @@
+import struct
+import zlib
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(kind + data) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+
+def encode_png_rgba(rgba: np.ndarray, level: int = 6) -> bytes:
+    """
+    Minimal PNG writer for an (h, w, 4) uint8 image
+    (8-bit RGBA, no filtering, single IDAT chunk).
+    """
+    h, w, channels = rgba.shape
+    if channels != 4 or rgba.dtype != np.uint8:
+        raise ValueError("Expected an (h, w, 4) uint8 array")
+
+    # Each scanline is prefixed with filter type 0 (None)
+    raw = np.zeros((h, w * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(h, w * 4)
+
+    header = struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)
+    return (
+        PNG_SIGNATURE
+        + _chunk(b"IHDR", header)
+        + _chunk(b"IDAT", zlib.compress(raw.tobytes(), level))
+        + _chunk(b"IEND", b"")
+    )
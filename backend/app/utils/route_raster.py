@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def absolute_seconds(ts: datetime) -> tuple:
+    """
+    (epoch seconds, UTC offset in seconds) of a timestamp. Naive
+    timestamps count as UTC, so their wall clock is kept as sent.
+    """
+    offset = ts.utcoffset()
+    if offset is None:
+        return (ts - datetime(1970, 1, 1)).total_seconds(), 0.0
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (ts - epoch).total_seconds(), offset.total_seconds()
+
+
+def rasterize_route(lat, lon, seconds, utc_offsets=None, step_deg: float = 0.01) -> dict:
+    """
+    Rasterizes a timestamped polyline onto the serving grid
+    (lat_bin = int(lat * 10), see feature_builder.py).
+
+    Every segment is sampled at sub-steps of at most `step_deg`;
+    each sample carries its share of the segment length and a time
+    interpolated on absolute (epoch) `seconds`, read as a local hour
+    through the UTC offset of the nearer endpoint (`utc_offsets`,
+    seconds; points may differ, e.g. across a DST change). Samples
+    are then grouped into unique (segment, lat_bin, lon_bin, hour)
+    rows with the distance travelled in each as exposure.
+
+    Returns arrays:
+        segment, lat_bin, lon_bin, hour, exposure_km   (one per group)
+        segment_km                                     (one per segment)
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    t = np.asarray(seconds, dtype=float)
+    if utc_offsets is None:
+        offsets = np.zeros_like(t)
+    else:
+        offsets = np.asarray(utc_offsets, dtype=float)
+    n_segments = len(lat) - 1
+
+    segment_km = haversine_km(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    span_deg = np.maximum(np.abs(np.diff(lat)), np.abs(np.diff(lon)))
+    n_steps = np.maximum(1, np.ceil(span_deg / step_deg).astype(np.int64))
+
+    # Sample midpoints of each sub-step
+    seg = np.repeat(np.arange(n_segments), n_steps)
+    first = np.repeat(np.cumsum(n_steps) - n_steps, n_steps)
+    frac = (np.arange(len(seg)) - first + 0.5) / n_steps[seg]
+
+    s_lat = lat[seg] + frac * (lat[seg + 1] - lat[seg])
+    s_lon = lon[seg] + frac * (lon[seg + 1] - lon[seg])
+    s_t = t[seg] + frac * (t[seg + 1] - t[seg])
+    s_km = segment_km[seg] / n_steps[seg]
+    s_local = s_t + np.where(frac < 0.5, offsets[seg], offsets[seg + 1])
+
+    keys = np.column_stack([
+        seg,
+        np.trunc(s_lat * 10).astype(np.int64),
+        np.trunc(s_lon * 10).astype(np.int64),
+        (np.floor(s_local / 3600).astype(np.int64)) % 24,
+    ])
+    groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+    exposure_km = np.bincount(inverse.ravel(), weights=s_km, minlength=len(groups))
+
+    return {
+        "segment": groups[:, 0],
+        "lat_bin": groups[:, 1],
+        "lon_bin": groups[:, 2],
+        "hour": groups[:, 3],
+        "exposure_km": exposure_km,
+        "segment_km": segment_km,
+    }
@@ -0,0 +1,360 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+# ==================================================
+# END-TO-END API LOAD BENCHMARK
+# ==================================================
+# Drives backend/app/main.py at a fixed concurrency with a
+# configurable request mix and reports latency percentiles,
+# throughput and RSS per worker as JSON. Weather comes from
+# benchmarks/openweather_stub.py, never the real provider.
+#
+#   python -m benchmarks.load_benchmark --workers 2 --concurrency 64 \
+#       --mix single=0.8,batch=0.2 --unique-rate 0.1 --output bench.json
+#
+# Compare runs on the same machine only; the absolute numbers
+# depend on the host, the numbers between commits do not.
+# ==================================================
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+# Great Britain, where the training data lives
+LAT_RANGE = (50.0, 58.5)
+LON_RANGE = (-5.5, 1.5)
+SPEED_LIMITS = [20, 30, 40, 50, 60, 70]
+ROAD_TYPES = ["Single carriageway", "Dual carriageway", "Roundabout", "One way street"]
+# Categories the backend maps provider weather onto
+WEATHER = ["Fine no high winds", "Raining", "Snowing", "Fog or mist"]
+
+ENDPOINTS = {
+    "single": "/predict-risk",
+    "batch": "/predict-risk/batch",
+}
+
+
+# -----------------------------
+# Request mix
+# -----------------------------
+def parse_mix(text: str) -> dict:
+    """
+    "single=0.8,batch=0.2" -> normalised weights per request kind.
+    """
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in ENDPOINTS:
+            raise ValueError(f"Unknown request kind '{kind}' (expected {sorted(ENDPOINTS)})")
+        mix[kind] = float(weight or 1.0)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("Request mix weights must sum to more than 0")
+    return {kind: weight / total for kind, weight in mix.items()}
+
+
+class PayloadGenerator:
+    """
+    Points come from a fixed pool of hot cells (repeated traffic,
+    cache friendly) or, with probability `unique_rate`, from a
+    random cell/hour/context that is unlikely to repeat.
+    """
+
+    def __init__(self, hot_cells: int, unique_rate: float, batch_size: int, seed: int):
+        self.rng = random.Random(seed)
+        self.unique_rate = unique_rate
+        self.batch_size = batch_size
+        self.hot = [self._random_point() for _ in range(hot_cells)]
+
+    def _random_point(self) -> dict:
+        rng = self.rng
+        return {
+            "latitude": round(rng.uniform(*LAT_RANGE), 5),
+            "longitude": round(rng.uniform(*LON_RANGE), 5),
+            "hour": rng.randrange(24),
+            "speed_limit": rng.choice(SPEED_LIMITS),
+            "road_type": rng.choice(ROAD_TYPES),
+            "weather_condition": rng.choice(WEATHER),
+        }
+
+    def point(self) -> dict:
+        if self.rng.random() < self.unique_rate:
+            return self._random_point()
+        return self.rng.choice(self.hot)
+
+    def body(self, kind: str) -> dict:
+        if kind == "batch":
+            return {"points": [self.point() for _ in range(self.batch_size)]}
+        return self.point()
+
+
+# -----------------------------
+# Servers
+# -----------------------------
+def _wait_ready(url: str, timeout_s: float = 60.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout_s:.0f}s")
+
+
+def start_stub(port: int, latency_ms: float, seed: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.openweather_stub",
+            "--port", str(port),
+            "--latency-ms", str(latency_ms),
+            "--seed", str(seed),
+        ],
+        cwd=BASE_DIR,
+        stdout=subprocess.DEVNULL,
+    )
+    _wait_ready(f"http://127.0.0.1:{port}/_stub/stats")
+    return proc
+
+
+def start_uvicorn(port: int, workers: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "backend.app.main:app",
+            "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+        ],
+        cwd=BASE_DIR,
+        env=os.environ.copy(),
+    )
+    _wait_ready(f"http://127.0.0.1:{port}/health")
+    return proc
+
+
+def start_inprocess(port: int):
+    """
+    Same app under uvicorn on a background thread of this process.
+    Cheaper to profile, but the load generator shares the GIL.
+    """
+    import uvicorn
+    from backend.app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    _wait_ready(f"http://127.0.0.1:{port}/health")
+    return server, thread
+
+
+def _rss_mb(pid: int) -> float:
+    # Linux only; 0.0 where /proc is unavailable
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return 0.0
+
+
+def _children(pid: int) -> list:
+    children = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            children += [int(c) for c in (task / "children").read_text().split()]
+        except OSError:
+            pass
+    return children
+
+
+def worker_rss(proc: subprocess.Popen) -> dict:
+    """
+    RSS (MB) of the server and every process under it: uvicorn
+    workers, inference pool workers, resource trackers.
+    """
+    if proc is None:
+        return {str(os.getpid()): _rss_mb(os.getpid())}
+    pids, queue = [], [proc.pid]
+    while queue:
+        pid = queue.pop(0)
+        pids.append(pid)
+        queue += _children(pid)
+    rss = {str(pid): _rss_mb(pid) for pid in pids}
+    return {pid: mb for pid, mb in rss.items() if mb > 0}
+
+
+# -----------------------------
+# Load generator
+# -----------------------------
+async def run_load(base_url: str, generator: PayloadGenerator, mix: dict,
+                   concurrency: int, duration_s: float, warmup_s: float) -> dict:
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    latencies = {kind: [] for kind in kinds}
+    errors = {kind: 0 for kind in kinds}
+    state = {"measure": False, "stop": False}
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+
+        async def user():
+            while not state["stop"]:
+                kind = generator.rng.choices(kinds, weights)[0]
+                body = generator.body(kind)
+                start = time.perf_counter()
+                try:
+                    r = await client.post(ENDPOINTS[kind], json=body)
+                    ok = r.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                elapsed = time.perf_counter() - start
+                if state["measure"]:
+                    if ok:
+                        latencies[kind].append(elapsed)
+                    else:
+                        errors[kind] += 1
+
+        tasks = [asyncio.create_task(user()) for _ in range(concurrency)]
+        await asyncio.sleep(warmup_s)
+        state["measure"] = True
+        started = time.perf_counter()
+        await asyncio.sleep(duration_s)
+        state["measure"] = False
+        elapsed = time.perf_counter() - started
+        state["stop"] = True
+        await asyncio.gather(*tasks)
+
+    return {"latencies": latencies, "errors": errors, "elapsed_s": elapsed}
+
+
+def summarize(latencies: list, errors: int, elapsed_s: float, points_per_request: int) -> dict:
+    lat_ms = np.asarray(latencies) * 1000.0
+    count = len(lat_ms)
+    summary = {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": count / elapsed_s,
+        "throughput_points_per_s": count * points_per_request / elapsed_s,
+    }
+    if count:
+        p50, p95, p99 = np.percentile(lat_ms, [50, 95, 99])
+        summary.update({
+            "latency_ms_p50": float(p50),
+            "latency_ms_p95": float(p95),
+            "latency_ms_p99": float(p99),
+            "latency_ms_max": float(lat_ms.max()),
+            "latency_ms_mean": float(lat_ms.mean()),
+        })
+    return summary
+
+
+# -----------------------------
+# Main
+# -----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end API load benchmark")
+    parser.add_argument("--mode", choices=["uvicorn", "inprocess"], default="uvicorn")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (uvicorn mode)")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--stub-port", type=int, default=8091)
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds first")
+    parser.add_argument("--mix", default="single=0.8,batch=0.2")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--hot-cells", type=int, default=200)
+    parser.add_argument("--unique-rate", type=float, default=0.1,
+                        help="share of points outside the hot cell pool")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="", help="free text stored with the results")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    generator = PayloadGenerator(args.hot_cells, args.unique_rate, args.batch_size, args.seed)
+
+    # Set before the app (and its config) is imported or spawned
+    os.environ["OPENWEATHER_BASE_URL"] = f"http://127.0.0.1:{args.stub_port}"
+    os.environ.setdefault("WEATHER_API_KEY", "benchmark")
+
+    stub = start_stub(args.stub_port, args.stub_latency_ms, args.seed)
+    server = None
+    inprocess = None
+    try:
+        if args.mode == "uvicorn":
+            server = start_uvicorn(args.port, args.workers)
+        else:
+            inprocess, _ = start_inprocess(args.port)
+
+        base_url = f"http://127.0.0.1:{args.port}"
+        model_version = httpx.get(f"{base_url}/health").json().get("model_version")
+
+        raw = asyncio.run(run_load(
+            base_url, generator, mix, args.concurrency, args.duration, args.warmup
+        ))
+        rss = worker_rss(server)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if inprocess is not None:
+            inprocess.should_exit = True
+        stub.terminate()
+        stub.wait()
+
+    by_kind = {
+        kind: summarize(
+            raw["latencies"][kind],
+            raw["errors"][kind],
+            raw["elapsed_s"],
+            args.batch_size if kind == "batch" else 1,
+        )
+        for kind in mix
+    }
+    all_latencies = [x for kind in mix for x in raw["latencies"][kind]]
+    total = summarize(all_latencies, sum(raw["errors"].values()), raw["elapsed_s"], 1)
+    total.pop("throughput_points_per_s")
+
+    results = {
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "model_version": model_version,
+        "config": {**vars(args), "mix": mix},
+        "host": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "total": total,
+        "by_kind": by_kind,
+        "rss_mb_per_worker": rss,
+        # Load generator itself (in-process mode includes the server)
+        "client_max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    }
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        print(f"Saved -> {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
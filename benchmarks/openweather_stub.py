@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+from datetime import datetime, timezone
+
+import uvicorn
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+# ==================================================
+# OPENWEATHER STAND-IN (LOAD TESTING)
+# ==================================================
+# Serves /data/2.5/weather and /data/2.5/forecast in the
+# OpenWeather response shapes, with configurable latency,
+# error and payload profiles, so the weather clients can be
+# load tested without touching the real API or its quota.
+#
+#   python -m benchmarks.openweather_stub --port 8081 \
+#       --latency-ms 80 --jitter-ms 40 --error-rate 0.02 --profile mixed
+#
+# Point the clients at it with
+#   OPENWEATHER_BASE_URL=http://127.0.0.1:8081
+# ==================================================
+
+# -------------------------------------------------
+# Payload profiles
+# -------------------------------------------------
+CONDITIONS = {
+    "Clear": (800, "clear sky", "01d"),
+    "Clouds": (803, "broken clouds", "04d"),
+    "Rain": (500, "light rain", "10d"),
+    "Drizzle": (300, "light intensity drizzle", "09d"),
+    "Thunderstorm": (211, "thunderstorm", "11d"),
+    "Snow": (600, "light snow", "13d"),
+    "Mist": (701, "mist", "50d"),
+    "Fog": (741, "fog", "50d"),
+}
+
+PROFILES = {
+    "clear": ["Clear"],
+    "rain": ["Rain"],
+    "snow": ["Snow"],
+    "fog": ["Fog", "Mist"],
+    "mixed": list(CONDITIONS),
+}
+
+FORECAST_STEP_S = 3 * 3600
+
+# Settings POST /_stub/config may change mid-run
+UPDATABLE = {
+    "latency_ms": float,
+    "jitter_ms": float,
+    "slow_rate": float,
+    "slow_ms": float,
+    "error_rate": float,
+    "rate_limit_rate": float,
+    "profile": str,
+    "forecast_count": int,
+}
+
+
+class StubConfig:
+    """
+    Mutable at runtime through POST /_stub/config.
+    """
+
+    def __init__(self, latency_ms=50.0, jitter_ms=0.0, slow_rate=0.0, slow_ms=2000.0,
+                 error_rate=0.0, rate_limit_rate=0.0, profile="mixed", forecast_count=40,
+                 seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.profile = profile
+        self.forecast_count = forecast_count
+        self.rng = random.Random(seed)
+
+    def as_dict(self) -> dict:
+        return {k: v for k, v in vars(self).items() if k != "rng"}
+
+
+def _condition(lat: float, lon: float, dt: int, profile: str) -> str:
+    # Deterministic per (cell, 3h slot), so repeated calls agree like the real API
+    choices = PROFILES[profile]
+    key = f"{round(lat, 1)}:{round(lon, 1)}:{dt // FORECAST_STEP_S}".encode()
+    return choices[hashlib.md5(key).digest()[0] % len(choices)]
+
+
+def _weather_block(condition: str) -> list:
+    code, description, icon = CONDITIONS[condition]
+    return [{"id": code, "main": condition, "description": description, "icon": icon}]
+
+
+def _main_block(lat: float, dt: int) -> dict:
+    # Plausible UK temperatures with a daily cycle
+    hour = (dt // 3600) % 24
+    temp = round(12.0 - (abs(lat) - 50.0) * 0.5 + 4.0 * (1 - abs(hour - 14) / 12), 2)
+    return {
+        "temp": temp,
+        "feels_like": round(temp - 1.5, 2),
+        "temp_min": round(temp - 1.0, 2),
+        "temp_max": round(temp + 1.0, 2),
+        "pressure": 1012,
+        "humidity": 70 + (hour % 5) * 4,
+    }
+
+
+def current_payload(lat: float, lon: float, profile: str) -> dict:
+    now = int(time.time())
+    condition = _condition(lat, lon, now, profile)
+    return {
+        "coord": {"lon": lon, "lat": lat},
+        "weather": _weather_block(condition),
+        "base": "stations",
+        "main": _main_block(lat, now),
+        "visibility": 10000 if condition not in ("Fog", "Mist") else 800,
+        "wind": {"speed": 4.1, "deg": 240},
+        "clouds": {"all": 75 if condition != "Clear" else 0},
+        "dt": now,
+        "sys": {"country": "GB", "sunrise": now - 6 * 3600, "sunset": now + 6 * 3600},
+        "timezone": 0,
+        "id": 2643743,
+        "name": "Stub",
+        "cod": 200,
+    }
+
+
+def forecast_payload(lat: float, lon: float, profile: str, count: int) -> dict:
+    # Slots start at the next 3-hour boundary, as OpenWeather's do
+    first = (int(time.time()) // FORECAST_STEP_S + 1) * FORECAST_STEP_S
+    entries = []
+    for k in range(count):
+        dt = first + k * FORECAST_STEP_S
+        condition = _condition(lat, lon, dt, profile)
+        entries.append({
+            "dt": dt,
+            "main": _main_block(lat, dt),
+            "weather": _weather_block(condition),
+            "clouds": {"all": 75 if condition != "Clear" else 0},
+            "wind": {"speed": 3.0 + (k % 4), "deg": 200 + 10 * (k % 6), "gust": 6.2},
+            "visibility": 10000,
+            "pop": 0.6 if condition in ("Rain", "Drizzle", "Thunderstorm") else 0.05,
+            "sys": {"pod": "d" if 6 <= (dt // 3600) % 24 < 18 else "n"},
+            "dt_txt": datetime.fromtimestamp(dt, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        })
+    return {
+        "cod": "200",
+        "message": 0,
+        "cnt": count,
+        "list": entries,
+        "city": {
+            "id": 2643743,
+            "name": "Stub",
+            "coord": {"lat": lat, "lon": lon},
+            "country": "GB",
+            "timezone": 0,
+        },
+    }
+
+
+# -------------------------------------------------
+# App
+# -------------------------------------------------
+def create_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="OpenWeather stand-in")
+    stats = {"requests": 0, "errors": 0, "rate_limited": 0, "slow": 0}
+
+    async def simulate():
+        """
+        Sleeps for the configured latency; returns an error response or None.
+        """
+        stats["requests"] += 1
+        rng = config.rng
+
+        delay = config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)
+        if rng.random() < config.slow_rate:
+            stats["slow"] += 1
+            delay = config.slow_ms
+        await asyncio.sleep(max(0.0, delay) / 1000.0)
+
+        roll = rng.random()
+        if roll < config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"cod": 500, "message": "Internal error"}, status_code=500)
+        if roll < config.error_rate + config.rate_limit_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse({"cod": 429, "message": "Rate limit exceeded"}, status_code=429)
+        return None
+
+    @app.get("/data/2.5/weather")
+    async def weather(lat: float = Query(...), lon: float = Query(...), appid: str = ""):
+        error = await simulate()
+        return error or current_payload(lat, lon, config.profile)
+
+    @app.get("/data/2.5/forecast")
+    async def forecast(lat: float = Query(...), lon: float = Query(...), appid: str = "",
+                       cnt: int = Query(None, ge=1, le=40)):
+        error = await simulate()
+        return error or forecast_payload(lat, lon, config.profile, cnt or config.forecast_count)
+
+    @app.get("/_stub/stats")
+    def stub_stats():
+        return {**stats, "config": config.as_dict()}
+
+    @app.post("/_stub/config")
+    def stub_config(update: dict):
+        for key, value in update.items():
+            if key not in UPDATABLE:
+                return JSONResponse({"message": f"Unknown setting '{key}'"}, status_code=422)
+            if key == "profile" and value not in PROFILES:
+                return JSONResponse({"message": f"Unknown profile '{value}'"}, status_code=422)
+            setattr(config, key, UPDATABLE[key](value))
+        return config.as_dict()
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenWeather stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0,
+                        help="share of requests delayed by --slow-ms (tail latency)")
+    parser.add_argument("--slow-ms", type=float, default=2000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of HTTP 500s")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of HTTP 429s")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--forecast-count", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        profile=args.profile,
+        forecast_count=args.forecast_count,
+        seed=args.seed,
+    )
+
+    print("=" * 72)
+    print("OPENWEATHER STAND-IN")
+    print("=" * 72)
+    print("Config:", config.as_dict())
+    print(f"Set OPENWEATHER_BASE_URL=http://{args.host}:{args.port}")
+
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import json
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backend.app.utils.artifacts import file_sha256
+from backend.app.utils.feature_builder import (
+    FEATURE_COLUMNS,
+    PEAK_HOURS,
+    CONTEXT_DEFAULTS,
+)
+
+# ==================================================
+# PHASE 10.5 — RISK CUBE PRECOMPUTATION
+# ==================================================
+# Scores every (weather × hour × grid cell) at default
+# road context and stores the result as one float32
+# array the backend memory-maps for O(1) lookups.
+# ==================================================
+
+# -------------------------------------------------
+# Configuration
+# -------------------------------------------------
+# Serving grid: lat_bin = int(latitude * 10), see feature_builder.py
+LAT_RANGE = (49.9, 60.9)   # Great Britain
+LON_RANGE = (-8.2, 1.8)
+HOURS = range(24)
+
+
+def weather_categories(model) -> list:
+    """
+    Weather values seen by the trained encoder, plus the serving default.
+    """
+    base = model.calibrated_classifiers_[0].estimator
+    base = getattr(base, "estimator", base)  # unwrap FrozenEstimator
+    encoder = base.named_steps["preprocess"].named_transformers_["cat"]
+
+    weather = []
+    for col, cats in zip(encoder.feature_names_in_, encoder.categories_):
+        if col == "Weather_Conditions":
+            weather = [str(c) for c in cats]
+
+    default = CONTEXT_DEFAULTS["weather_condition"][1]
+    if default not in weather:
+        weather.append(default)
+    return weather
+
+
+def grid_features(lat_bins, lon_bins, hour: int, weather: str) -> pd.DataFrame:
+    """
+    Feature frame for every cell of the grid at one (hour, weather).
+    Mirrors build_probability_features with default road context.
+    """
+    lat_grid, lon_grid = np.meshgrid(lat_bins, lon_bins, indexing="ij")
+    n = lat_grid.size
+
+    features = {
+        "lat_bin": lat_grid.ravel(),
+        "lon_bin": lon_grid.ravel(),
+        "Hour": np.full(n, hour, dtype=np.int64),
+        "is_peak_hour": np.full(n, int(hour in PEAK_HOURS), dtype=np.int64),
+        "is_night": np.full(n, int(hour < 6 or hour > 20), dtype=np.int64),
+    }
+    for column, default in CONTEXT_DEFAULTS.values():
+        features[column] = [default] * n
+    features["Weather_Conditions"] = [weather] * n
+
+    return pd.DataFrame(features, columns=FEATURE_COLUMNS)
+
+
+# -------------------------------------------------
+# Main
+# -------------------------------------------------
+def main():
+    print("=" * 72)
+    print("PHASE 10.5 — RISK CUBE PRECOMPUTATION")
+    print("=" * 72)
+
+    BASE_DIR = Path(__file__).resolve().parents[3]
+
+    MODEL_PATH = BASE_DIR / "models" / "probability" / "rf_calibrated.pkl"
+    CUBE_PATH = BASE_DIR / "models" / "probability" / "risk_cube.npy"
+    META_PATH = BASE_DIR / "models" / "probability" / "risk_cube.json"
+
+    # -------------------------------------------------
+    # Load model
+    # -------------------------------------------------
+    print("\n[1] Loading calibrated probability model...")
+    model = joblib.load(MODEL_PATH)
+
+    weather = weather_categories(model)
+    lat_bins = np.arange(round(LAT_RANGE[0] * 10), round(LAT_RANGE[1] * 10) + 1)
+    lon_bins = np.arange(round(LON_RANGE[0] * 10), round(LON_RANGE[1] * 10) + 1)
+
+    shape = (len(weather), len(HOURS), len(lat_bins), len(lon_bins))
+    print("Weather categories:", weather)
+    print("Cube shape (weather, hour, lat, lon):", shape)
+
+    # -------------------------------------------------
+    # Score every slice
+    # -------------------------------------------------
+    print("\n[2] Scoring grid...")
+    # Filled beside the live cube, which serving processes keep mapped
+    cube_tmp = CUBE_PATH.with_name(CUBE_PATH.name + ".tmp")
+    cube = np.lib.format.open_memmap(
+        cube_tmp, mode="w+", dtype=np.float32, shape=shape
+    )
+
+    for w, condition in enumerate(weather):
+        for hour in HOURS:
+            X = grid_features(lat_bins, lon_bins, hour, condition)
+            probs = model.predict_proba(X)[:, 1]
+            cube[w, hour] = probs.reshape(len(lat_bins), len(lon_bins))
+        print(f"  {condition}: done")
+
+    cube.flush()
+
+    # -------------------------------------------------
+    # Sanity checks
+    # -------------------------------------------------
+    assert np.isfinite(cube).all()
+    assert ((cube >= 0) & (cube <= 1)).all()
+
+    print(f"\nProbability range: {cube.min():.4f} → {cube.max():.4f}")
+
+    del cube
+    os.replace(cube_tmp, CUBE_PATH)
+
+    # -------------------------------------------------
+    # Save metadata
+    # -------------------------------------------------
+    meta = {
+        "lat_bin_min": int(lat_bins[0]),
+        "lon_bin_min": int(lon_bins[0]),
+        "shape": list(shape),
+        "weather": weather,
+        "context": {col: default for col, default in CONTEXT_DEFAULTS.values()},
+        "model_sha256": file_sha256(MODEL_PATH),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+    # Written last, so its mtime never precedes the cube's
+    meta_tmp = META_PATH.with_name(META_PATH.name + ".tmp")
+    with open(meta_tmp, "w") as f:
+        json.dump(meta, f, indent=4)
+    os.replace(meta_tmp, META_PATH)
+
+    print("\n✔ PHASE 10.5 COMPLETE")
+    print("Risk cube saved to:", CUBE_PATH)
+    print("Metadata saved to:", META_PATH)
+
+
+if __name__ == "__main__":
+    main()
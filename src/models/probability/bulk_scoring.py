@@ -0,0 +1,415 @@
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from backend.app.inference.compiled_forest import CompiledForest, META_FILE
+from backend.app.utils.artifacts import file_sha256
+from backend.app.utils.feature_builder import (
+    CONTEXT_DEFAULTS,
+    FEATURE_COLUMNS,
+    array_feature_columns,
+)
+from backend.app.utils.feature_encoder import FeatureEncoder
+
+# ==================================================
+# PHASE 10.7 — BULK PROBABILITY SCORING
+# ==================================================
+# Scores (location, time) points from a CSV or Parquet
+# file of any size: the input is streamed in chunks,
+# chunks are scored across worker processes and each is
+# written as its own output partition. A checkpoint lists
+# finished partitions, so an interrupted run resumes.
+#
+#   python -m src.models.probability.bulk_scoring points.parquet \
+#       --output-dir data/processed/bulk_scores/points --workers 8
+#
+# Input columns (RiskRequest names): latitude, longitude,
+# hour or timestamp, optional speed_limit, road_type,
+# junction_detail, urban_or_rural, light_conditions,
+# weather_condition. Other columns are passed through.
+# Features follow build_probability_features.
+# ==================================================
+
+BASE_DIR = Path(__file__).resolve().parents[3]
+
+MODEL_PATH = BASE_DIR / "models" / "probability" / "rf_calibrated.pkl"
+COMPILED_DIR = BASE_DIR / "models" / "probability" / "rf_calibrated_compiled"
+THRESHOLD_PATH = BASE_DIR / "data" / "processed" / "risk_thresholds.json"
+
+CHECKPOINT_FILE = "_checkpoint.json"
+SUCCESS_FILE = "_SUCCESS.json"
+
+# Same labels and cut-offs as backend/app/inference/risk_logic.py, without
+# importing the API config (offline runs need no weather key)
+PROBABILITY_LEVELS = np.array(["Low", "Moderate", "High", "Very High"])
+RISK_LEVELS = np.array(["Low", "Moderate", "High", "Severe"])
+
+NUMERIC_CONTEXT = [key for key, (_, default) in CONTEXT_DEFAULTS.items() if not isinstance(default, str)]
+STRING_CONTEXT = [key for key, (_, default) in CONTEXT_DEFAULTS.items() if isinstance(default, str)]
+
+
+# -----------------------------
+# Input
+# -----------------------------
+def iter_chunks(path: Path, chunk_size: int):
+    """
+    DataFrames of at most chunk_size rows, in file order.
+    """
+    if path.suffix.lower() in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def count_rows(path: Path):
+    # Parquet keeps it in the footer; CSV would need a full pass
+    if path.suffix.lower() in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    return None
+
+
+def chunk_arrays(frame: pd.DataFrame) -> dict:
+    """
+    Request arrays for array_feature_columns() from one input chunk.
+    """
+    if "hour" in frame:
+        hour = frame["hour"].to_numpy()
+    elif "timestamp" in frame:
+        # Hour of day on the timestamp's own wall clock, as /predict-risk/route
+        hour = pd.to_datetime(frame["timestamp"]).dt.hour.to_numpy()
+    else:
+        raise KeyError("Input needs an 'hour' or 'timestamp' column")
+
+    arrays = {
+        "latitude": frame["latitude"].to_numpy(dtype=float),
+        "longitude": frame["longitude"].to_numpy(dtype=float),
+        "hour": hour,
+    }
+    for key in NUMERIC_CONTEXT:
+        if key in frame:
+            arrays[key] = pd.to_numeric(frame[key], errors="coerce").to_numpy(dtype=float)
+    for key in STRING_CONTEXT:
+        if key in frame:
+            arrays[key] = frame[key].fillna("").astype(str).to_numpy(dtype=str)
+    return arrays
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+_WORKER = {}
+
+
+def compiled_sha256(compiled_dir: Path):
+    meta_path = compiled_dir / META_FILE
+    if not meta_path.exists():
+        return None
+    with open(meta_path) as f:
+        return json.load(f).get("model_sha256")
+
+
+def load_scorer(model_path: Path, compiled_dir: Path, use_compiled: bool) -> dict:
+    """
+    Compiled arrays (fast path, memory-mapped) or the sklearn pipeline.
+    """
+    if use_compiled:
+        compiled = CompiledForest.load(compiled_dir, mmap_mode="r")
+        return {
+            "kind": "compiled",
+            "compiled": compiled,
+            "encoder": FeatureEncoder.from_compiled(compiled),
+        }
+    return {"kind": "sklearn", "model": joblib.load(model_path)}
+
+
+def _worker_init(model_path: str, compiled_dir: str, use_compiled: bool, thresholds: dict):
+    _WORKER.update(load_scorer(Path(model_path), Path(compiled_dir), use_compiled))
+    _WORKER["thresholds"] = thresholds
+
+
+def score_frame(scorer: dict, frame: pd.DataFrame, thresholds: dict) -> pd.DataFrame:
+    """
+    Input chunk plus probability_score, probability_level and risk_level.
+    """
+    columns = array_feature_columns(chunk_arrays(frame))
+    if scorer["kind"] == "compiled":
+        X_encoded = scorer["encoder"].encode_columns(columns)
+        probs = scorer["compiled"].predict_proba_encoded(X_encoded)
+    else:
+        X = pd.DataFrame(columns, columns=FEATURE_COLUMNS)
+        probs = scorer["model"].predict_proba(X)[:, 1]
+
+    cutoffs = [thresholds["moderate"], thresholds["high"], thresholds["severe"]]
+    level_codes = np.searchsorted(cutoffs, probs, side="right")
+    out = frame.copy()
+    out["probability_score"] = probs
+    out["probability_level"] = PROBABILITY_LEVELS[level_codes]
+    # fuse_risk maps probability levels 1:1 onto RISK_LEVELS
+    out["risk_level"] = RISK_LEVELS[level_codes]
+    return out
+
+
+def _partition_path(output_dir: Path, index: int, fmt: str) -> Path:
+    return output_dir / f"part-{index:06d}.{fmt}"
+
+
+def _score_partition(index: int, frame: pd.DataFrame, output_dir: str, fmt: str) -> dict:
+    out = score_frame(_WORKER, frame, _WORKER["thresholds"])
+
+    # Written under a temporary name, so a partition on disk is always complete
+    path = _partition_path(Path(output_dir), index, fmt)
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "parquet":
+        out.to_parquet(tmp, index=False)
+    else:
+        out.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+    levels, counts = np.unique(out["risk_level"].to_numpy(), return_counts=True)
+    return {
+        "index": index,
+        "rows": len(out),
+        "risk_levels": dict(zip(levels.tolist(), counts.tolist())),
+        "model": _WORKER["kind"],
+    }
+
+
+# -----------------------------
+# Checkpoint
+# -----------------------------
+def input_fingerprint(path: Path, chunk_size: int, model_sha256: str, fmt: str) -> dict:
+    """
+    What a checkpoint is only valid for: same file, chunking, model and format.
+    """
+    stat = path.stat()
+    return {
+        "input": str(path.resolve()),
+        "input_bytes": stat.st_size,
+        "input_mtime": stat.st_mtime,
+        "chunk_size": chunk_size,
+        "model_sha256": model_sha256,
+        "format": fmt,
+    }
+
+
+def load_checkpoint(output_dir: Path, fingerprint: dict, fmt: str) -> dict:
+    path = output_dir / CHECKPOINT_FILE
+    if not path.exists():
+        return {"fingerprint": fingerprint, "done": {}}
+
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint["fingerprint"] != fingerprint:
+        raise SystemExit(
+            f"{path} belongs to a different input, chunk size, model or format; "
+            "pass --restart to discard it"
+        )
+
+    # Partitions listed but missing on disk are scored again
+    checkpoint["done"] = {
+        index: result
+        for index, result in checkpoint["done"].items()
+        if _partition_path(output_dir, int(index), fmt).exists()
+    }
+    return checkpoint
+
+
+def save_checkpoint(output_dir: Path, checkpoint: dict):
+    path = output_dir / CHECKPOINT_FILE
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def clear_output(output_dir: Path):
+    for path in output_dir.glob("part-*"):
+        path.unlink()
+    for name in (CHECKPOINT_FILE, SUCCESS_FILE):
+        (output_dir / name).unlink(missing_ok=True)
+
+
+# -----------------------------
+# Progress
+# -----------------------------
+class Progress:
+    """
+    Rows per second over the whole run and the last `window_s` seconds.
+    """
+
+    def __init__(self, total_rows, resumed_rows: int, interval_s: float, window_s: float = 30.0):
+        self.total_rows = total_rows
+        self.resumed_rows = resumed_rows
+        self.rows = 0
+        self.interval_s = interval_s
+        self.window_s = window_s
+        self.start = time.perf_counter()
+        self.last_report = self.start
+        self.recent = deque()
+
+    def add(self, rows: int):
+        now = time.perf_counter()
+        self.rows += rows
+        self.recent.append((now, self.rows))
+        while self.recent and now - self.recent[0][0] > self.window_s:
+            self.recent.popleft()
+        if now - self.last_report >= self.interval_s:
+            self.report(now)
+
+    def rate(self, now: float) -> float:
+        elapsed = now - self.start
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def report(self, now: float):
+        self.last_report = now
+        done = self.resumed_rows + self.rows
+        recent_rate = self.rate(now)
+        if len(self.recent) > 1:
+            (t0, r0), (t1, r1) = self.recent[0], self.recent[-1]
+            recent_rate = (r1 - r0) / (t1 - t0) if t1 > t0 else recent_rate
+
+        line = f"  {done:,} rows  {recent_rate:,.0f} rows/s"
+        if self.total_rows:
+            remaining = self.total_rows - done
+            eta = remaining / recent_rate if recent_rate > 0 else float("inf")
+            line += f"  {100 * done / self.total_rows:.1f}%  ETA {eta / 60:.1f} min"
+        print(line, flush=True)
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Bulk probability scoring (PHASE 10.7)")
+    parser.add_argument("input", help="CSV or Parquet file of points")
+    parser.add_argument("--output-dir", help="default: data/processed/bulk_scores/<input name>")
+    parser.add_argument("--chunk-size", type=int, default=200_000, help="rows per partition")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--restart", action="store_true", help="discard an existing checkpoint")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between progress lines")
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print("PHASE 10.7 — BULK PROBABILITY SCORING")
+    print("=" * 72)
+
+    input_path = Path(args.input)
+    output_dir = (
+        Path(args.output_dir) if args.output_dir
+        else BASE_DIR / "data" / "processed" / "bulk_scores" / input_path.stem
+    )
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # -------------------------------------------------
+    # Model and thresholds
+    # -------------------------------------------------
+    print("\n[1] Checking probability model...")
+    model_sha256 = file_sha256(MODEL_PATH)
+    # Compiled arrays only when exported from this exact pickle
+    use_compiled = compiled_sha256(COMPILED_DIR) == model_sha256
+    print("Model        :", MODEL_PATH.name, model_sha256[:12])
+    print("Scoring with :", "compiled arrays" if use_compiled else "sklearn pipeline")
+
+    with open(THRESHOLD_PATH) as f:
+        thresholds = json.load(f)
+
+    # -------------------------------------------------
+    # Checkpoint
+    # -------------------------------------------------
+    print("\n[2] Checking for a checkpoint...")
+    if args.restart:
+        clear_output(output_dir)
+    fingerprint = input_fingerprint(input_path, args.chunk_size, model_sha256, args.format)
+    checkpoint = load_checkpoint(output_dir, fingerprint, args.format)
+    done = checkpoint["done"]
+    resumed_rows = sum(result["rows"] for result in done.values())
+    print(f"Partitions already scored: {len(done)} ({resumed_rows:,} rows)")
+
+    # -------------------------------------------------
+    # Score
+    # -------------------------------------------------
+    print(f"\n[3] Scoring with {args.workers} workers, {args.chunk_size:,} rows per chunk...")
+    progress = Progress(count_rows(input_path), resumed_rows, args.report_every)
+
+    # Bounded read-ahead: at most two chunks queued per worker
+    max_in_flight = 2 * args.workers
+    pending = set()
+
+    def collect(block: bool):
+        finished, _ = wait(pending, return_when=FIRST_COMPLETED) if block else (
+            {f for f in pending if f.done()}, None
+        )
+        for future in finished:
+            pending.discard(future)
+            result = future.result()
+            done[str(result["index"])] = result
+            save_checkpoint(output_dir, checkpoint)
+            progress.add(result["rows"])
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_worker_init,
+        initargs=(str(MODEL_PATH), str(COMPILED_DIR), use_compiled, thresholds),
+    ) as executor:
+        for index, frame in enumerate(iter_chunks(input_path, args.chunk_size)):
+            if str(index) in done:
+                continue
+            while len(pending) >= max_in_flight:
+                collect(block=True)
+            pending.add(executor.submit(
+                _score_partition, index, frame, str(output_dir), args.format
+            ))
+            collect(block=False)
+
+        while pending:
+            collect(block=True)
+
+    # -------------------------------------------------
+    # Summary
+    # -------------------------------------------------
+    now = time.perf_counter()
+    progress.report(now)
+
+    total_rows = sum(result["rows"] for result in done.values())
+    risk_levels = {}
+    for result in done.values():
+        for level, count in result["risk_levels"].items():
+            risk_levels[level] = risk_levels.get(level, 0) + count
+
+    summary = {
+        **fingerprint,
+        "partitions": len(done),
+        "rows": total_rows,
+        "rows_this_run": progress.rows,
+        "elapsed_s": round(now - progress.start, 3),
+        "rows_per_s": round(progress.rate(now), 1),
+        "workers": args.workers,
+        "risk_levels": {level: risk_levels[level] for level in RISK_LEVELS.tolist() if level in risk_levels},
+    }
+    with open(output_dir / SUCCESS_FILE, "w") as f:
+        json.dump(summary, f, indent=4)
+
+    print("\nRows scored      :", f"{total_rows:,}", f"({progress.rows:,} this run)")
+    print("Throughput       :", f"{summary['rows_per_s']:,.0f} rows/s")
+    print("Risk level counts:", summary["risk_levels"])
+
+    print("\n✔ PHASE 10.7 COMPLETE")
+    print("Partitions saved to:", output_dir)
+
+
+if __name__ == "__main__":
+    main()
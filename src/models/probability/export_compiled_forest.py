@@ -0,0 +1,75 @@
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from backend.app.inference.compiled_forest import compile_calibrated_forest
+from backend.app.utils.artifacts import file_sha256
+
+# ==================================================
+# PHASE 10.6 — COMPILED PROBABILITY MODEL EXPORT
+# ==================================================
+# Flattens the calibrated RF pipeline (one-hot encoder,
+# trees, calibrator) into NumPy arrays for fast serving
+# ==================================================
+
+PARITY_ROWS = 20000
+PARITY_ATOL = 1e-12
+
+
+def main():
+    print("=" * 72)
+    print("PHASE 10.6 — COMPILED PROBABILITY MODEL EXPORT")
+    print("=" * 72)
+
+    BASE_DIR = Path(__file__).resolve().parents[3]
+
+    DATA_PATH = BASE_DIR / "data" / "processed" / "probability_exposure_dataset.csv"
+    MODEL_PATH = BASE_DIR / "models" / "probability" / "rf_calibrated.pkl"
+    OUTPUT_DIR = BASE_DIR / "models" / "probability" / "rf_calibrated_compiled"
+
+    # -------------------------------------------------
+    # Load model
+    # -------------------------------------------------
+    print("\n[1] Loading calibrated probability model...")
+    model = joblib.load(MODEL_PATH)
+
+    # -------------------------------------------------
+    # Compile
+    # -------------------------------------------------
+    print("\n[2] Compiling encoder, trees and calibrator...")
+    compiled = compile_calibrated_forest(model)
+    compiled.meta["model_sha256"] = file_sha256(MODEL_PATH)
+
+    print("Trees     :", compiled.meta["n_trees"])
+    print("Nodes     :", compiled.meta["n_nodes"])
+    print("Max depth :", compiled.meta["max_depth"])
+    print("Calibrator:", compiled.meta["calibration"]["method"])
+
+    # -------------------------------------------------
+    # Parity check against sklearn
+    # -------------------------------------------------
+    print("\n[3] Checking parity against sklearn...")
+    df = pd.read_csv(DATA_PATH, nrows=PARITY_ROWS)
+    X = df[list(model.feature_names_in_)]
+
+    expected = model.predict_proba(X)[:, 1]
+    actual = compiled.predict_proba(X)[:, 1]
+    max_diff = float(np.max(np.abs(expected - actual)))
+
+    print(f"Rows checked      : {len(X)}")
+    print(f"Max abs difference: {max_diff:.3e}")
+
+    assert max_diff <= PARITY_ATOL, "Compiled model diverges from sklearn"
+
+    # -------------------------------------------------
+    # Save
+    # -------------------------------------------------
+    compiled.save(OUTPUT_DIR)
+
+    print("\n✔ PHASE 10.6 COMPLETE")
+    print("Compiled model saved to:", OUTPUT_DIR)
+
+
+if __name__ == "__main__":
+    main()
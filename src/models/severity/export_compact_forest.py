@@ -0,0 +1,123 @@
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from backend.app.inference.compact_forest import (
+    CompactForest,
+    compact_random_forest,
+    sklearn_forest_nbytes,
+)
+from backend.app.utils.artifacts import file_sha256
+
+# ==================================================
+# PHASE 11.4 — COMPACT SEVERITY FOREST EXPORT
+# ==================================================
+# Repacks the severity Random Forests (300 trees,
+# max_depth=None for the baseline) into one buffer:
+# float32 thresholds, uint8/uint16 features, int32 children,
+# float32 leaf probabilities. Checked against the pickle.
+# ==================================================
+
+MODEL_NAMES = ["rf_severity_baseline", "serious_slight_rf"]
+
+PARITY_ROWS = 20000
+# float32 leaf probabilities, averaged over the trees
+PARITY_ATOL = 1e-6
+MIN_MEMORY_RATIO = 4.0
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def export_model(model_path: Path, output_path: Path, X_parity: pd.DataFrame) -> dict:
+    model, sklearn_load_s = _timed(joblib.load, model_path)
+
+    compact = compact_random_forest(model)
+    compact.meta["model_sha256"] = file_sha256(model_path)
+
+    print("Trees     :", compact.meta["n_trees"])
+    print("Nodes     :", compact.meta["n_nodes"])
+    print("Leaves    :", compact.meta["n_leaves"])
+    print("Max depth :", compact.meta["max_depth"])
+
+    # -------------------------------------------------
+    # Parity check against sklearn
+    # -------------------------------------------------
+    X = X_parity[list(compact.feature_names)].replace([np.inf, -np.inf], np.nan).fillna(0)
+
+    expected = model.predict_proba(X)
+    actual = compact.predict_proba(X)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    label_agreement = float(np.mean(model.predict(X) == compact.predict(X)))
+
+    print(f"Rows checked      : {len(X)}")
+    print(f"Max abs difference: {max_diff:.3e}")
+    print(f"Label agreement   : {label_agreement:.6f}")
+
+    assert max_diff <= PARITY_ATOL, "Compact forest diverges from sklearn"
+
+    # -------------------------------------------------
+    # Save and compare footprint
+    # -------------------------------------------------
+    compact.save(output_path)
+    loaded, compact_load_s = _timed(CompactForest.load, output_path)
+
+    sklearn_bytes = sklearn_forest_nbytes(model)
+    ratio = sklearn_bytes / loaded.nbytes
+
+    print(f"Pickle file       : {model_path.stat().st_size / 1e6:.1f} MB")
+    print(f"Compact file      : {output_path.stat().st_size / 1e6:.1f} MB")
+    print(f"Tree arrays       : {sklearn_bytes / 1e6:.1f} MB -> {loaded.nbytes / 1e6:.1f} MB "
+          f"({ratio:.1f}x smaller)")
+    print(f"Load time         : {sklearn_load_s:.3f}s -> {compact_load_s:.3f}s")
+
+    if ratio < MIN_MEMORY_RATIO:
+        print(f"⚠ Memory reduction below {MIN_MEMORY_RATIO:.0f}x")
+
+    return {
+        "max_abs_diff": max_diff,
+        "label_agreement": label_agreement,
+        "memory_ratio": ratio,
+        "load_speedup": sklearn_load_s / compact_load_s,
+    }
+
+
+def main():
+    print("=" * 72)
+    print("PHASE 11.4 — COMPACT SEVERITY FOREST EXPORT")
+    print("=" * 72)
+
+    BASE_DIR = Path(__file__).resolve().parents[3]
+
+    MODEL_DIR = BASE_DIR / "models" / "severity"
+    DATA_PATH = BASE_DIR / "data" / "processed" / "scaled_features" / "sev_val_scaled.csv"
+
+    print("\n[1] Loading parity rows...")
+    X_parity = pd.read_csv(DATA_PATH, nrows=PARITY_ROWS)
+    print("Parity data:", X_parity.shape)
+
+    exported = 0
+    for step, name in enumerate(MODEL_NAMES, start=2):
+        model_path = MODEL_DIR / f"{name}.pkl"
+        if not model_path.exists():
+            print(f"\n[{step}] {name}: not found, skipped")
+            continue
+
+        print(f"\n[{step}] {name}")
+        export_model(model_path, MODEL_DIR / f"{name}.compact", X_parity)
+        exported += 1
+
+    assert exported, "No severity models found to export"
+
+    print("\n✔ PHASE 11.4 COMPLETE")
+    print("Compact models saved to:", MODEL_DIR)
+
+
+if __name__ == "__main__":
+    main()
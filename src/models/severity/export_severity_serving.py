@@ -0,0 +1,139 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from backend.app.inference.compact_forest import CompactForest
+from backend.app.inference.severity import SeverityModel
+from backend.app.utils.artifacts import file_sha256
+from backend.app.utils.feature_builder import probability_feature_columns
+
+# ==================================================
+# PHASE 11.5 — SEVERITY SERVING EXPORT
+# ==================================================
+# Writes models/severity/severity_serving.json: what the
+# API needs to run the serious vs slight model next to
+# the probability model (see backend/app/inference/severity.py)
+# ==================================================
+
+# Serving feature columns the severity models may share
+SERVING_CONTEXT = ["lat_bin", "lon_bin", "Hour", "is_peak_hour", "is_night", "Speed_limit"]
+
+# Locked policy thresholds (PHASE 11.3c), validated on P(serious)
+# alone (PHASE 11.3a), so that is the only score served
+SEVERITY_THRESHOLDS = [0.20, 0.40, 0.65]
+
+PARITY_ATOL = 1e-6
+PARITY_PAYLOADS = [
+    {"latitude": 51.5, "longitude": -0.1, "hour": 8, "speed_limit": 30},
+    {"latitude": 53.4, "longitude": -2.2, "hour": 23, "speed_limit": 60},
+    {"latitude": 55.9, "longitude": -3.2, "hour": 14, "speed_limit": 70},
+    {"latitude": 50.7, "longitude": -1.9, "hour": 3},
+]
+
+
+def main():
+    print("=" * 72)
+    print("PHASE 11.5 — SEVERITY SERVING EXPORT")
+    print("=" * 72)
+
+    BASE_DIR = Path(__file__).resolve().parents[3]
+
+    MODEL_DIR = BASE_DIR / "models" / "severity"
+    DATA_DIR = BASE_DIR / "data" / "processed" / "scaled_features"
+    SCALER_PATH = DATA_DIR / "scalers" / "sev_scaler.pkl"
+    OUTPUT_PATH = MODEL_DIR / "severity_serving.json"
+
+    SERIOUS_PICKLE = "serious_slight_rf.pkl"
+    SERIOUS_COMPACT = "serious_slight_rf.compact"
+
+    # -------------------------------------------------
+    # Models
+    # -------------------------------------------------
+    print("\n[1] Loading severity model...")
+    serious_model = joblib.load(MODEL_DIR / SERIOUS_PICKLE)
+    serious = CompactForest.load(MODEL_DIR / SERIOUS_COMPACT)
+
+    assert serious.meta.get("model_sha256") == file_sha256(MODEL_DIR / SERIOUS_PICKLE), (
+        "Compact serious model is stale; run PHASE 11.4 "
+        "(python -m src.models.severity.export_compact_forest) first"
+    )
+
+    print("Serious model:", SERIOUS_COMPACT)
+
+    features = list(serious.feature_names)
+
+    # -------------------------------------------------
+    # Defaults: training medians (scaled units)
+    # -------------------------------------------------
+    print("\n[2] Computing training medians...")
+    train = pd.read_csv(DATA_DIR / "sev_train_scaled.csv", usecols=features)
+    medians = train.replace([np.inf, -np.inf], np.nan).median().fillna(0.0)
+    defaults = {name: float(medians[name]) for name in features}
+
+    # -------------------------------------------------
+    # Context columns taken from the request
+    # -------------------------------------------------
+    print("\n[3] Mapping serving context columns...")
+    scaler = joblib.load(SCALER_PATH)
+    scaled = dict(zip(scaler.feature_names_in_, zip(scaler.mean_, scaler.scale_)))
+
+    context = {}
+    for name in features:
+        if name not in SERVING_CONTEXT:
+            continue
+        mean, scale = scaled.get(name, (0.0, 1.0))
+        context[name] = {"source": name, "mean": float(mean), "scale": float(scale)}
+        print(f"  - {name:<14} {'scaled' if name in scaled else 'raw'}")
+
+    if not context:
+        print("⚠ No shared columns: severity will be constant (training medians)")
+
+    spec = {
+        "serious_model": SERIOUS_COMPACT,
+        "serious_pickle": SERIOUS_PICKLE,
+        "serious_model_sha256": serious.meta["model_sha256"],
+        "defaults": defaults,
+        "context": context,
+        "thresholds": SEVERITY_THRESHOLDS,
+    }
+
+    # -------------------------------------------------
+    # Parity check against the pickles
+    # -------------------------------------------------
+    print("\n[4] Checking parity against sklearn...")
+    model = SeverityModel(spec, serious)
+    columns = probability_feature_columns(PARITY_PAYLOADS)
+    actual = model.score_columns(columns)
+
+    def template_rows(names):
+        X = pd.DataFrame([defaults] * len(PARITY_PAYLOADS))[names]
+        for name, c in context.items():
+            if name in names:
+                X[name] = (columns[c["source"]] - c["mean"]) / c["scale"]
+        return X
+
+    expected = serious_model.predict_proba(template_rows(serious.feature_names))[:, 1]
+
+    max_diff = float(np.max(np.abs(expected - actual)))
+    print("Severity scores   :", np.round(actual, 4).tolist())
+    print(f"Max abs difference: {max_diff:.3e}")
+
+    assert max_diff <= PARITY_ATOL, "Serving severity diverges from sklearn"
+
+    # -------------------------------------------------
+    # Save
+    # -------------------------------------------------
+    tmp = OUTPUT_PATH.with_name(OUTPUT_PATH.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(spec, f, indent=4)
+    tmp.replace(OUTPUT_PATH)
+
+    print("\n✔ PHASE 11.5 COMPLETE")
+    print("Severity serving spec saved to:", OUTPUT_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ def render_risk_cards(risk_response: dict):
     probability = risk_response.get("probability", 0.0)
     severity = risk_response.get("severity", "Moderate")
     risk_score = risk_response.get("risk_score", None)
+    source = risk_response.get("source")
 
     # ===============================
     # ROW 1 — Risk Level + Risk Score
@@ -74,3 +75,9 @@ def render_risk_cards(risk_response: dict):
             """,
             unsafe_allow_html=True
         )
+
+    # Backend and local model grade on different level scales
+    if source == "local":
+        st.caption("Scored by the local model (Low / Medium / High levels), not the backend.")
+    elif source:
+        st.caption(f"Scored by the {source} model.")
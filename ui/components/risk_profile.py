@@ -0,0 +1,52 @@
+import pandas as pd
+import streamlit as st
+
+# Local predictor (Low / Medium / High) and backend
+# (Low / Moderate / High / Severe) risk levels
+LEVEL_COLORS = {
+    "Low": "#22c55e",
+    "Medium": "#facc15",
+    "Moderate": "#facc15",
+    "High": "#ef4444",
+    "Severe": "#991b1b",
+}
+
+
+def render_risk_profile(times: list, results: list, caption: str = ""):
+    """
+    Timeline of predicted risk, one bar per time slot,
+    colored by risk level.
+    """
+
+    if not results:
+        st.info("No time slots to profile.")
+        return
+
+    scores = pd.Series(
+        [r["probability_score"] * 100 for r in results],
+        index=pd.DatetimeIndex(times, name="Time"),
+    )
+    levels = pd.Series([r["risk_level"] for r in results], index=scores.index)
+
+    # One column per level present, so each bar takes its level's color
+    present = [level for level in LEVEL_COLORS if (levels == level).any()]
+    chart = pd.DataFrame({
+        level: scores.where(levels == level)
+        for level in present
+    })
+
+    st.bar_chart(
+        chart,
+        y_label="Accident probability (%)",
+        color=[LEVEL_COLORS[level] for level in present],
+        height=280,
+    )
+
+    peak = scores.idxmax()
+    source = results[0].get("source")
+    st.caption(
+        f"Peak: **{scores.max():.1f}%** at **{peak:%a %H:%M}** "
+        f"• Lowest: **{scores.min():.1f}%** at **{scores.idxmin():%a %H:%M}**"
+        + (f" • {caption}" if caption else "")
+        + (f" • Scored by the {source} model" if source else "")
+    )
@@ -2,5 +2,37 @@
 # UI CONFIGURATION
 # ==================================================
 
+import os
+
 
 APP_NAME = "Road Accident Risk Predictor"
+
+
+# --------------------------------------------------
+# UI CACHES (every Streamlit rerun re-runs the page)
+# --------------------------------------------------
+WEATHER_CACHE_TTL_S = 600
+PREDICTION_CACHE_TTL_S = 3600
+CACHE_MAX_ENTRIES = 1000
+
+# Coordinates are rounded before weather lookups (~1 km at 2 decimals)
+COORD_DECIMALS = 2
+
+
+# --------------------------------------------------
+# BACKEND API (unset: score with the local model in this process)
+# --------------------------------------------------
+BACKEND_URL = os.getenv("BACKEND_URL", "").strip().rstrip("/")
+BACKEND_CONNECT_TIMEOUT_S = float(os.getenv("BACKEND_CONNECT_TIMEOUT_S", "2"))
+BACKEND_READ_TIMEOUT_S = float(os.getenv("BACKEND_READ_TIMEOUT_S", "10"))
+# Retries on connection errors and 502/503/504, with exponential backoff
+BACKEND_RETRIES = int(os.getenv("BACKEND_RETRIES", "2"))
+BACKEND_RETRY_BACKOFF_S = float(os.getenv("BACKEND_RETRY_BACKOFF_S", "0.2"))
+# Keep-alive connections per process (concurrent sessions share them)
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "16"))
+# Points per /predict-risk/batch call (backend MAX_BATCH_SIZE is 10000)
+BACKEND_BATCH_SIZE = int(os.getenv("BACKEND_BATCH_SIZE", "5000"))
+# Score locally when the backend is unreachable or failing (5xx)
+BACKEND_LOCAL_FALLBACK = os.getenv("BACKEND_LOCAL_FALLBACK", "1") == "1"
+# After a failure, skip the backend (no retry delays) for this long
+BACKEND_COOLDOWN_S = float(os.getenv("BACKEND_COOLDOWN_S", "30"))
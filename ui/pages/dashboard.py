@@ -15,6 +15,7 @@
 # ==================================================
 
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 from streamlit_geolocation import streamlit_geolocation
 from datetime import datetime, date, time, timedelta
 
@@ -39,9 +40,10 @@ if "selected_mode" not in st.session_state:
 # Imports
 # --------------------------------------------------
 from config import APP_NAME
-from services.local_predictor import predict_risk_local as predict_risk
-from services.local_predictor import predict_risk_local
-from services.weather import get_weather, get_forecast_weather
+from services.api import predict_risk, predict_risk_batch
+from services.weather import get_weather, get_forecast_weather, clear_weather_cache
+from services.weather import get_forecast_slots
+from services.api import clear_prediction_cache
 
 from components.header import render_header
 from components.safety_ribbon import render_safety_ribbon
@@ -52,6 +54,8 @@ from components.weather_card import render_weather_card
 from components.risk_interpretation import render_risk_interpretation
 from components.risk_badge import render_risk_badge
 from components.driver_advice import render_driver_advice
+from components.risk_profile import render_risk_profile
+from services.risk_overlay import build_risk_overlay
 
 
 
@@ -218,7 +222,11 @@ def run_default_mode():
 
     st.success(f"📍 Location captured: {lat:.4f}, {lon:.4f}")
 
-    # 2️⃣ Time + Weather
+    # 2️⃣ Time + Weather (cached: reruns reuse the last fetch)
+    if st.button("🔄 Refresh weather & risk", key="default_refresh"):
+        clear_weather_cache()
+        clear_prediction_cache()
+
     hour = datetime.now().hour
     weather = get_weather(lat, lon)
 
@@ -245,6 +253,7 @@ def run_default_mode():
             "risk_score": raw_response.get("probability_score", 0.0),
             "probability": raw_response.get("probability_score", 0.0) * 100,
             "severity": raw_response.get("severity_context", "Moderate"),
+            "source": raw_response.get("source"),
         }
 
         st.session_state.last_prediction = {
@@ -269,18 +278,32 @@ def run_default_mode():
 # --------------------------------------------------
 # MANUAL MODE — FUTURE SCENARIO ANALYSIS
 # --------------------------------------------------
+MANUAL_TIME_WINDOWS = {
+    "00:00 – 04:00": 0,
+    "04:00 – 08:00": 4,
+    "08:00 – 12:00": 8,
+    "12:00 – 16:00": 12,
+    "16:00 – 20:00": 16,
+    "20:00 – 24:00": 20,
+}
+
+
 def run_manual_mode():
     """
     Manual Mode:
       - Map click for location
       - Date + 4-hour window
       - Forecast-aware weather (safe fallback)
+      - Viewport risk overlay at the selected hour
       - Controlled prediction trigger
       - ZERO runtime errors
+
+    The map panel is a fragment holding the scenario (location,
+    date, window, weather) with results and profile as nested
+    fragments: map clicks, pans and scenario changes rerun the
+    panel, the run button reruns results only. The page (CSS,
+    header, ribbon) is never rebuilt by these interactions.
     """
-    import folium
-    from streamlit_folium import st_folium
-    from datetime import datetime, date, time, timedelta
 
     st.markdown("## 🟡 Manual Mode — Scenario Risk Analysis")
     st.info("📍 Click on the map to select a location")
@@ -291,50 +314,143 @@ def run_manual_mode():
     if "manual_location" not in st.session_state:
         st.session_state.manual_location = None
 
+    render_manual_map_panel()
+
+
+def fetch_manual_weather(lat, lon, start_timestamp, end_timestamp):
+    """
+    Forecast weather for the window, current weather as fallback.
+    Returns (weather, error).
+    """
+    forecast_limit = datetime.utcnow() + timedelta(days=5)
+    weather = None
+
+    try:
+        if start_timestamp <= forecast_limit:
+            weather = get_forecast_weather(
+                latitude=lat,
+                longitude=lon,
+                start_timestamp=start_timestamp.isoformat(),
+                end_timestamp=end_timestamp.isoformat(),
+            )
+
+        # Fallback if forecast missing or unavailable
+        if not weather:
+            weather = get_weather(lat, lon)
+
+    except Exception as e:
+        return None, e
+
+    return weather, None
+
+
+def rerun_manual_map():
+    """
+    Redraw marker, overlay, weather and results — the map fragment
+    only, unless this is a full page run (first draw, mode switch).
+    """
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+@st.fragment
+def render_manual_map_panel():
+    """
+    Map + overlay + scenario inputs. Owns manual_location and the
+    viewport; reruns on map clicks, pans and date/window changes.
+    """
+    import folium
+    from streamlit_folium import st_folium
+
+    # -----------------------------
+    # SCENARIO (widgets below keep their last values in session state)
+    # -----------------------------
+    selected_date = st.session_state.get("manual_date") or date.today()
+    window_label = st.session_state.get("manual_window") or next(iter(MANUAL_TIME_WINDOWS))
+    start_hour = MANUAL_TIME_WINDOWS[window_label]
+
+    start_timestamp = datetime.combine(selected_date, time(hour=start_hour))
+    end_timestamp = start_timestamp + timedelta(hours=4)
+
+    weather, weather_error = None, None
+    if st.session_state.manual_location:
+        lat, lon = st.session_state.manual_location
+        weather, weather_error = fetch_manual_weather(lat, lon, start_timestamp, end_timestamp)
+
+    overlay_weather = weather.get("condition") if isinstance(weather, dict) else None
+    overlay_group, overlay_caption = build_risk_overlay(
+        st.session_state.get("manual_bounds"), start_hour, overlay_weather
+    )
+
     # -----------------------------
     # MAP SECTION
     # -----------------------------
     default_lat, default_lon = 13.3601, 79.0258
-    map_center = st.session_state.manual_location or (default_lat, default_lon)
+
+    # Base map built once per session; marker and overlay travel as
+    # feature groups, so they change without re-rendering the map
+    if st.session_state.get("manual_base_map") is None:
+        map_center = st.session_state.manual_location or (default_lat, default_lon)
+        st.session_state.manual_base_map = folium.Map(
+            location=map_center, zoom_start=13, control_scale=True
+        )
 
     map_col, info_col = st.columns([3.5, 1], gap="large")
 
     with map_col:
-        m = folium.Map(location=map_center, zoom_start=13, control_scale=True)
+        marker_group = folium.FeatureGroup(name="Selected Location")
 
         if st.session_state.manual_location:
             folium.Marker(
                 location=st.session_state.manual_location,
                 tooltip="Selected Location",
                 icon=folium.Icon(color="red"),
-            ).add_to(m)
+            ).add_to(marker_group)
 
         map_output = st_folium(
-            m,
+            st.session_state.manual_base_map,
             height=600,
             width="100%",
-            returned_objects=["last_clicked"],
+            returned_objects=["last_clicked", "bounds"],
+            feature_group_to_add=[g for g in (overlay_group, marker_group) if g is not None],
+            pixelated=True,
             key="manual_map",
         )
 
-        if map_output and map_output.get("last_clicked"):
-            st.session_state.manual_location = (
+        if overlay_caption:
+            st.caption(overlay_caption)
+
+        map_output = map_output or {}
+        rerun = False
+
+        if map_output.get("last_clicked"):
+            clicked = (
                 map_output["last_clicked"]["lat"],
                 map_output["last_clicked"]["lng"],
             )
+            if clicked != st.session_state.manual_location:
+                st.session_state.manual_location = clicked
+                rerun = True
+
+        # Before the first draw the component reports null bounds
+        bounds = map_output.get("bounds") or {}
+        if (bounds.get("_southWest") or {}).get("lat") is None:
+            bounds = None
+        if bounds and bounds != st.session_state.get("manual_bounds"):
+            st.session_state.manual_bounds = bounds
+            rerun = True
+
+        if rerun:
+            rerun_manual_map()
 
     # -----------------------------
-    # SIDE PANEL (Legend + Factors)
+    # SIDE PANEL (Legend)
     # -----------------------------
     with info_col:
         render_heatmap_legend()
 
-        if st.session_state.get("last_prediction"):
-            render_risk_factor_badges(
-                weather_condition=st.session_state.last_prediction.get("weather_condition"),
-                hour=st.session_state.last_prediction.get("hour"),
-            )
-
     # -----------------------------
     # Location Guard
     # -----------------------------
@@ -347,51 +463,23 @@ def run_manual_mode():
     # -----------------------------
     # DATE + TIME WINDOW
     # -----------------------------
-    selected_date = st.date_input(
+    st.date_input(
         "Date",
         value=date.today(),
         min_value=date.today(),
+        key="manual_date",
     )
 
-    TIME_WINDOWS = {
-        "00:00 – 04:00": 0,
-        "04:00 – 08:00": 4,
-        "08:00 – 12:00": 8,
-        "12:00 – 16:00": 12,
-        "16:00 – 20:00": 16,
-        "20:00 – 24:00": 20,
-    }
-
-    window_label = st.selectbox("4-hour window", list(TIME_WINDOWS.keys()))
-    start_hour = TIME_WINDOWS[window_label]
-
-    start_timestamp = datetime.combine(selected_date, time(hour=start_hour))
-    end_timestamp = start_timestamp + timedelta(hours=4)
-    forecast_limit = datetime.utcnow() + timedelta(days=5)
-
-    lat, lon = st.session_state.manual_location
+    st.selectbox(
+        "4-hour window", list(MANUAL_TIME_WINDOWS.keys()), key="manual_window"
+    )
 
     # -----------------------------
-    # WEATHER (SAFE FETCH)
+    # WEATHER
     # -----------------------------
-    weather = None
-
-    try:
-        if start_timestamp <= forecast_limit:
-            weather = get_forecast_weather(
-                latitude=lat,
-                longitude=lon,
-                start_timestamp=start_timestamp.isoformat(),
-                end_timestamp=end_timestamp.isoformat(),
-            )
-
-        # Fallback if forecast missing or unavailable
-        if not weather:
-            weather = get_weather(lat, lon)
-
-    except Exception as e:
+    if weather_error is not None:
         st.error("⚠️ Weather service unavailable.")
-        st.exception(e)
+        st.exception(weather_error)
         return
 
     # Final safety guard
@@ -399,13 +487,24 @@ def run_manual_mode():
         st.error("⚠️ Invalid weather data received.")
         return
 
-    # -----------------------------
-    # WEATHER UI
-    # -----------------------------
     render_weather_card(weather)
 
     st.markdown("---")
 
+    lat, lon = st.session_state.manual_location
+    render_manual_results_panel(lat, lon, start_hour, weather)
+
+    st.markdown("---")
+
+    render_manual_profile_panel(lat, lon, selected_date, weather)
+
+
+@st.fragment
+def render_manual_results_panel(lat, lon, start_hour, weather):
+    """
+    Run button + risk results for the selected scenario.
+    """
+
     # -----------------------------
     # RUN PREDICTION
     # -----------------------------
@@ -426,6 +525,7 @@ def run_manual_mode():
                 "risk_score": raw_response.get("probability_score", 0.0),
                 "probability": raw_response.get("probability_score", 0.0) * 100,
                 "severity": raw_response.get("severity_context", "Moderate"),
+                "source": raw_response.get("source"),
             }
 
             st.session_state.last_prediction = {
@@ -436,6 +536,10 @@ def run_manual_mode():
             st.success("✅ Risk prediction successful")
 
             render_risk_cards(risk_response)
+            render_risk_factor_badges(
+                weather_condition=weather.get("condition"),
+                hour=start_hour,
+            )
             render_risk_interpretation(risk_response)
             render_driver_advice(
                 weather_condition=weather.get("condition"),
@@ -450,6 +554,57 @@ def run_manual_mode():
 
 
 
+@st.fragment
+def render_manual_profile_panel(lat, lon, selected_date, weather):
+    """
+    Risk over a whole day or the 5-day forecast, scored in one
+    batched model call (about the cost of a single prediction).
+    """
+
+    st.markdown("### 📈 Risk Profile")
+
+    view = st.radio(
+        "Profile",
+        ["24 hours (selected date)", "5-day forecast (3-hour slots)"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="manual_profile_view",
+    )
+
+    if view.startswith("24 hours"):
+        # Selected window's weather held for the whole day
+        times = [datetime.combine(selected_date, time(hour=h)) for h in range(24)]
+        slots = [{"hour": h, "weather_condition": weather.get("condition")} for h in range(24)]
+        caption = f"Weather held at {weather.get('condition', 'Unknown')}"
+    else:
+        try:
+            forecast = get_forecast_slots(lat, lon)
+        except Exception as e:
+            st.warning(f"⚠️ Forecast unavailable: {e}")
+            return
+
+        times = [slot["time"] for slot in forecast]
+        slots = [
+            {"hour": slot["time"].hour, "weather_condition": slot["condition"]}
+            for slot in forecast
+        ]
+        caption = "Forecast weather per slot (UTC)"
+
+    payloads = [
+        {"latitude": float(lat), "longitude": float(lon), **slot}
+        for slot in slots
+    ]
+
+    try:
+        results = predict_risk_batch(payloads)
+    except Exception as e:
+        st.error("❌ Risk profile failed.")
+        st.exception(e)
+        return
+
+    render_risk_profile(times, results, caption)
+
+
 # ==================================================
 # SINGLE GLOBAL ROUTER (DO NOT DUPLICATE)
 # ==================================================
@@ -470,6 +625,8 @@ MODE = st.session_state.selected_mode
 # MODE SWITCH SAFETY RESET
 if MODE != st.session_state.get("last_mode"):
     st.session_state.manual_location = None
+    st.session_state.manual_base_map = None
+    st.session_state.manual_bounds = None
     st.session_state.last_prediction = None
 
 st.session_state.last_mode = MODE
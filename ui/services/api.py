@@ -1,15 +1,94 @@
-from datetime import datetime
-# ui/services/api.py
+# ==================================================
+# UI SERVICE — BACKEND API
+# ==================================================
+# Scores through the FastAPI backend when BACKEND_URL is set, so UI
+# replicas stay thin; without it (or, with BACKEND_LOCAL_FALLBACK,
+# when the backend is unreachable or failing) the local model in
+# services/local_predictor.py is used. The two are not interchangeable:
+# the backend grades Low / Moderate / High / Severe on its served
+# thresholds and bins coordinates as int(deg * 10); the local model
+# grades Low / Medium / High at 0.30 / 0.60 on the training grid
+# floor(deg / 0.01) * 0.01. Results therefore carry "source"
+# ("backend" or "local") for the UI to show.
+# ==================================================
+
+import io
+import time
+
+import numpy as np
 import requests
-from config import BACKEND_URL
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from config import (
+    BACKEND_URL,
+    BACKEND_CONNECT_TIMEOUT_S,
+    BACKEND_READ_TIMEOUT_S,
+    BACKEND_RETRIES,
+    BACKEND_RETRY_BACKOFF_S,
+    BACKEND_POOL_SIZE,
+    BACKEND_BATCH_SIZE,
+    BACKEND_LOCAL_FALLBACK,
+    BACKEND_COOLDOWN_S,
+    PREDICTION_CACHE_TTL_S,
+    CACHE_MAX_ENTRIES,
+)
 
-def predict_risk(payload: dict) -> dict:
-    return {
-        "risk_level": "Low",
-        "probability_score": 0.10,
-        "severity_context": "Moderate (global prior)"
-    }
+# RiskRequest fields (backend/app/schemas.py); other payload keys stay local
+REQUEST_FIELDS = ("latitude", "longitude", "hour", "speed_limit", "road_type", "weather_condition")
+
+# Columnar batch format understood by /predict-risk/batch (utils/columnar.py)
+NPZ_MEDIA_TYPE = "application/x-npz"
+
+# monotonic() until which the backend is skipped after a failure
+_unavailable_until = 0.0
+
+
+class BackendUnavailable(RuntimeError):
+    """
+    Backend unreachable, timed out or answering 5xx after retries.
+    """
+
+
+# -----------------------------
+# HTTP session
+# -----------------------------
+@st.cache_resource(show_spinner=False)
+def get_session() -> requests.Session:
+    """
+    One pooled keep-alive session per process, shared by all
+    Streamlit sessions. Predictions are idempotent, so POSTs retry.
+    """
+    retry = Retry(
+        total=BACKEND_RETRIES,
+        backoff_factor=BACKEND_RETRY_BACKOFF_S,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=BACKEND_POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _send(path: str, **kwargs) -> requests.Response:
+    try:
+        response = get_session().post(
+            f"{BACKEND_URL}{path}",
+            timeout=(BACKEND_CONNECT_TIMEOUT_S, BACKEND_READ_TIMEOUT_S),
+            **kwargs,
+        )
+    except requests.RequestException as exc:
+        raise BackendUnavailable(f"Backend unreachable: {exc}") from exc
+
+    if response.status_code >= 500:
+        raise BackendUnavailable(
+            f"Backend error {response.status_code}: {response.text}"
+        )
 
     if response.status_code == 422:
         raise ValueError(
@@ -21,6 +100,154 @@ def predict_risk(payload: dict) -> dict:
             f"Backend error {response.status_code}: {response.text}"
         )
 
-    return response.json()
+    return response
+
+
+def _post(path: str, **kwargs) -> requests.Response:
+    global _unavailable_until
+
+    # Reruns during an outage go straight to the fallback
+    if time.monotonic() < _unavailable_until:
+        raise BackendUnavailable("Backend unavailable (cooling down after a failure)")
+
+    try:
+        return _send(path, **kwargs)
+    except BackendUnavailable:
+        _unavailable_until = time.monotonic() + BACKEND_COOLDOWN_S
+        raise
+
+
+def _request_row(payload: dict) -> tuple:
+    return tuple(payload.get(field) for field in REQUEST_FIELDS)
+
+
+# -----------------------------
+# Remote scoring (cached: reruns skip the round trip)
+# -----------------------------
+@st.cache_data(ttl=PREDICTION_CACHE_TTL_S, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _remote_predict(row: tuple) -> dict:
+    body = {field: value for field, value in zip(REQUEST_FIELDS, row) if value is not None}
+    return _post("/predict-risk", json=body).json()
+
+
+def _batch_body(rows: tuple) -> bytes:
+    # Missing context: NaN numbers, empty strings (backend defaults)
+    columns = dict(zip(REQUEST_FIELDS, zip(*rows)))
+    arrays = {
+        "latitude": np.array(columns["latitude"], dtype=float),
+        "longitude": np.array(columns["longitude"], dtype=float),
+        "hour": np.array(columns["hour"], dtype=np.int64),
+        "speed_limit": np.array(
+            [np.nan if v is None else v for v in columns["speed_limit"]], dtype=float
+        ),
+    }
+    for field in ("road_type", "weather_condition"):
+        arrays[field] = np.array(["" if v is None else str(v) for v in columns[field]])
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+@st.cache_data(ttl=PREDICTION_CACHE_TTL_S, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _remote_predict_batch(rows: tuple) -> tuple:
+    """
+    (probabilities, risk levels, severity context), one .npz round
+    trip per BACKEND_BATCH_SIZE points.
+    """
+    probs, levels, severity = [], [], "Moderate (global prior)"
+
+    for start in range(0, len(rows), BACKEND_BATCH_SIZE):
+        response = _post(
+            "/predict-risk/batch",
+            data=_batch_body(rows[start:start + BACKEND_BATCH_SIZE]),
+            headers={"Content-Type": NPZ_MEDIA_TYPE, "Accept": NPZ_MEDIA_TYPE},
+        )
+        with np.load(io.BytesIO(response.content), allow_pickle=False) as npz:
+            probs.append(npz["probability_score"])
+            levels.append(npz["risk_level_labels"][npz["risk_level"]])
+            severity = str(npz["severity_context"])
+
+    return np.concatenate(probs), np.concatenate(levels), severity
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+def _use_local(exc: BackendUnavailable) -> None:
+    if not BACKEND_LOCAL_FALLBACK:
+        raise exc
+
+
+def predict_risk(payload: dict) -> dict:
+    """
+    Risk for one payload (latitude, longitude, hour, optional context).
+    """
+    if BACKEND_URL:
+        try:
+            return {**_remote_predict(_request_row(payload)), "source": "backend"}
+        except BackendUnavailable as exc:
+            _use_local(exc)
+
+    from services.local_predictor import predict_risk_local
+
+    return {**predict_risk_local(payload), "source": "local"}
+
+
+def predict_risk_batch(payloads: list) -> list:
+    """
+    predict_risk for many payloads in one backend call (or one local
+    model call). Result dicts carry risk_level, probability_score,
+    severity_context and source.
+    """
+    if not payloads:
+        return []
+
+    if BACKEND_URL:
+        try:
+            probs, levels, severity = _remote_predict_batch(
+                tuple(_request_row(p) for p in payloads)
+            )
+            return [
+                {
+                    "risk_level": level,
+                    "probability_score": round(prob, 4),
+                    "severity_context": severity,
+                    "source": "backend",
+                }
+                for prob, level in zip(probs.tolist(), levels.tolist())
+            ]
+        except BackendUnavailable as exc:
+            _use_local(exc)
+
+    from services.local_predictor import predict_risk_local_batch
+
+    return [{**result, "source": "local"} for result in predict_risk_local_batch(payloads)]
+
+
+def predict_probabilities(payloads: list) -> tuple:
+    """
+    (probability scores as a NumPy array, source), e.g. for map
+    overlays that cache under their own key.
+    """
+    if BACKEND_URL:
+        try:
+            probs, _, _ = _remote_predict_batch(tuple(_request_row(p) for p in payloads))
+            return probs, "backend"
+        except BackendUnavailable as exc:
+            _use_local(exc)
+
+    from services.local_predictor import predict_local_probabilities
+
+    return predict_local_probabilities(payloads), "local"
+
 
+def clear_prediction_cache():
+    """
+    Drop cached scores, remote and local.
+    """
+    from services.local_predictor import clear_prediction_cache as clear_local
 
+    _remote_predict.clear()
+    _remote_predict_batch.clear()
+    clear_local()
@@ -0,0 +1,119 @@
+# ==================================================
+# UI SERVICE — FORECAST CACHE
+# ==================================================
+# Parsed OpenWeather 5-day / 3-hour forecasts, cached per rounded
+# coordinate and indexed by timestamp. Standard library only, so
+# the backend can import it (ui.services.forecast_cache) as well.
+# ==================================================
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# OpenWeather recomputes the forecast every 3 hours
+FORECAST_STEP_S = 3 * 3600
+
+
+class ForecastSeries:
+    """
+    One coordinate's forecast, sorted by timestamp for window lookups.
+    """
+
+    def __init__(self, payload: dict, fetched_at: float):
+        entries = sorted(
+            (
+                {
+                    "dt": entry["dt"],
+                    "temperature": entry["main"]["temp"],
+                    "humidity": entry["main"].get("humidity"),
+                    "wind_speed": entry["wind"]["speed"],
+                    "condition": entry["weather"][0]["main"],
+                }
+                for entry in payload.get("list", [])
+            ),
+            key=lambda e: e["dt"],
+        )
+        self.entries = entries
+        self.times = [e["dt"] for e in entries]
+        self.fetched_at = fetched_at
+        # Expire at the next provider refresh rather than a fixed age
+        self.expires_at = (int(fetched_at) // FORECAST_STEP_S + 1) * FORECAST_STEP_S
+
+    def window(self, start_ts: float, end_ts: float) -> list:
+        """
+        Entries with start_ts <= dt <= end_ts (epoch seconds).
+        """
+        lo = bisect_left(self.times, start_ts)
+        hi = bisect_right(self.times, end_ts)
+        return self.entries[lo:hi]
+
+
+class ForecastCache:
+    """
+    LRU of ForecastSeries keyed by coordinate rounded to `precision`
+    decimals (1 -> ~11 km, the backend's weather grid).
+    """
+
+    def __init__(self, max_cells: int = 2048, precision: int = 1):
+        self.max_cells = max_cells
+        self.precision = precision
+
+        self._series = OrderedDict()  # key -> ForecastSeries
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, lat: float, lon: float) -> tuple:
+        return round(lat, self.precision), round(lon, self.precision)
+
+    def get(self, lat: float, lon: float) -> Optional[ForecastSeries]:
+        key = self.key(lat, lon)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None or series.expires_at <= time.time():
+                self._series.pop(key, None)
+                self.misses += 1
+                return None
+            self._series.move_to_end(key)
+            self.hits += 1
+            return series
+
+    def put(self, lat: float, lon: float, payload: dict) -> ForecastSeries:
+        series = ForecastSeries(payload, time.time())
+        key = self.key(lat, lon)
+        with self._lock:
+            self._series[key] = series
+            self._series.move_to_end(key)
+            while len(self._series) > self.max_cells:
+                self._series.popitem(last=False)
+        return series
+
+    def load(self, lat: float, lon: float, fetch: Callable[[float, float], dict]) -> ForecastSeries:
+        """
+        Cached series, or fetch(lat, lon) -> forecast payload on a miss.
+        """
+        series = self.get(lat, lon)
+        if series is None:
+            series = self.put(lat, lon, fetch(lat, lon))
+        return series
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._series),
+            "max_cells": self.max_cells,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+FORECAST_CACHE = ForecastCache()
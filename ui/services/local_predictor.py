@@ -1,15 +1,35 @@
 import joblib
+import math
 import pandas as pd
+import streamlit as st
 from pathlib import Path
 
+from config import PREDICTION_CACHE_TTL_S, CACHE_MAX_ENTRIES
+
 # Resolve project root
 BASE_DIR = Path(__file__).resolve().parents[2]
 MODELS_DIR = BASE_DIR / "models"
+PROB_MODEL_PATH = MODELS_DIR / "probability" / "rf_calibrated.pkl"
+
+PEAK_HOURS = [8, 9, 18, 19]
+
+# Training grid: lat_bin = floor(latitude / GRID_SIZE) * GRID_SIZE
+# (src/data/labeling/build_probability_exposure_dataset.py)
+GRID_SIZE = 0.01
+
+# Part of every cache key: a retrained model never reuses old scores
+# (0 on UI replicas that score through the backend and ship no model)
+MODEL_STAMP = PROB_MODEL_PATH.stat().st_mtime_ns if PROB_MODEL_PATH.exists() else 0
+
+
+@st.cache_resource(show_spinner=False)
+def get_prob_model():
+    """
+    Trained probability model (Pipeline), loaded on the first local
+    prediction and shared by every session of this process.
+    """
+    return joblib.load(PROB_MODEL_PATH)
 
-# Load trained probability model (Pipeline)
-prob_model = joblib.load(
-    MODELS_DIR / "probability" / "rf_calibrated.pkl"
-)
 
 def normalize_road_type(rt):
     if not rt:
@@ -40,37 +60,64 @@ def normalize_weather(w):
     return "Fine"
 
 
-def predict_risk_local(payload: dict) -> dict:
+@st.cache_data(ttl=PREDICTION_CACHE_TTL_S, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _predict_probability(features: tuple, model_stamp: int) -> float:
+    # Convert to DataFrame (CRITICAL)
+    X = pd.DataFrame([dict(features)])
+
+    # Predict probability
+    return float(get_prob_model().predict_proba(X)[0][1])
+
+
+def clear_prediction_cache():
     """
-    Local inference for Streamlit using the full feature schema
-    expected by the trained pipeline.
+    Drop cached scores; the next call runs the model again.
+    """
+    _predict_probability.clear()
+    _predict_probabilities.clear()
+
+
+def grid_bin(coordinate, default: float) -> float:
+    """
+    Training grid bin of a coordinate, `default` when it is missing.
+    """
+    if coordinate is None:
+        return default
+    return round(math.floor(coordinate / GRID_SIZE) * GRID_SIZE, 2)
+
+
+def build_local_features(payload: dict) -> dict:
+    """
+    Feature template for one payload — MUST match training features exactly.
     """
+    hour = payload.get("hour", 12)
 
     # 🔒 Feature template — MUST match training features exactly
     features = {
     # Numeric (safe)
-    "lat_bin": payload.get("lat_bin", 51.5),
-    "lon_bin": payload.get("lon_bin", -0.1),
-    "Hour": payload.get("hour", 12),
+    "lat_bin": payload.get("lat_bin", grid_bin(payload.get("latitude"), 51.5)),
+    "lon_bin": payload.get("lon_bin", grid_bin(payload.get("longitude"), -0.1)),
+    "Hour": hour,
     "Speed_limit": payload.get("speed_limit", 30),
-    "is_peak_hour": payload.get("is_peak_hour", 0),
-    "is_night": payload.get("is_night", 0),
+    # Derived from the hour as in backend feature_builder when not given
+    "is_peak_hour": payload.get("is_peak_hour", int(hour in PEAK_HOURS)),
+    "is_night": payload.get("is_night", int(hour < 6 or hour > 20)),
 
     # Categorical (MUST match training)
     "Road_Type": normalize_road_type(payload.get("road_type")),
     "Junction_Detail": payload.get("junction_detail", "Not at junction"),
     "Urban_or_Rural_Area": payload.get("urban_or_rural", 1),
     "Light_Conditions": normalize_light_conditions(payload.get("light_conditions")),
-    "Weather_Conditions": normalize_weather(payload.get("weather_conditions"))
+    # Dashboard payloads use the API name (weather_condition)
+    "Weather_Conditions": normalize_weather(
+        payload.get("weather_conditions") or payload.get("weather_condition")
+    )
     }
 
+    return features
 
-    # Convert to DataFrame (CRITICAL)
-    X = pd.DataFrame([features])
-
-    # Predict probability
-    prob = float(prob_model.predict_proba(X)[0][1])
 
+def _risk_result(prob: float) -> dict:
     # Rule-based risk classification
     if prob < 0.30:
         risk = "Low"
@@ -84,3 +131,46 @@ def predict_risk_local(payload: dict) -> dict:
         "probability_score": round(prob, 3),
         "severity_context": "Moderate (probability-driven)",
     }
+
+
+def predict_risk_local(payload: dict) -> dict:
+    """
+    Local inference for Streamlit using the full feature schema
+    expected by the trained pipeline.
+    """
+    features = build_local_features(payload)
+
+    # Same features -> cached score (reruns skip the model)
+    prob = _predict_probability(tuple(features.items()), MODEL_STAMP)
+
+    return _risk_result(prob)
+
+
+@st.cache_data(ttl=PREDICTION_CACHE_TTL_S, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _predict_probabilities(rows: tuple, model_stamp: int) -> list:
+    # One DataFrame, one predict_proba call for every row
+    X = pd.DataFrame([dict(features) for features in rows])
+    return get_prob_model().predict_proba(X)[:, 1].tolist()
+
+
+def predict_local_probabilities(payloads: list):
+    """
+    Uncached probabilities (NumPy array) for many payloads, one model
+    call. For callers that cache under their own, smaller key.
+    """
+    X = pd.DataFrame([build_local_features(p) for p in payloads])
+    return get_prob_model().predict_proba(X)[:, 1]
+
+
+def predict_risk_local_batch(payloads: list) -> list:
+    """
+    predict_risk_local for many payloads (e.g. 24 hours or 40 forecast
+    slots) with a single vectorized model call.
+    """
+    if not payloads:
+        return []
+
+    rows = tuple(tuple(build_local_features(p).items()) for p in payloads)
+    probs = _predict_probabilities(rows, MODEL_STAMP)
+
+    return [_risk_result(prob) for prob in probs]
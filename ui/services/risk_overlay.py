@@ -0,0 +1,128 @@
+# ==================================================
+# UI SERVICE — VIEWPORT RISK OVERLAY
+# ==================================================
+# Scores every training-grid cell in the visible map
+# bounds with one batched call (backend or local model,
+# see services/api.py) and turns the result
+# into a single image layer, colored like the heatmap
+# legend (components/heatmap_legend.py).
+# ==================================================
+
+import math
+
+import folium
+import numpy as np
+import streamlit as st
+
+from config import PREDICTION_CACHE_TTL_S, CACHE_MAX_ENTRIES
+from services.api import predict_probabilities
+from services.local_predictor import GRID_SIZE, MODEL_STAMP, normalize_weather
+
+# Zoomed out further than this, the overlay is skipped (~ a large city)
+MAX_OVERLAY_CELLS = 6000
+OVERLAY_OPACITY = 0.45
+
+# Legend bands: upper score bound -> RGB
+LEGEND_BANDS = [
+    (0.2, (16, 185, 129)),   # Very Low
+    (0.4, (251, 191, 36)),   # Low
+    (0.6, (251, 146, 60)),   # Moderate
+    (0.8, (248, 113, 113)),  # High
+    (1.0, (220, 38, 38)),    # Very High
+]
+
+
+def viewport_cells(bounds: dict) -> tuple:
+    """
+    Inclusive grid index ranges (i0, i1, j0, j1) covering st_folium
+    bounds; cell i spans [i * GRID_SIZE, (i + 1) * GRID_SIZE).
+    Snapping makes small pans reuse the same cache entry.
+    """
+    south = bounds["_southWest"]["lat"]
+    west = bounds["_southWest"]["lng"]
+    north = bounds["_northEast"]["lat"]
+    east = bounds["_northEast"]["lng"]
+    return (
+        math.floor(south / GRID_SIZE),
+        math.floor(north / GRID_SIZE),
+        math.floor(west / GRID_SIZE),
+        math.floor(east / GRID_SIZE),
+    )
+
+
+@st.cache_data(ttl=PREDICTION_CACHE_TTL_S, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def score_viewport(i0: int, i1: int, j0: int, j1: int, hour: int, weather: str, model_stamp: int):
+    """
+    ((rows, cols) probabilities, north row first, source) from one batched call.
+    Cells are scored at their centres. The local model bins each centre
+    back to its own 0.01 deg cell; the backend bins int(deg * 10), so a
+    backend-scored overlay shows 0.1 deg blocks on this raster, and its
+    scores differ from a local-fallback overlay (see services/api.py).
+    """
+    lats = (np.arange(i1, i0 - 1, -1) + 0.5) * GRID_SIZE
+    lons = (np.arange(j0, j1 + 1) + 0.5) * GRID_SIZE
+
+    payloads = [
+        {
+            "latitude": float(lat),
+            "longitude": float(lon),
+            "hour": hour,
+            "weather_condition": weather,
+        }
+        for lat in lats
+        for lon in lons
+    ]
+
+    probs, source = predict_probabilities(payloads)
+    return probs.reshape(len(lats), len(lons)), source
+
+
+def overlay_image(probs: np.ndarray) -> np.ndarray:
+    """
+    RGBA image (north row first) in the legend's colors.
+    """
+    bounds = np.array([upper for upper, _ in LEGEND_BANDS[:-1]])
+    colors = np.array([rgb for _, rgb in LEGEND_BANDS], dtype=np.uint8)
+
+    band = np.searchsorted(bounds, probs, side="right")
+    image = np.empty(probs.shape + (4,), dtype=np.uint8)
+    image[..., :3] = colors[band]
+    image[..., 3] = int(255 * OVERLAY_OPACITY)
+    return image
+
+
+def build_risk_overlay(bounds: dict, hour: int, weather_condition: str):
+    """
+    (FeatureGroup with one image layer, caption). The group is None
+    before the map reports its bounds or when zoomed out too far.
+    """
+    if not bounds or not bounds.get("_southWest"):
+        return None, ""
+
+    i0, i1, j0, j1 = viewport_cells(bounds)
+    n_cells = (i1 - i0 + 1) * (j1 - j0 + 1)
+    if n_cells > MAX_OVERLAY_CELLS:
+        return None, "Zoom in to see the risk overlay"
+
+    weather = normalize_weather(weather_condition)
+    probs, source = score_viewport(i0, i1, j0, j1, hour, weather, MODEL_STAMP)
+
+    group = folium.FeatureGroup(name="Risk overlay")
+    folium.raster_layers.ImageOverlay(
+        image=overlay_image(probs),
+        bounds=[
+            [i0 * GRID_SIZE, j0 * GRID_SIZE],
+            [(i1 + 1) * GRID_SIZE, (j1 + 1) * GRID_SIZE],
+        ],
+        mercator_project=True,
+        interactive=False,
+    ).add_to(group)
+
+    return group, f"Risk overlay: {n_cells} cells at {hour:02d}:00, {weather} ({source} model)"
+
+
+def clear_overlay_cache():
+    """
+    Drop cached viewport scores.
+    """
+    score_viewport.clear()
@@ -5,13 +5,56 @@
 
 import requests
 import os
-from datetime import datetime
+import streamlit as st
+from datetime import datetime, timezone
+
+from services.forecast_cache import FORECAST_CACHE
+from config import WEATHER_CACHE_TTL_S, CACHE_MAX_ENTRIES, COORD_DECIMALS
 
 
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "").strip()
+# Override to use a local stand-in (benchmarks/openweather_stub.py)
+OPENWEATHER_BASE_URL = os.getenv(
+    "OPENWEATHER_BASE_URL", "https://api.openweathermap.org"
+).strip().rstrip("/")
+
+
+def _round_coords(latitude, longitude):
+    return round(float(latitude), COORD_DECIMALS), round(float(longitude), COORD_DECIMALS)
+
+
+@st.cache_data(ttl=WEATHER_CACHE_TTL_S, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _fetch_current_weather(latitude: float, longitude: float) -> dict:
+    # Raises on failure: Streamlit never caches exceptions, so errors are retried
+    BASE_URL = f"{OPENWEATHER_BASE_URL}/data/2.5/weather"
+
+    response = requests.get(
+        BASE_URL,
+        params={
+            "lat": latitude,
+            "lon": longitude,
+            "appid": OPENWEATHER_API_KEY,
+            "units": "metric",
+        },
+        timeout=10,
+    )
+    response.raise_for_status()
+    data = response.json()
+
+    return {
+        "temperature": data["main"]["temp"],
+        "humidity": data["main"]["humidity"],
+        "wind_speed": data["wind"]["speed"],
+        "condition": data["weather"][0]["main"],
+        "source": "current",
+    }
+
+
 def get_weather(latitude: float, longitude: float) -> dict:
     """
-    Fetch current weather directly from OpenWeather API.
+    Fetch current weather from OpenWeather API.
+    Cached per rounded coordinate for WEATHER_CACHE_TTL_S,
+    so page reruns do not call the API again.
     """
 
     if not OPENWEATHER_API_KEY:
@@ -23,29 +66,8 @@ def get_weather(latitude: float, longitude: float) -> dict:
             "error": "OPENWEATHER_API_KEY not set",
         }
 
-    BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
-
     try:
-        response = requests.get(
-            BASE_URL,
-            params={
-                "lat": latitude,
-                "lon": longitude,
-                "appid": OPENWEATHER_API_KEY,
-                "units": "metric",
-            },
-            timeout=10,
-        )
-        response.raise_for_status()
-        data = response.json()
-
-        return {
-            "temperature": data["main"]["temp"],
-            "humidity": data["main"]["humidity"],
-            "wind_speed": data["wind"]["speed"],
-            "condition": data["weather"][0]["main"],
-            "source": "current",
-        }
+        return _fetch_current_weather(*_round_coords(latitude, longitude))
 
     except Exception as e:
         return {
@@ -55,17 +77,23 @@ def get_weather(latitude: float, longitude: float) -> dict:
             "wind_speed": None,
             "error": str(e),
         }
-# ui/services/weather.py
 
-def get_forecast_weather(latitude, longitude, start_timestamp, end_timestamp):
+
+def clear_weather_cache():
     """
-    Fetch forecast weather for a given location and time window.
+    Drop cached current weather and forecasts; the next call refetches.
     """
+    _fetch_current_weather.clear()
+    FORECAST_CACHE.clear()
 
-    if not OPENWEATHER_API_KEY:
-        raise RuntimeError("OPENWEATHER_API_KEY not set in environment")
 
-    BASE_URL = "https://api.openweathermap.org/data/2.5/forecast"
+# ui/services/weather.py
+
+def _download_forecast(latitude, longitude):
+    """
+    Full 5-day / 3-hour forecast payload for a coordinate.
+    """
+    BASE_URL = f"{OPENWEATHER_BASE_URL}/data/2.5/forecast"
 
     params = {
         "lat": latitude,
@@ -76,26 +104,39 @@ def get_forecast_weather(latitude, longitude, start_timestamp, end_timestamp):
 
     response = requests.get(BASE_URL, params=params, timeout=10)
     response.raise_for_status()
+    return response.json()
 
-    data = response.json()
 
-    start_dt = datetime.fromisoformat(start_timestamp)
-    end_dt = datetime.fromisoformat(end_timestamp)
+def _epoch_utc(dt):
+    # Naive timestamps are UTC, like the forecast's dt values
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def get_forecast_weather(latitude, longitude, start_timestamp, end_timestamp):
+    """
+    Fetch forecast weather for a given location and time window.
+    The forecast is downloaded once per cell and refresh cycle;
+    other windows are answered from the cache.
+    """
 
-    forecasts = []
+    if not OPENWEATHER_API_KEY:
+        raise RuntimeError("OPENWEATHER_API_KEY not set in environment")
 
-    for entry in data.get("list", []):
-        forecast_time = datetime.utcfromtimestamp(entry["dt"])
+    series = FORECAST_CACHE.load(latitude, longitude, _download_forecast)
 
-        if start_dt <= forecast_time <= end_dt:
-            forecasts.append(entry)
+    start_dt = datetime.fromisoformat(start_timestamp)
+    end_dt = datetime.fromisoformat(end_timestamp)
+
+    forecasts = series.window(_epoch_utc(start_dt), _epoch_utc(end_dt))
 
     if not forecasts:
         return None
 
-    avg_temp = sum(f["main"]["temp"] for f in forecasts) / len(forecasts)
-    avg_wind = sum(f["wind"]["speed"] for f in forecasts) / len(forecasts)
-    condition = forecasts[0]["weather"][0]["main"]
+    avg_temp = sum(f["temperature"] for f in forecasts) / len(forecasts)
+    avg_wind = sum(f["wind_speed"] for f in forecasts) / len(forecasts)
+    condition = forecasts[0]["condition"]
 
     return {
     "temperature": round(avg_temp, 2),
@@ -104,3 +145,25 @@ def get_forecast_weather(latitude, longitude, start_timestamp, end_timestamp):
     "condition": condition,
     "source": "forecast",
 }
+
+
+def get_forecast_slots(latitude, longitude):
+    """
+    Every 3-hour forecast slot (up to 5 days) for a location,
+    from the same cached download as get_forecast_weather.
+    Slot times are naive UTC, like the manual-mode timestamps.
+    """
+
+    if not OPENWEATHER_API_KEY:
+        raise RuntimeError("OPENWEATHER_API_KEY not set in environment")
+
+    series = FORECAST_CACHE.load(latitude, longitude, _download_forecast)
+
+    return [
+        {
+            **entry,
+            "time": datetime.fromtimestamp(entry["dt"], tz=timezone.utc).replace(tzinfo=None),
+            "source": "forecast",
+        }
+        for entry in series.entries
+    ]